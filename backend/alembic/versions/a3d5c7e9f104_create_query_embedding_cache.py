@@ -0,0 +1,56 @@
+"""create query embedding cache
+
+Revision ID: a3d5c7e9f104
+Revises: f41ba96cab17
+Create Date: 2026-10-18 10:12:31.402917
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d5c7e9f104"  # pragma: allowlist secret
+down_revision: Union[str, None] = "f41ba96cab17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "query_embedding_cache",
+        sa.Column("model", sa.String(length=128), nullable=False),
+        sa.Column("query", sa.Text(), nullable=False),
+        sa.Column("embedding", postgresql.ARRAY(sa.REAL()), nullable=False),
+        sa.Column("hits", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "last_accessed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("model", "query"),
+    )
+    op.create_index(
+        op.f("ix_query_embedding_cache_last_accessed_at"),
+        "query_embedding_cache",
+        ["last_accessed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_query_embedding_cache_last_accessed_at"),
+        table_name="query_embedding_cache",
+    )
+    op.drop_table("query_embedding_cache")
@@ -0,0 +1,85 @@
+"""create personalization jobs
+
+Revision ID: a9d3e6b1c7f2
+Revises: e6a1c9d4b2f8
+Create Date: 2026-10-18 18:24:09.517364
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d3e6b1c7f2"  # pragma: allowlist secret
+down_revision: Union[str, None] = "e6a1c9d4b2f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "personalization_jobs",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("priority", sa.SmallInteger(), server_default="0", nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "queued",
+                "running",
+                "failed",
+                name="personalization_job_status",
+            ),
+            server_default="queued",
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "available_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("locked_by", sa.String(length=128), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["product_id"], ["product.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_personalization_jobs_live_user_product",
+        "personalization_jobs",
+        ["user_id", "product_id"],
+        unique=True,
+        postgresql_where=LIVE,
+    )
+    op.create_index(
+        "ix_personalization_jobs_claim",
+        "personalization_jobs",
+        [sa.text("priority DESC"), "available_at"],
+        postgresql_where=LIVE,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_personalization_jobs_claim",
+        table_name="personalization_jobs",
+    )
+    op.drop_index(
+        "ix_personalization_jobs_live_user_product",
+        table_name="personalization_jobs",
+    )
+    op.drop_table("personalization_jobs")
+    op.execute("DROP TYPE personalization_job_status")
@@ -0,0 +1,55 @@
+"""notify personalization status
+
+Revision ID: b1e7f4c9d2a6
+Revises: a9d3e6b1c7f2
+Create Date: 2026-10-18 10:02:14.318452
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b1e7f4c9d2a6"  # pragma: allowlist secret
+down_revision: Union[str, None] = "a9d3e6b1c7f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Sent on commit, so listeners only hear about personalizations they can read
+    op.execute(
+        """
+        CREATE FUNCTION notify_personalization_status() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'personalization_status',
+                json_build_object(
+                    'user_id', NEW.user_id,
+                    'product_id', NEW.product_id,
+                    'status', NEW.status
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER personalized_product_section_notify_status
+        AFTER INSERT OR UPDATE ON personalized_product_section
+        FOR EACH ROW
+        WHEN (NEW.status <> 'running')
+        EXECUTE FUNCTION notify_personalization_status();
+        """,
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER personalized_product_section_notify_status "
+        "ON personalized_product_section",
+    )
+    op.execute("DROP FUNCTION notify_personalization_status()")
@@ -0,0 +1,66 @@
+"""promote vector metadata filter columns
+
+Revision ID: b8e4f1a2c6d7
+Revises: a3d5c7e9f104
+Create Date: 2026-10-18 14:03:52.117406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from src.config.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e4f1a2c6d7"  # pragma: allowlist secret
+down_revision: Union[str, None] = "a3d5c7e9f104"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DB_EMBEDDING_SCHEMA
+# PROMOTED_FILTER_COLUMNS of src.config.vector_store as of this revision; copied, as
+# importing it creates the app's engines
+PROMOTED_FILTER_COLUMNS = {
+    settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS: {
+        "product_id": "bigint",
+        "category": "varchar",
+    },
+    settings.DB_EMBEDDING_TABLE_FOR_REVIEWS: {"product_id": "bigint"},
+}
+
+
+def _generated_expression(key: str, sql_type: str) -> str:
+    expression = f"metadata_->>'{key}'"
+    if sql_type != "varchar":
+        expression = f"({expression})::{sql_type}"
+    return expression
+
+
+def upgrade() -> None:
+    # Tables created by the current vector store already have these; IF NOT EXISTS
+    # makes the migration a no-op for them
+    for table_name, columns in PROMOTED_FILTER_COLUMNS.items():
+        table = f"data_{table_name}"
+        for key, sql_type in columns.items():
+            op.execute(
+                f"ALTER TABLE {SCHEMA}.{table} ADD COLUMN IF NOT EXISTS {key} {sql_type} "
+                f"GENERATED ALWAYS AS ({_generated_expression(key, sql_type)}) STORED",
+            )
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{SCHEMA}_{table}_{key} "
+                f"ON {SCHEMA}.{table} ({key})",
+            )
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_metadata_gin_idx ON {SCHEMA}.{table} "
+            f"USING gin ((metadata_::jsonb) jsonb_path_ops)",
+        )
+        op.execute(f"ANALYZE {SCHEMA}.{table}")
+
+
+def downgrade() -> None:
+    for table_name, columns in PROMOTED_FILTER_COLUMNS.items():
+        table = f"data_{table_name}"
+        op.execute(f"DROP INDEX IF EXISTS {SCHEMA}.{table}_metadata_gin_idx")
+        for key in columns:
+            op.execute(f"DROP INDEX IF EXISTS {SCHEMA}.ix_{SCHEMA}_{table}_{key}")
+            op.execute(f"ALTER TABLE {SCHEMA}.{table} DROP COLUMN IF EXISTS {key}")
@@ -0,0 +1,77 @@
+"""store embeddings as halfvec
+
+Revision ID: c4e9a7d2f5b1
+Revises: b8e4f1a2c6d7
+Create Date: 2026-10-18 15:21:07.480219
+
+"""
+
+import logging
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from src.config.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e9a7d2f5b1"  # pragma: allowlist secret
+down_revision: Union[str, None] = "b8e4f1a2c6d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger()
+
+TABLES = [
+    settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS,
+    settings.DB_EMBEDDING_TABLE_FOR_REVIEWS,
+]
+EMBED_DIM = 1536
+
+
+def _convert_embeddings(storage: str) -> None:
+    """
+    Rewrite the embedding column of every table as `storage` and rebuild its pg_diskann
+    index with the matching operator class. Tables already stored as `storage` (e.g.
+    created by a vector store configured with it) are left untouched.
+    """
+    column_type = f"{storage}({EMBED_DIM})"
+    for table_name in TABLES:
+        table = f"data_{table_name}"
+        current_type = (
+            op.get_bind()
+            .execute(
+                sa.text(
+                    "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                    "WHERE attrelid = CAST(:table AS regclass) AND attname = 'embedding'",
+                ),
+                {"table": f"public.{table}"},
+            )
+            .scalar()
+        )
+        if current_type == column_type:
+            logger.info(f"{table}.embedding is already {column_type}")
+            continue
+
+        # The index is bound to the old operator class, so it cannot survive the rewrite
+        op.execute(f"DROP INDEX IF EXISTS public.{table}_embedding_idx")
+        op.execute(
+            f"ALTER TABLE public.{table} ALTER COLUMN embedding TYPE {column_type} "
+            f"USING embedding::{column_type}",
+        )
+        op.execute(
+            f"CREATE INDEX {table}_embedding_idx ON public.{table} "
+            f"USING diskann (embedding {storage}_cosine_ops) "
+            f"WITH (max_neighbors = {settings.DISKANN_MAX_NEIGHBORS}, "
+            f"l_value_ib = {settings.DISKANN_L_VALUE_IB}, product_quantized = 'True', "
+            f"pq_param_num_chunks = '{settings.DISKANN_PQ_NUM_CHUNKS}')",
+        )
+        op.execute(f"ANALYZE public.{table}")
+        logger.info(f"Converted {table}.embedding from {current_type} to {column_type}")
+
+
+def upgrade() -> None:
+    _convert_embeddings(settings.VECTOR_STORAGE)
+
+
+def downgrade() -> None:
+    _convert_embeddings("vector")
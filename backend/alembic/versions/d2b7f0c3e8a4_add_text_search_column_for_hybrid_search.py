@@ -0,0 +1,42 @@
+"""add text search column for hybrid search
+
+Revision ID: d2b7f0c3e8a4
+Revises: c4e9a7d2f5b1
+Create Date: 2026-10-18 16:02:44.913572
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from src.config.config import settings
+from src.config.vector_store import HYBRID_SEARCH_TABLES
+
+# revision identifiers, used by Alembic.
+revision: str = "d2b7f0c3e8a4"  # pragma: allowlist secret
+down_revision: Union[str, None] = "c4e9a7d2f5b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tables created by the current vector store already have these; IF NOT EXISTS
+    # makes the migration a no-op for them
+    for table_name in sorted(HYBRID_SEARCH_TABLES):
+        table = f"data_{table_name}"
+        op.execute(
+            f"ALTER TABLE public.{table} ADD COLUMN IF NOT EXISTS text_search_tsv tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{settings.TEXT_SEARCH_CONFIG}', text)) STORED",
+        )
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_text_search_tsv_idx ON public.{table} "
+            f"USING gin (text_search_tsv)",
+        )
+        op.execute(f"ANALYZE public.{table}")
+
+
+def downgrade() -> None:
+    for table_name in sorted(HYBRID_SEARCH_TABLES):
+        table = f"data_{table_name}"
+        op.execute(f"DROP INDEX IF EXISTS public.{table}_text_search_tsv_idx")
+        op.execute(f"ALTER TABLE public.{table} DROP COLUMN IF EXISTS text_search_tsv")
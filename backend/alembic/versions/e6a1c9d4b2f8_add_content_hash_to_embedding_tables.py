@@ -0,0 +1,43 @@
+"""add content hash to embedding tables
+
+Revision ID: e6a1c9d4b2f8
+Revises: d2b7f0c3e8a4
+Create Date: 2026-10-18 16:48:15.302986
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from src.config.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a1c9d4b2f8"  # pragma: allowlist secret
+down_revision: Union[str, None] = "d2b7f0c3e8a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS,
+    settings.DB_EMBEDDING_TABLE_FOR_REVIEWS,
+]
+
+
+def upgrade() -> None:
+    # Existing rows keep a NULL hash and random node ids, so the next embedding sync
+    # replaces them once with stable-id rows; later syncs only embed what changed
+    for table_name in TABLES:
+        table = f"data_{table_name}"
+        op.execute(
+            f"ALTER TABLE public.{table} ADD COLUMN IF NOT EXISTS content_hash varchar",
+        )
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_public_{table}_node_id ON public.{table} (node_id)",
+        )
+
+
+def downgrade() -> None:
+    for table_name in TABLES:
+        table = f"data_{table_name}"
+        op.execute(f"DROP INDEX IF EXISTS public.ix_public_{table}_node_id")
+        op.execute(f"ALTER TABLE public.{table} DROP COLUMN IF EXISTS content_hash")
@@ -0,0 +1,127 @@
+"""
+Benchmark for the parallel, rate-limit-aware embedding ingest pipeline.
+
+Starts the stub embedding server with a request-rate quota, then embeds a synthetic
+review corpus twice: batch after batch, as the serial ingest did, and through
+`EmbeddingIngestPipeline.aembed`. Reports wall time, throughput, HTTP requests and 429s.
+Only embedding is measured; no database is needed.
+
+Usage (from the backend directory):
+    python -m benchmarks.embedding_ingest_pipeline --rows 20000 --requests-per-second 40
+"""
+
+import argparse
+import asyncio
+import time
+from itertools import batched
+
+from benchmarks.stub_embedding_server import StubEmbeddingServer
+from llama_index.core.schema import MetadataMode, TextNode
+from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
+from src.utils.ingest_pipeline import EmbeddingIngestPipeline
+
+
+def _nodes(rows: int) -> list:
+    return [
+        TextNode(
+            id_=f"review-{i}",
+            text=f"Review {i}: battery lasts {i % 14} hours, screen is {i % 5}/5.",
+            metadata={"review_id": str(i), "product_id": str(i % 500)},
+        )
+        for i in range(rows)
+    ]
+
+
+async def _serial(embed_model, nodes: list, batch_size: int) -> int:
+    for batch in batched(nodes, batch_size):
+        await embed_model.aget_text_embedding_batch(
+            [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch],
+        )
+    return len(nodes)
+
+
+async def _pipeline(pipeline: EmbeddingIngestPipeline, nodes: list) -> int:
+    embedded = 0
+    async for batch in pipeline.aembed(nodes):
+        embedded += len(batch)
+    return embedded
+
+
+def _embed_model(server: StubEmbeddingServer, max_retries: int, batch_size: int):
+    embed_model = AzureOpenAIEmbedding(
+        model="text-embedding-3-small",
+        deployment_name="text-embedding-3-small",
+        api_key="stub",
+        azure_endpoint=server.endpoint,
+        api_version="2024-02-01",
+        embed_batch_size=batch_size,
+        max_retries=max_retries,
+    )
+    if max_retries == 0:
+        # As in EmbedModelManager: leave every retry, including the client's, to the caller
+        embed_model._aclient = embed_model._get_aclient().with_options(max_retries=0)
+    return embed_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--requests-per-second", type=float, default=40.0)
+    parser.add_argument("--server-concurrency", type=int, default=8)
+    parser.add_argument("--server-latency-ms", type=float, default=100.0)
+    parser.add_argument("--per-input-latency-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = StubEmbeddingServer(
+        base_latency_ms=args.server_latency_ms,
+        per_input_latency_ms=args.per_input_latency_ms,
+        max_concurrency=args.server_concurrency,
+        requests_per_second=args.requests_per_second,
+    ).start()
+    nodes = _nodes(args.rows)
+    pipeline = EmbeddingIngestPipeline(
+        _embed_model(server, max_retries=0, batch_size=args.batch_size),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        max_concurrency=args.max_concurrency,
+    )
+    runs = (
+        (
+            "serial",
+            lambda: _serial(
+                _embed_model(server, max_retries=10, batch_size=args.batch_size),
+                nodes,
+                args.batch_size,
+            ),
+        ),
+        ("pipeline", lambda: _pipeline(pipeline, nodes)),
+    )
+
+    print(
+        f"{args.rows} nodes in batches of {args.batch_size}, stub server: "
+        f"{args.server_latency_ms:.0f} ms/request, {args.server_concurrency} concurrent, "
+        f"{args.requests_per_second:g} requests/s quota",
+    )
+    print(
+        f"{'path':<10}{'wall (s)':>10}{'rows/s':>10}{'http reqs':>11}{'429s':>7}",
+    )
+    try:
+        for label, run in runs:
+            server.reset_counters()
+            started = time.perf_counter()
+            rows = asyncio.run(run())
+            wall = time.perf_counter() - started
+            print(
+                f"{label:<10}{wall:>10.2f}{rows / wall:>10.0f}"
+                f"{server.requests + server.rate_limited:>11}{server.rate_limited:>7}",
+            )
+        print(f"pipeline concurrency settled at {pipeline.limiter.limit}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
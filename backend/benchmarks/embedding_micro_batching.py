@@ -0,0 +1,89 @@
+"""
+Benchmark for embedding request micro-batching.
+
+Starts the stub embedding server, then fires N concurrent `aget_query_embedding`
+calls through `AzureOpenAIEmbedding` directly and through `MicroBatchingEmbedding`,
+reporting wall time, latency percentiles and the number of HTTP requests sent.
+
+Usage (from the backend directory):
+    python -m benchmarks.embedding_micro_batching --concurrency 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.simulated import percentile
+from benchmarks.stub_embedding_server import StubEmbeddingServer
+from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
+from src.llama_index.embeddings.batching import MicroBatchingEmbedding
+
+
+async def _run(embed_model, server, concurrency: int) -> tuple[float, list]:
+    # Warm up the HTTP client so connection setup is not measured.
+    await embed_model.aget_query_embedding("warm-up")
+    server.reset_counters()
+    latencies = []
+    started = time.perf_counter()
+
+    async def embed(query: str) -> None:
+        await embed_model.aget_query_embedding(query)
+        latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(embed(f"query {i}") for i in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-wait-ms", type=float, default=20.0)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--server-concurrency", type=int, default=4)
+    parser.add_argument("--server-latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    server = StubEmbeddingServer(
+        base_latency_ms=args.server_latency_ms,
+        max_concurrency=args.server_concurrency,
+    ).start()
+    azure_embed_model = AzureOpenAIEmbedding(
+        model="text-embedding-3-small",
+        deployment_name="text-embedding-3-small",
+        api_key="stub",
+        azure_endpoint=server.endpoint,
+        api_version="2024-02-01",
+        max_retries=0,
+    )
+    batching_embed_model = MicroBatchingEmbedding(
+        embed_model=azure_embed_model,
+        window_ms=args.window_ms,
+        max_wait_ms=args.max_wait_ms,
+        max_batch_size=args.max_batch_size,
+    )
+
+    print(
+        f"{args.concurrency} concurrent query embeddings, stub server: "
+        f"{args.server_latency_ms:.0f} ms/request, {args.server_concurrency} concurrent",
+    )
+    print(
+        f"{'path':<12}{'wall (s)':>10}{'http reqs':>11}{'p50 (ms)':>10}{'p99 (ms)':>10}",
+    )
+    try:
+        for label, embed_model in (
+            ("unbatched", azure_embed_model),
+            ("batched", batching_embed_model),
+        ):
+            wall, latencies = asyncio.run(_run(embed_model, server, args.concurrency))
+            print(
+                f"{label:<12}{wall:>10.2f}{server.requests:>11}"
+                f"{percentile(latencies, 50) * 1000:>10.0f}"
+                f"{percentile(latencies, 99) * 1000:>10.0f}",
+            )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Micro-benchmark for JSON extraction from agent outputs.
+
+Compares `src.utils.json_extract` against the character-by-character
+`extract_json_blocks` + json5 chain it replaced, over a corpus of agent outputs, one
+JSON object per line with `agent` and `output`:
+
+    extract:   first JSON value of each output (planner and presentation parsing)
+    prettify:  `_print_pretty_with_embedded_json` (debug trace views)
+
+It also reports how many outputs both extract to the same value.
+
+data/agent_outputs.jsonl holds samples in the formats the agents and traces produce:
+fenced JSON, JSON after prose, Python reprs, JSON5 and escaped JSON. Export the inputs
+and outputs of recorded agent spans from Phoenix for a corpus of real outputs:
+
+    python -m benchmarks.json_extraction --export benchmarks/data/phoenix_outputs.jsonl
+
+Usage (from the backend directory):
+    python -m benchmarks.json_extraction [--corpus FILE] [--repeat N]
+"""
+
+import argparse
+import ast
+import json
+import statistics
+import textwrap
+import time
+from pathlib import Path
+from typing import Callable
+
+import json5
+import regex as re
+from src.utils.json_extract import first_json
+from src.utils.utils import _print_pretty_with_embedded_json
+
+DATA = Path(__file__).parent / "data"
+DEFAULT_CORPUS = DATA / "agent_outputs.jsonl"
+
+
+# The extraction chain before src.utils.json_extract, as the baseline
+
+
+def legacy_extract_json_blocks(content: str) -> list[str]:
+    blocks = []
+    stack = []
+    start_idx = None
+    for idx, char in enumerate(content):
+        if char in "{[":
+            if not stack:
+                start_idx = idx
+            stack.append(char)
+        elif char in "}]":
+            if stack:
+                open_char = stack.pop()
+                if (open_char == "{" and char != "}") or (
+                    open_char == "[" and char != "]"
+                ):
+                    continue
+                if not stack and start_idx is not None:
+                    blocks.append(content[start_idx : idx + 1])  # noqa: E203
+                    start_idx = None
+    return blocks
+
+
+def legacy_first_json(content: str):
+    blocks = legacy_extract_json_blocks(content)
+    try:
+        return json5.loads(blocks[0]) if blocks else None
+    except ValueError:
+        return None
+
+
+def legacy_print_pretty_with_embedded_json(content: str) -> str:
+    try:
+        parsed = json.loads(content)
+        return json.dumps(parsed, indent=4, ensure_ascii=False)
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    content = re.sub(r"\s+", " ", content)
+    for block in legacy_extract_json_blocks(content):
+        is_parsed = True
+        pretty_block = re.sub(r"(\\n|\n)", "", block)
+        pretty_block = re.sub(r"\\", "", pretty_block)
+        try:
+            pretty_block = json5.loads(pretty_block)
+        except Exception:
+            try:
+                pretty_block = ast.literal_eval(pretty_block)
+            except Exception:
+                is_parsed = False
+
+        if is_parsed and isinstance(pretty_block, dict):
+            for key, value in pretty_block.items():
+                if isinstance(value, str):
+                    pretty_block[key] = legacy_print_pretty_with_embedded_json(value)
+            pretty_block = json.dumps(pretty_block, indent=4, ensure_ascii=False)
+        elif isinstance(pretty_block, str):
+            pretty_block = _legacy_parse_json_using_regex(pretty_block)
+        elif isinstance(pretty_block, list):
+            pretty_block = json.dumps(pretty_block, indent=4, ensure_ascii=False)
+        content = content.replace(block, "\n" + pretty_block + "\n")
+    return content
+
+
+def _legacy_parse_json_using_regex(content: str) -> str:
+    try:
+        return json.dumps(json.loads(content), indent=2, ensure_ascii=False)
+    except (json.JSONDecodeError, TypeError):
+        pass
+    for block in re.findall(r"(\{.*?\}|\[.*?\])", content, re.DOTALL):
+        pretty_block = re.sub(r",\s*", ",\n", block)
+        pretty_block = re.sub(r"([\{\[])\s*", r"\1\n", pretty_block)
+        pretty_block = re.sub(r"\s*([\}\]])", r"\n\1", pretty_block)
+        content = content.replace(block, textwrap.indent(pretty_block, "   "))
+    return content
+
+
+def _time_per_output(func: Callable, outputs: list[str], repeat: int) -> float:
+    """Median over `repeat` passes of the mean time per output, in microseconds."""
+    passes = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for output in outputs:
+            func(output)
+        passes.append((time.perf_counter() - started) / len(outputs))
+    return statistics.median(passes) * 1e6
+
+
+def _export(args: argparse.Namespace) -> None:
+    import phoenix as px
+    from phoenix.trace.dsl import SpanQuery
+    from src.config.config import settings
+
+    client = px.Client(endpoint=settings.PHOENIX_CLIENT_ENDPOINT)
+    df = client.query_spans(
+        SpanQuery().where("span_kind == 'AGENT'"),
+        project_name=settings.PHOENIX_PROJECT_NAME,
+        limit=args.limit,
+    )
+    written = 0
+    with open(args.export, "w") as output:
+        for _, span in df.iterrows():
+            for column in ("attributes.input.value", "attributes.output.value"):
+                value = span.get(column)
+                if isinstance(value, str) and value:
+                    output.write(
+                        json.dumps({"agent": span["name"], "output": value}) + "\n",
+                    )
+                    written += 1
+    print(f"Exported {written} agent inputs and outputs to {args.export}")
+
+
+def _benchmark(args: argparse.Namespace) -> None:
+    rows = [
+        json.loads(line)
+        for line in Path(args.corpus).read_text().splitlines()
+        if line.strip()
+    ]
+    outputs = [row["output"] for row in rows]
+    print(
+        f"{len(outputs)} outputs, {sum(map(len, outputs)) / len(outputs):.0f} chars "
+        f"on average, median of {args.repeat} passes",
+    )
+
+    print(f"{'':<10}{'legacy us':>12}{'new us':>12}{'speedup':>10}")
+    for label, legacy, new in (
+        ("extract", legacy_first_json, first_json),
+        (
+            "prettify",
+            legacy_print_pretty_with_embedded_json,
+            _print_pretty_with_embedded_json,
+        ),
+    ):
+        legacy_us = _time_per_output(legacy, outputs, args.repeat)
+        new_us = _time_per_output(new, outputs, args.repeat)
+        print(
+            f"{label:<10}{legacy_us:>12.1f}{new_us:>12.1f}{legacy_us / new_us:>9.1f}x",
+        )
+
+    differences = []
+    for row in rows:
+        legacy_value = legacy_first_json(row["output"])
+        new_value = first_json(row["output"])
+        if legacy_value != new_value:
+            differences.append((row["agent"], legacy_value, new_value))
+    same = len(rows) - len(differences)
+    print(f"\nSame extracted value: {same}/{len(rows)}")
+    if args.show_differences:
+        for agent, legacy_value, new_value in differences:
+            print(
+                f"  {agent}: legacy {legacy_value!r:.100}\n  {'':<{len(agent)}}  new {new_value!r:.100}",
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--show-differences", action="store_true")
+    parser.add_argument("--export", metavar="FILE")
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.export:
+        _export(args)
+    else:
+        _benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
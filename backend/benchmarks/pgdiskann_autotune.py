@@ -0,0 +1,111 @@
+"""
+Recall/latency sweep of pg_diskann search parameters.
+
+For every table, computes the exact top-k of each recorded query with a brute-force
+scan, then sweeps `diskann_l_value_is` x `quantized_fetch_limit` (plus each
+`diskann_l_value_is` without the full-precision re-rank, shown as fetch "-") and
+reports recall@k with p50/p99 latency, and the cheapest combination meeting the recall
+target.
+
+Pass `--output` to write the results to a tuning file; setting
+`VECTOR_SEARCH_TUNING_FILE` to that file makes `VectorStoreManager` apply the
+recommended settings at startup.
+
+Usage (from the backend directory, against a seeded database):
+    python -m benchmarks.pgdiskann_autotune --output vector_search_tuning.json
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from src.config.config import settings
+from src.config.embed_model import EmbedModelManager
+from src.config.vector_store import VectorStoreManager
+from src.database import pools
+from src.llama_index.vector_stores.pgdiskann.tuning import (
+    asweep,
+    recommend,
+    save_tuning_file,
+)
+
+DEFAULT_QUERIES = Path(__file__).parent / "data" / "recorded_queries.txt"
+
+
+def _floats(value: str) -> list:
+    return [float(item) for item in value.split(",")]
+
+
+def _ints(value: str) -> list:
+    return [int(item) for item in value.split(",")]
+
+
+async def _run(args: argparse.Namespace) -> None:
+    queries = [
+        line.strip()
+        for line in Path(args.queries).read_text().splitlines()
+        if line.strip()
+    ]
+    embed_model = await EmbedModelManager.get_embed_model(
+        use_query_cache=False,
+        use_micro_batching=False,
+    )
+    query_embeddings = await embed_model.aget_text_embedding_batch(queries)
+
+    for table_name in args.tables:
+        vector_store = await VectorStoreManager.get_vector_store(table_name)
+        results = await asweep(
+            vector_store,
+            query_embeddings,
+            k=args.k,
+            l_values=args.l_values,
+            fetch_limits=args.fetch_limits,
+        )
+        recall_target = args.recall_target or settings.VECTOR_SEARCH_RECALL_TARGETS.get(
+            table_name,
+            settings.VECTOR_SEARCH_RECALL_TARGET,
+        )
+        best = recommend(results, recall_target)
+
+        print(f"\ndata_{table_name}: {len(queries)} queries, recall@{args.k}")
+        print(
+            f"{'l_value_is':>11}{'fetch':>7}{'recall':>8}{'p50 (ms)':>10}{'p99 (ms)':>10}",
+        )
+        for result in results:
+            marker = "  <- recommended" if result == best else ""
+            fetch = result.quantized_fetch_limit if result.use_reranking else "-"
+            print(
+                f"{result.diskann_l_value_is:>11g}{fetch:>7}"
+                f"{result.recall:>8.3f}{result.p50_ms:>10.1f}{result.p99_ms:>10.1f}{marker}",
+            )
+        if best is None:
+            print(f"No combination reaches recall {recall_target}")
+
+        if args.output:
+            save_tuning_file(args.output, table_name, args.k, results)
+        await vector_store.close()
+
+    await pools.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        default=[
+            settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS,
+            settings.DB_EMBEDDING_TABLE_FOR_REVIEWS,
+        ],
+    )
+    parser.add_argument("--queries", default=str(DEFAULT_QUERIES))
+    parser.add_argument("--k", type=int, default=settings.TOP_K)
+    parser.add_argument("--l-values", type=_floats, default=[16, 32, 64, 100, 128, 200])
+    parser.add_argument("--fetch-limits", type=_ints, default=[20, 30, 50, 80, 120])
+    parser.add_argument("--recall-target", type=float, default=None)
+    parser.add_argument("--output", default=None, help="tuning file to write")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark for metadata-filtered vector queries.
+
+Runs product- and category-filtered top-k queries against the embedding tables with
+three filter compilations:
+
+    legacy:   literal `text()` over `metadata_->>'key'` (the previous behaviour)
+    bound:    the same comparison with bound parameters
+    promoted: bound parameters against the indexed generated columns
+
+Exact in-process search is disabled so every query goes through Postgres.
+
+Usage (from the backend directory, against a migrated and seeded database):
+    python -m benchmarks.pgdiskann_filters --repeats 5
+"""
+
+import argparse
+import asyncio
+import csv
+import time
+from typing import Any
+
+from benchmarks.simulated import percentile
+from llama_index.core.vector_stores.types import (
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+from sqlalchemy import text
+from src.config.config import settings
+from src.config.embed_model import EmbedModelManager
+from src.config.vector_store import PROMOTED_FILTER_COLUMNS, VectorStoreManager
+from src.database import PoolRole, pools
+from src.llama_index.vector_stores.pgdiskann import PGDiskAnnVectorStore
+
+
+class _LegacyFilterStore(PGDiskAnnVectorStore):
+    """Compiles equality filters the way the store did before promoted columns."""
+
+    def _build_filter_clause(self, filter_: MetadataFilter) -> Any:
+        if filter_.operator != FilterOperator.EQ:
+            return super()._build_filter_clause(filter_)
+        try:
+            return text(
+                f"(metadata_->>'{filter_.key}')::float = {float(filter_.value)}",
+            )
+        except ValueError:
+            return text(f"metadata_->>'{filter_.key}' = '{filter_.value}'")
+
+
+def _store(table_name: str, variant: str) -> PGDiskAnnVectorStore:
+    store_class = _LegacyFilterStore if variant == "legacy" else PGDiskAnnVectorStore
+    return store_class.from_params(
+        database=settings.DB_NAME,
+        host=settings.DB_HOST,
+        password=settings.DB_PASSWORD,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        table_name=table_name,
+        engine=pools.get_engine(PoolRole.SYNC),
+        async_engine=pools.get_async_engine(PoolRole.APP),
+        perform_setup=False,
+        use_reranking=True,
+        pgdiskann_kwargs=VectorStoreManager.get_search_params(table_name),
+        promoted_columns=(
+            PROMOTED_FILTER_COLUMNS.get(table_name) if variant == "promoted" else None
+        ),
+    )
+
+
+async def _time_queries(store, embeddings, filters, k, repeats) -> list:
+    latencies = []
+    for _ in range(repeats):
+        for embedding, metadata_filters in zip(embeddings, filters):
+            started = time.perf_counter()
+            await store._aquery_with_score(embedding, k, metadata_filters)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def _run(args: argparse.Namespace) -> None:
+    products = list(csv.DictReader(open("data/product.csv", encoding="utf-8")))
+    queries = [f"{product['category']} {product['brand']}" for product in products]
+    embed_model = await EmbedModelManager.get_embed_model(
+        use_query_cache=False,
+        use_micro_batching=False,
+    )
+    embeddings = await embed_model.aget_text_embedding_batch(queries)
+
+    def eq(key, value):
+        return MetadataFilters(filters=[MetadataFilter(key=key, value=value)])
+
+    workloads = [
+        (
+            settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS,
+            "category",
+            [eq("category", product["category"]) for product in products],
+        ),
+        (
+            settings.DB_EMBEDDING_TABLE_FOR_REVIEWS,
+            "product_id",
+            [eq("product_id", int(product["id"])) for product in products],
+        ),
+    ]
+
+    print(f"{len(queries)} queries x {args.repeats} repeats, top-{args.k}")
+    print(f"{'table':<24}{'filter':<12}{'variant':<10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for table_name, filter_key, filters in workloads:
+        for variant in ("legacy", "bound", "promoted"):
+            store = _store(table_name, variant)
+            # Warm up buffers and connections before timing
+            await _time_queries(store, embeddings, filters, args.k, 1)
+            latencies = await _time_queries(
+                store,
+                embeddings,
+                filters,
+                args.k,
+                args.repeats,
+            )
+            print(
+                f"data_{table_name:<19}{filter_key:<12}{variant:<10}"
+                f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 99):>10.1f}",
+            )
+
+    await pools.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=settings.TOP_K)
+    parser.add_argument("--repeats", type=int, default=5)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark for the rule-based workflow planner against the planning agent.
+
+Record mode runs the planning agent (`LLMPlanner`) over every user in data/users.csv,
+once without a message and once per line of the messages file, and records each plan
+with its latency. This needs the Azure OpenAI settings:
+
+    python -m benchmarks.planner --record
+
+Compare mode replays the recorded set through `RuleBasedPlanner` without its fallback
+and reports:
+
+    fast path:   share of runs the rules plan on their own (the rest go to the LLM)
+    match rate:  share of fast-path plans equal to the recorded LLM plan (as sets)
+    saved:       planning latency no longer spent per run. Planning runs before the
+                 agents fan out, so this is saved on the end-to-end workflow latency.
+
+Usage (from the backend directory):
+    python -m benchmarks.planner
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.utils import load_csv_data
+from src.workflows.planning import LLMPlanner, RuleBasedPlanner
+from src.workflows.schemas import UserSchema
+
+DATA = Path(__file__).parent / "data"
+DEFAULT_MESSAGES = DATA / "planner_messages.txt"
+DEFAULT_RECORDED = DATA / "recorded_plans.jsonl"
+
+
+def _user_profiles(users_csv: str) -> list[dict]:
+    # Shaped like the workflow's `user_profile`; the seeded preferences stand in for
+    # the ones remembered by mem0
+    profiles = []
+    for user in load_csv_data(users_csv):
+        profile = UserSchema(**user, search_history=None).model_dump()
+        profile["user_preferences"] = user.get("preferences") or []
+        profiles.append(profile)
+    return profiles
+
+
+async def _record(args: argparse.Namespace) -> None:
+    from src.agents.planning_agent import get_planning_agent
+    from src.config.llm import LLMManager
+
+    messages = [None] + [
+        line.strip()
+        for line in Path(args.messages).read_text().splitlines()
+        if line.strip()
+    ]
+    planner = LLMPlanner(get_planning_agent(await LLMManager.get_llm()))
+    with open(args.recorded, "w") as output:
+        for profile in _user_profiles(args.users):
+            for user_msg in messages:
+                started = time.perf_counter()
+                plan = await planner.plan(profile, user_msg)
+                latency_ms = (time.perf_counter() - started) * 1000
+                output.write(
+                    json.dumps(
+                        {
+                            "user_profile": profile,
+                            "user_msg": user_msg,
+                            "plan": plan,
+                            "latency_ms": round(latency_ms, 1),
+                        },
+                    )
+                    + "\n",
+                )
+                print(f"{latency_ms:8.0f} ms  {plan}  {user_msg!r}")
+    print(f"Recorded to {args.recorded}")
+
+
+def _summary(label: str, rows: list[dict], fast: list[tuple]) -> str:
+    fast_path = len(fast)
+    matches = sum(match for match, _, _ in fast)
+    saved_ms = sum(row_saved for _, row_saved, _ in fast)
+    return (
+        f"{label:<16}{len(rows):>6}{fast_path / len(rows):>11.0%}"
+        f"{matches / fast_path if fast_path else 0:>12.0%}"
+        f"{saved_ms / len(rows):>16.0f}"
+    )
+
+
+def _compare(args: argparse.Namespace) -> None:
+    path = Path(args.recorded)
+    if not path.exists():
+        raise SystemExit(
+            f"{path} not found; record the planning agent's plans first with --record",
+        )
+    rows = [json.loads(line) for line in path.read_text().splitlines() if line]
+    planner = RuleBasedPlanner()
+
+    results: dict[Optional[bool], list[tuple]] = {False: [], True: []}
+    mismatches = []
+    rule_times = []
+    for row in rows:
+        started = time.perf_counter()
+        plan = planner.plan_from_rules(row["user_profile"], row["user_msg"])
+        rule_times.append(time.perf_counter() - started)
+        if plan is None:
+            continue
+        match = set(plan) == set(row["plan"])
+        if not match:
+            mismatches.append((row["user_msg"], plan, row["plan"]))
+        saved_ms = row["latency_ms"] - rule_times[-1] * 1000
+        results[bool(row["user_msg"])].append((match, saved_ms, plan))
+
+    llm_latencies = [row["latency_ms"] for row in rows]
+    print(
+        f"{len(rows)} recorded runs; LLM planning p50 "
+        f"{statistics.median(llm_latencies):.0f} ms, rules p50 "
+        f"{statistics.median(rule_times) * 1e6:.0f} us",
+    )
+    print(
+        f"{'runs':<16}{'count':>6}{'fast path':>11}{'match rate':>12}{'saved ms/run':>16}",
+    )
+    without_msg = [row for row in rows if not row["user_msg"]]
+    with_msg = [row for row in rows if row["user_msg"]]
+    if without_msg:
+        print(_summary("no user_msg", without_msg, results[False]))
+    if with_msg:
+        print(_summary("with user_msg", with_msg, results[True]))
+    print(_summary("all", rows, results[False] + results[True]))
+
+    if mismatches and args.show_mismatches:
+        print("\nFast-path plans that differ from the LLM plan:")
+        for user_msg, plan, llm_plan in mismatches:
+            print(f"  {user_msg!r}: rules {plan}, llm {llm_plan}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--recorded", default=str(DEFAULT_RECORDED))
+    parser.add_argument("--messages", default=str(DEFAULT_MESSAGES))
+    parser.add_argument("--users", default="data/users.csv")
+    parser.add_argument("--show-mismatches", action="store_true")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(_record(args))
+    else:
+        _compare(args)
+
+
+if __name__ == "__main__":
+    main()
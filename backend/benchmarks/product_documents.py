@@ -0,0 +1,196 @@
+"""
+Benchmark for building the product documents that are embedded for product search.
+
+Writes a synthetic catalog (products with HTML descriptions, their variants and variant
+attributes) as CSV files shaped like the ones in data/, then times:
+
+    legacy:  load every CSV and rescan all variants and attributes per product
+             (the previous nested comprehension), on the first --legacy-products only,
+             since its cost grows with products x variants
+    builder: `index_variant_attributes` + `build_product_nodes` over the streamed CSVs,
+             once stripping HTML in-process and once with a process pool
+
+and checks that both produce identical node ids and text. No embedding calls are made.
+
+Usage (from the backend directory):
+    python -m benchmarks.product_documents --products 100000 --workers 4
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from bs4 import BeautifulSoup
+from llama_index.core.schema import TextNode
+from src.utils import iter_csv_data, load_csv_data
+from src.utils.product_documents import build_product_nodes, index_variant_attributes
+
+CATEGORIES = ("headphones", "smartwatches", "tablets", "laptops", "speakers")
+COLORS = ("black", "white", "blue", "red", "green", "gray")
+
+
+def _write_catalog(directory: str, products: int, variants_per_product: int) -> None:
+    rng = random.Random(0)
+    with (
+        open(os.path.join(directory, "product.csv"), "w", newline="") as p,
+        open(os.path.join(directory, "variants.csv"), "w", newline="") as v,
+        open(os.path.join(directory, "variant_attributes.csv"), "w", newline="") as a,
+    ):
+        product_writer, variant_writer, attribute_writer = (
+            csv.writer(p),
+            csv.writer(v),
+            csv.writer(a),
+        )
+        product_writer.writerow(
+            [
+                "id",
+                "name",
+                "category",
+                "price",
+                "brand",
+                "description",
+                "specifications",
+            ],
+        )
+        variant_writer.writerow(["id", "product_id", "price", "in_stock"])
+        attribute_writer.writerow(
+            ["id", "product_id", "variant_id", "attribute_name", "attribute_value"],
+        )
+        variant_id = attribute_id = 0
+        for product_id in range(1, products + 1):
+            price = round(rng.uniform(10, 500), 2)
+            description = "".join(
+                f"<h3>Feature {i}</h3><p>Up to <b>{rng.randint(5, 60)} hours</b> of "
+                f"battery life, <i>rapid charging</i> and a lightweight design.</p>"
+                for i in range(4)
+            )
+            specifications = json.dumps(
+                {
+                    "battery_life": f"{rng.randint(5, 60)} hours",
+                    "weight": f"{rng.randint(100, 900)} g",
+                },
+            )
+            product_writer.writerow(
+                [
+                    product_id,
+                    f"Product {product_id}",
+                    rng.choice(CATEGORIES),
+                    price,
+                    "Vyron",
+                    description,
+                    specifications,
+                ],
+            )
+            for _ in range(variants_per_product):
+                variant_id += 1
+                variant_writer.writerow(
+                    [variant_id, product_id, price, rng.randint(0, 50)],
+                )
+                attribute_id += 1
+                attribute_writer.writerow(
+                    [attribute_id, product_id, variant_id, "color", rng.choice(COLORS)],
+                )
+
+
+def _legacy_nodes(directory: str, limit: int) -> List[TextNode]:
+    products = load_csv_data(os.path.join(directory, "product.csv"))[:limit]
+    variants = load_csv_data(os.path.join(directory, "variants.csv"))
+    variant_attributes = load_csv_data(
+        os.path.join(directory, "variant_attributes.csv"),
+    )
+
+    nodes = []
+    for product in products:
+        product_specifications = {}
+        product_specifications["specifications"] = product["specifications"]
+        product_specifications["description"] = BeautifulSoup(
+            product["description"],
+            "html.parser",
+        ).get_text()
+        product_specifications["category"] = product["category"]
+        product_specifications["variants"] = [
+            {
+                "attributes": ", ".join(
+                    f"{attr['attribute_name']}: {attr['attribute_value']}"
+                    for attr in variant_attributes
+                    if attr["variant_id"] == variant["id"]
+                ),
+            }
+            for variant in variants
+            if variant["product_id"] == product["id"]
+        ]
+        nodes.append(
+            TextNode(
+                id_=f"product-{product['id']}",
+                text=",".join(
+                    f"{key} : {value}" for key, value in product_specifications.items()
+                ),
+                metadata={"product_id": product["id"], "category": product["category"]},
+            ),
+        )
+    return nodes
+
+
+def _builder_nodes(directory: str, workers: int):
+    variants_by_product = index_variant_attributes(
+        iter_csv_data(os.path.join(directory, "variants.csv")),
+        iter_csv_data(os.path.join(directory, "variant_attributes.csv")),
+    )
+    return build_product_nodes(
+        iter_csv_data(os.path.join(directory, "product.csv")),
+        variants_by_product,
+        workers=workers,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--variants-per-product", type=int, default=3)
+    parser.add_argument("--legacy-products", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        _write_catalog(directory, args.products, args.variants_per_product)
+        print(
+            f"{args.products} products, {args.variants_per_product} variants each; "
+            f"legacy timed on the first {args.legacy_products}",
+        )
+        print(f"{'path':<22}{'products':>10}{'wall (s)':>10}{'products/s':>12}")
+
+        started = time.perf_counter()
+        legacy = _legacy_nodes(directory, args.legacy_products)
+        wall = time.perf_counter() - started
+        print(
+            f"{'legacy':<22}{len(legacy):>10}{wall:>10.2f}{len(legacy) / wall:>12.0f}",
+        )
+
+        for workers in (1, args.workers):
+            started = time.perf_counter()
+            built, first_node, texts = 0, None, {}
+            for node in _builder_nodes(directory, workers):
+                if first_node is None:
+                    first_node = time.perf_counter() - started
+                if built < len(legacy):
+                    texts[node.node_id] = node.text
+                built += 1
+            wall = time.perf_counter() - started
+            label = f"builder ({workers} worker{'s' if workers > 1 else ''})"
+            print(
+                f"{label:<22}{built:>10}{wall:>10.2f}{built / wall:>12.0f}"
+                f"   first node after {first_node:.2f}s",
+            )
+            assert texts == {
+                node.node_id: node.text for node in legacy
+            }, "output differs"
+        print("builder output matches legacy")
+
+
+if __name__ == "__main__":
+    main()
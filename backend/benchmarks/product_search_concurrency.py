@@ -0,0 +1,90 @@
+"""
+Concurrency benchmark for the product search retrieval path.
+
+Fires N searches at once on a single event loop, the way concurrent `/agents/query`
+requests share one uvicorn worker, and compares:
+
+    before: `index.as_retriever(...).retrieve(query)` - sync embedding call and sync
+            psycopg2 query, both blocking the event loop
+    after:  `await index.as_retriever(...).aretrieve(query)` - async embedding call and
+            asyncpg query
+
+Latencies of the embedding call and the vector query are simulated, so the benchmark
+runs offline.
+
+Usage (from the backend directory):
+    python -m benchmarks.product_search_concurrency --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.simulated import SimulatedEmbedding, SimulatedVectorStore, percentile
+from llama_index.core import VectorStoreIndex
+from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters
+
+
+def _build_retriever(embed_latency: float, db_latency: float, top_k: int):
+    index = VectorStoreIndex.from_vector_store(
+        vector_store=SimulatedVectorStore(latency=db_latency),
+        embed_model=SimulatedEmbedding(latency=embed_latency),
+    )
+    return index.as_retriever(
+        similarity_top_k=top_k,
+        filters=MetadataFilters(
+            filters=[MetadataFilter(key="category", value="headphones")],
+        ),
+    )
+
+
+async def _run(concurrency: int, use_async: bool, retriever) -> tuple[float, list]:
+    latencies = []
+    started = time.perf_counter()
+
+    async def search(query: str) -> None:
+        # Measured from the start of the burst, so queueing behind blocked calls counts.
+        if use_async:
+            await retriever.aretrieve(query)
+        else:
+            retriever.retrieve(query)
+        latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(
+        *(search(f"wireless headphones {i}") for i in range(concurrency)),
+    )
+    return time.perf_counter() - started, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--embed-latency", type=float, default=0.08)
+    parser.add_argument("--db-latency", type=float, default=0.02)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    retriever = _build_retriever(args.embed_latency, args.db_latency, args.top_k)
+
+    print(
+        f"{args.concurrency} parallel searches, embedding latency "
+        f"{args.embed_latency * 1000:.0f} ms, vector query latency "
+        f"{args.db_latency * 1000:.0f} ms",
+    )
+    print(
+        f"{'path':<22}{'wall (s)':>10}{'searches/s':>12}{'p50 (ms)':>10}{'p99 (ms)':>10}",
+    )
+    for label, use_async in (
+        ("before: retrieve()", False),
+        ("after: aretrieve()", True),
+    ):
+        wall, latencies = asyncio.run(_run(args.concurrency, use_async, retriever))
+        print(
+            f"{label:<22}{wall:>10.2f}{args.concurrency / wall:>12.1f}"
+            f"{percentile(latencies, 50) * 1000:>10.0f}"
+            f"{percentile(latencies, 99) * 1000:>10.0f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Simulated llama_index components for offline benchmarks.
+
+Each component models the latency of its production counterpart either as a blocking
+call (`time.sleep`, like psycopg2 or a sync HTTP client) or as an awaitable one
+(`asyncio.sleep`, like asyncpg or an async HTTP client).
+"""
+
+import asyncio
+import time
+from typing import Any, List
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+
+
+class SimulatedEmbedding(BaseEmbedding):
+    """Embedding model that returns a constant vector after `latency` seconds."""
+
+    latency: float = 0.08
+    dimensions: int = 8
+
+    def _vector(self) -> List[float]:
+        return [0.0] * self.dimensions
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._vector()
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return self._vector()
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._vector()
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return self._vector()
+
+
+class SimulatedVectorStore(BasePydanticVectorStore):
+    """Vector store that returns `similarity_top_k` product nodes after `latency` seconds."""
+
+    stores_text: bool = True
+    latency: float = 0.02
+
+    @property
+    def client(self) -> Any:
+        return None
+
+    def _result(self, query: VectorStoreQuery) -> VectorStoreQueryResult:
+        nodes = [
+            TextNode(id_=str(i), text=f"product {i}", metadata={"product_id": i})
+            for i in range(query.similarity_top_k)
+        ]
+        return VectorStoreQueryResult(
+            nodes=nodes,
+            similarities=[1.0] * len(nodes),
+            ids=[node.node_id for node in nodes],
+        )
+
+    def add(self, nodes: List[Any], **kwargs: Any) -> List[str]:
+        raise NotImplementedError
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        raise NotImplementedError
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        time.sleep(self.latency)
+        return self._result(query)
+
+    async def aquery(
+        self,
+        query: VectorStoreQuery,
+        **kwargs: Any,
+    ) -> VectorStoreQueryResult:
+        await asyncio.sleep(self.latency)
+        return self._result(query)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
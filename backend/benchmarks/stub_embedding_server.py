@@ -0,0 +1,223 @@
+"""
+Local stub of the Azure OpenAI embeddings endpoint for offline benchmarks.
+
+Serves `POST /openai/deployments/<deployment>/embeddings` with deterministic vectors
+derived from a hash of each input. Each request takes `base_latency_ms` plus
+`per_input_latency_ms` per input, and at most `max_concurrency` requests are processed
+at once, modelling a throughput-limited deployment. With `requests_per_second` set,
+requests beyond that rate (token bucket, burst of one second) get a 429 carrying
+`retry-after-ms` and `x-ratelimit-*` headers, like an Azure deployment over quota.
+
+Usage:
+    python -m benchmarks.stub_embedding_server --port 8765
+
+Point `AZURE_OPENAI_ENDPOINT` at `http://127.0.0.1:8765` to run the app against it.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Union
+
+
+def stub_embedding(text: str, dimensions: int) -> List[float]:
+    """Deterministic unit-length pseudo-embedding of `text`."""
+    values = []
+    counter = 0
+    while len(values) < dimensions:
+        digest = hashlib.sha256(f"{counter}:{text}".encode()).digest()
+        values.extend(v / 2**31 for v in struct.unpack(">8i", digest))
+        counter += 1
+    values = values[:dimensions]
+    norm = sum(v * v for v in values) ** 0.5 or 1.0
+    return [v / norm for v in values]
+
+
+def _encode_embedding(
+    embedding: List[float],
+    encoding_format: str,
+) -> Union[str, List[float]]:
+    # The openai client asks for base64-encoded float32 unless a format is given.
+    if encoding_format == "base64":
+        return base64.b64encode(array("f", embedding).tobytes()).decode()
+    return embedding
+
+
+class StubEmbeddingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        dimensions: int = 1536,
+        base_latency_ms: float = 50.0,
+        per_input_latency_ms: float = 0.5,
+        max_concurrency: int = 4,
+        requests_per_second: float = 0.0,
+    ) -> None:
+        super().__init__(("127.0.0.1", port), _EmbeddingsHandler)
+        self.dimensions = dimensions
+        self.base_latency_ms = base_latency_ms
+        self.per_input_latency_ms = per_input_latency_ms
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.inputs = 0
+        self.rate_limited = 0
+        self.requests_per_second = requests_per_second
+        self._tokens = requests_per_second
+        self._refilled_at = time.monotonic()
+
+    def take_request_token(self) -> float:
+        """0 if the request may proceed, otherwise seconds until a token is available."""
+        if not self.requests_per_second:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.requests_per_second,
+                self._tokens + (now - self._refilled_at) * self.requests_per_second,
+            )
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            self.rate_limited += 1
+            return (1 - self._tokens) / self.requests_per_second
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.requests = 0
+            self.inputs = 0
+            self.rate_limited = 0
+
+    def start(self) -> "StubEmbeddingServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _EmbeddingsHandler(BaseHTTPRequestHandler):
+    server: StubEmbeddingServer
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send_json(
+        self,
+        status: int,
+        payload: dict,
+        headers: Optional[dict] = None,
+    ) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        if not self.path.split("?")[0].endswith("/embeddings"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        inputs = request["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+
+        retry_after = self.server.take_request_token()
+        if retry_after:
+            retry_after_ms = max(1, round(retry_after * 1000))
+            self._send_json(
+                429,
+                {
+                    "error": {
+                        "code": "429",
+                        "message": "Requests to the embeddings operation have exceeded "
+                        "the rate limit of the stub deployment.",
+                    },
+                },
+                headers={
+                    "retry-after-ms": str(retry_after_ms),
+                    "x-ratelimit-remaining-requests": "0",
+                    "x-ratelimit-reset-requests": f"{retry_after_ms}ms",
+                },
+            )
+            return
+
+        with self.server.slots:
+            time.sleep(
+                (
+                    self.server.base_latency_ms
+                    + self.server.per_input_latency_ms * len(inputs)
+                )
+                / 1000,
+            )
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.inputs += len(inputs)
+
+        self._send_json(
+            200,
+            {
+                "object": "list",
+                "model": request.get("model", "stub"),
+                "data": [
+                    {
+                        "object": "embedding",
+                        "index": index,
+                        "embedding": _encode_embedding(
+                            stub_embedding(text, self.server.dimensions),
+                            request.get("encoding_format", "float"),
+                        ),
+                    }
+                    for index, text in enumerate(inputs)
+                ],
+                "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+            },
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--base-latency-ms", type=float, default=50.0)
+    parser.add_argument("--per-input-latency-ms", type=float, default=0.5)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--requests-per-second", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubEmbeddingServer(
+        port=args.port,
+        dimensions=args.dimensions,
+        base_latency_ms=args.base_latency_ms,
+        per_input_latency_ms=args.per_input_latency_ms,
+        max_concurrency=args.max_concurrency,
+        requests_per_second=args.requests_per_second,
+    )
+    print(f"Stub embedding server listening on {server.endpoint}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,16 @@ from .inventory_agent import get_inventory_agent
 from .planning_agent import get_planning_agent
 from .presentation_agent import get_presentation_agent
 from .product_personalization_agent import get_product_personalization_agent
-from .reviews_agent import get_reviews_agent
+from .registry import AgentRegistry
+from .reviews_agent import get_reviews_agent, review_filters
 
 __all__ = [
+    "AgentRegistry",
     "get_presentation_agent",
     "get_product_personalization_agent",
     "get_reviews_agent",
     "get_inventory_agent",
     "get_planning_agent",
     "get_evaluation_agent",
+    "review_filters",
 ]
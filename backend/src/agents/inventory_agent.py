@@ -1,3 +1,5 @@
+from typing import Optional
+
 from llama_index.core import SQLDatabase
 from llama_index.core.agent.workflow import FunctionAgent
 from llama_index.core.base.embeddings.base import BaseEmbedding
@@ -9,25 +11,31 @@ from src.config.config import settings
 from src.database import sync_engine as engine
 from src.schemas.enums import AgentNames
 
+INVENTORY_TABLES = ["variants", "variant_attributes"]
+
+
+def get_inventory_database() -> SQLDatabase:
+    """Reflects the inventory tables' schema; reuse the result, reflection hits the database."""
+    return SQLDatabase(engine=engine, include_tables=INVENTORY_TABLES)
+
 
 def get_inventory_agent(
     llm: BaseLLM,
     embed_model: BaseEmbedding,
+    sql_database: Optional[SQLDatabase] = None,
 ):
     """
     Creates FunctionAgent configured to interact with a product inventory database.
     Args:
         llm: The language model to be used for natural language processing and query generation.
+        sql_database: Inventory tables reflected by `get_inventory_database`; reflected anew if omitted.
     Returns:
         FunctionAgent: An agent configured to query product inventory information from the database.
     """
 
-    tables = ["variants", "variant_attributes"]
-
-    sql_database = SQLDatabase(engine=engine, include_tables=tables)
     query_engine_database = NLSQLTableQueryEngine(
-        sql_database=sql_database,
-        tables=tables,
+        sql_database=sql_database or get_inventory_database(),
+        tables=INVENTORY_TABLES,
         llm=llm,
         embed_model=embed_model,
         verbose=settings.VERBOSE,
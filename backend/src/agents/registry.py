@@ -0,0 +1,121 @@
+import asyncio
+from typing import Optional
+
+from llama_index.core.agent.workflow import FunctionAgent
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.base.llms.base import BaseLLM
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
+from src.agents.evaluation_agent import get_evaluation_agent
+from src.agents.inventory_agent import get_inventory_agent, get_inventory_database
+from src.agents.planning_agent import get_planning_agent
+from src.agents.presentation_agent import get_presentation_agent
+from src.agents.product_personalization_agent import get_product_personalization_agent
+from src.agents.reviews_agent import get_reviews_agent
+from src.config.llm import LLMManager
+from src.logger import logger
+from src.schemas.enums import AgentNames
+
+
+class AgentRegistry:
+    """
+    Agents for the multi-agent workflow, built once and shared by every run.
+
+    The agents hold only configuration: each `run` keeps its own context and memory, so
+    concurrent workflow runs can share them. Per-run state is passed per call, in the
+    prompt or, for the reviews agent's product filter, with `review_filters`. The
+    inventory tables are reflected once, when the registry is created.
+    """
+
+    _instance: Optional["AgentRegistry"] = None
+
+    def __init__(
+        self,
+        product_personalization_agent: FunctionAgent,
+        inventory_agent: FunctionAgent,
+        reviews_agent: FunctionAgent,
+        presentation_agent: FunctionAgent,
+        planning_agent: FunctionAgent,
+        evaluation_agent: FunctionAgent,
+    ):
+        self.product_personalization_agent = product_personalization_agent
+        self.inventory_agent = inventory_agent
+        self.reviews_agent = reviews_agent
+        self.presentation_agent = presentation_agent
+        self.planning_agent = planning_agent
+        self.evaluation_agent = evaluation_agent
+
+    @classmethod
+    async def create(
+        cls,
+        llm: BaseLLM,
+        embed_model: BaseEmbedding,
+        vector_store_reviews_embeddings: BasePydanticVectorStore,
+    ) -> "AgentRegistry":
+        sql_database = await asyncio.to_thread(get_inventory_database)
+
+        def agent_llm(agent_name: AgentNames) -> BaseLLM:
+            return LLMManager.get_agent_llm(llm, agent_name.value)
+
+        return cls(
+            product_personalization_agent=get_product_personalization_agent(
+                agent_llm(AgentNames.PRODUCT_PERSONALIZATION_AGENT),
+            ),
+            inventory_agent=get_inventory_agent(
+                agent_llm(AgentNames.INVENTORY_AGENT),
+                embed_model,
+                sql_database,
+            ),
+            reviews_agent=get_reviews_agent(
+                agent_llm(AgentNames.REVIEWS_AGENT),
+                embed_model,
+                vector_store_reviews_embeddings,
+            ),
+            presentation_agent=get_presentation_agent(
+                agent_llm(AgentNames.PRESENTATION_AGENT),
+            ),
+            planning_agent=get_planning_agent(agent_llm(AgentNames.PLANNING_AGENT)),
+            evaluation_agent=get_evaluation_agent(
+                agent_llm(AgentNames.EVALUATION_AGENT),
+            ),
+        )
+
+    def llm_cache_stats(self) -> dict:
+        """Response cache counters of each agent whose LLM calls are cached."""
+        stats = {}
+        for agent in (
+            self.product_personalization_agent,
+            self.inventory_agent,
+            self.reviews_agent,
+            self.presentation_agent,
+            self.planning_agent,
+            self.evaluation_agent,
+        ):
+            cache_stats = getattr(agent.llm, "cache_stats", None)
+            if cache_stats is not None:
+                stats[agent.name] = cache_stats()
+        return stats
+
+    @classmethod
+    async def initialize(
+        cls,
+        llm: BaseLLM,
+        embed_model: BaseEmbedding,
+        vector_store_reviews_embeddings: BasePydanticVectorStore,
+    ) -> "AgentRegistry":
+        """Creates the process-wide registry; called once from the app's lifespan."""
+        cls._instance = await cls.create(
+            llm,
+            embed_model,
+            vector_store_reviews_embeddings,
+        )
+        logger.info("Agent registry initialized")
+        return cls._instance
+
+    @classmethod
+    def get(cls) -> Optional["AgentRegistry"]:
+        """The process-wide registry, or None outside the app (e.g. in scripts)."""
+        return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._instance = None
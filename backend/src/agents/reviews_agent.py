@@ -1,22 +1,62 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
 from llama_index.core import VectorStoreIndex
 from llama_index.core.agent.workflow import FunctionAgent
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.base.llms.base import BaseLLM
+from llama_index.core.indices.vector_store.retrievers import VectorIndexRetriever
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.schema import QueryBundle
 from llama_index.core.tools import QueryEngineTool, ToolMetadata
 from llama_index.core.vector_stores.types import (
     BasePydanticVectorStore,
     MetadataFilters,
+    VectorStoreQuery,
 )
 from src.agents.prompts import REVIEWS_AGENT_PROMPT
 from src.config.config import settings
 from src.schemas.enums import AgentNames
 
+_review_filters: ContextVar[Optional[MetadataFilters]] = ContextVar(
+    "review_filters",
+    default=None,
+)
+
+
+@contextmanager
+def review_filters(filters: Optional[MetadataFilters]) -> Iterator[None]:
+    """
+    Scopes the reviews a shared reviews agent retrieves, e.g. to one product, for the
+    code run inside the block and the tasks it starts, such as a workflow run.
+    """
+    token = _review_filters.set(filters)
+    try:
+        yield
+    finally:
+        _review_filters.reset(token)
+
+
+class ScopedReviewsRetriever(VectorIndexRetriever):
+    """Retrieves with the filters set by `review_filters`, if any, instead of its own."""
+
+    def _build_vector_store_query(
+        self,
+        query_bundle_with_embeddings: QueryBundle,
+    ) -> VectorStoreQuery:
+        query = super()._build_vector_store_query(query_bundle_with_embeddings)
+        scoped_filters = _review_filters.get()
+        if scoped_filters is not None:
+            query.filters = scoped_filters
+        return query
+
 
 def get_reviews_agent(
     llm: BaseLLM,
     embed_model: BaseEmbedding,
     vector_store: BasePydanticVectorStore,
-    filters: MetadataFilters,
+    filters: Optional[MetadataFilters] = None,
 ):
 
     index = VectorStoreIndex.from_vector_store(
@@ -24,12 +64,17 @@ def get_reviews_agent(
         embed_model=embed_model,
     )
 
-    query_engine = index.as_query_engine(
+    retriever = ScopedReviewsRetriever(
+        index,
         similarity_top_k=settings.TOP_K,
+        filters=filters,
         verbose=settings.VERBOSE,
-        use_async=True,
+    )
+    query_engine = RetrieverQueryEngine.from_args(
+        retriever,
         llm=llm,
-        filters=filters,
+        use_async=True,
+        verbose=settings.VERBOSE,
     )
 
     query_engine_tools = [
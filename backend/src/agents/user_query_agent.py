@@ -1,11 +1,9 @@
 import asyncio
 from typing import Optional
 
-from fastapi import BackgroundTasks
 from llama_index.core.agent.workflow import FunctionAgent
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.llms.function_calling import FunctionCallingLLM
-from llama_index.core.memory.types import BaseMemory
 from llama_index.core.tools import FunctionTool
 from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters
 from openinference.instrumentation.llama_index import get_current_span
@@ -16,6 +14,8 @@ from src.config.config import settings
 from src.logger import logger
 from src.schemas.enums import AgentNames, EventType, StatusEnum, UserQueryAgentAction
 from src.services.agent_workflow import MultiAgentWorkflowService
+from src.services.memory import UserMemoryService
+from src.services.personalization_queue import PersonalizationJobQueue
 from src.services.product_search import product_search
 from src.utils import get_user_session_key
 from src.utils.utils import convert_trace_id_to_hex, set_personalization_status
@@ -28,11 +28,11 @@ class UserQueryAgent:
         db: AsyncSession,
         user_query: str,
         user_id: int,
-        memory: BaseMemory,
+        memory: UserMemoryService,
         llm: FunctionCallingLLM,
         embed_model: BaseEmbedding,
         message_queue: asyncio.Queue,
-        background_tasks: BackgroundTasks,
+        job_queue: PersonalizationJobQueue,
         vector_store_products_embeddings: BaseEmbedding,
         vector_store_reviews_embeddings: BaseEmbedding,
         product_id: Optional[int] = None,
@@ -41,7 +41,7 @@ class UserQueryAgent:
         self.user_query = user_query
         self.user_id = user_id
         self.product_id = product_id
-        self.background_tasks = background_tasks
+        self.job_queue = job_queue
 
         self.llm = llm
         self.embed_model = embed_model
@@ -169,12 +169,8 @@ class UserQueryAgent:
             self.db,
             self.user_id,
             product_ids,
-            self.llm,
-            self.embed_model,
-            self.memory,
-            self.vector_store_products_embeddings,
-            self.vector_store_reviews_embeddings,
-            self.background_tasks,
+            self.job_queue,
+            viewing_product_id=self.product_id,
         )
 
     async def query_reviews_with_sentiment(
@@ -255,12 +251,8 @@ class UserQueryAgent:
             self.db,
             self.user_id,
             product_ids,
-            self.llm,
-            self.embed_model,
-            self.memory,
-            self.vector_store_products_embeddings,
-            self.vector_store_reviews_embeddings,
-            self.background_tasks,
+            self.job_queue,
+            viewing_product_id=self.product_id,
         )
 
     async def get_feature(self, feature_name: str) -> Optional[tuple[int, str]]:
@@ -1,3 +1,5 @@
+from typing import Dict, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,6 +23,7 @@ class Settings(BaseSettings):
     AZURE_API_VERSION_EMBEDDING_MODEL: str
     DB_EMBEDDING_TABLE_FOR_PRODUCTS: str
     DB_EMBEDDING_TABLE_FOR_REVIEWS: str
+    DB_EMBEDDING_SCHEMA: str = "public"
     # AZURE_COGNITIVE_KEY: str
     # AZURE_COGNITIVE_ENDPOINT: str
     # AZURE_COGNITIVE_REGION: str
@@ -33,6 +36,22 @@ class Settings(BaseSettings):
     MEM0_AZURE_OPENAI_MAX_TOKENS: int = 2000
     MEM0_AZURE_OPENAI_TEMPERATURE: float = 0.1
 
+    DISKANN_MAX_NEIGHBORS: int = 32
+    DISKANN_L_VALUE_IB: int = 128
+    DISKANN_PQ_NUM_CHUNKS: int = 128
+    DISKANN_L_VALUE_IS: float = 64.0
+    DISKANN_QUANTIZED_FETCH_LIMIT: int = 50
+    VECTOR_STORAGE: str = "halfvec"
+    VECTOR_SEARCH_RERANK: bool = True
+    VECTOR_SEARCH_EXACT_THRESHOLD: int = 200
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_SEARCH_SPARSE_TOP_K: int = 10
+    HYBRID_SEARCH_RRF_K: int = 60
+    TEXT_SEARCH_CONFIG: str = "english"
+    VECTOR_SEARCH_TUNING_FILE: str = ""
+    VECTOR_SEARCH_RECALL_TARGET: float = 0.95
+    VECTOR_SEARCH_RECALL_TARGETS: Dict[str, float] = {}
+
     PAGE_SIZE: int = 10
     TOP_K: int = 20
     PRODUCT_SEARCH_RESPONSE_SIZE: int = 8
@@ -40,7 +59,57 @@ class Settings(BaseSettings):
     REVIEW_AGENT_TIMEOUT: int = 60
     PRODUCT_PERSONALIZATION_AGENT_TIMEOUT: int = 60
     PRESENTATION_AGENT_TIMEOUT: int = 60
+    # "rules": rule-based planner with the planning agent as fallback; "llm": agent only
+    WORKFLOW_PLANNER: str = "rules"
+    # Agents started alongside the LLM planner, by plan name; runs the plan skips are cancelled
+    WORKFLOW_SPECULATIVE_AGENTS: list[str] = ["product_personalization", "reviews"]
     SQLALCHEMY_CONNECTION_POOL_SIZE: int = 20
+    DB_POOL_APP_MAX_OVERFLOW: int = 10
+    DB_POOL_SYNC_SIZE: int = 5
+    DB_POOL_SYNC_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_PGBOUNCER_MODE: bool = False
+
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_BYTES: int = 32 * 1024 * 1024
+    EMBEDDING_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    EMBEDDING_CACHE_MAX_ROWS: int = 100_000
+
+    LLM_CACHE_ENABLED: bool = True
+    # Agents whose LLM calls are cached, by AgentNames value
+    LLM_CACHE_AGENTS: list[str] = [
+        "planning_agent",
+        "evaluation_agent",
+        "presentation_agent",
+    ]
+    LLM_CACHE_MEMORY_BYTES: int = 8 * 1024 * 1024
+    LLM_CACHE_TTL_SECONDS: int = 24 * 3600
+    LLM_CACHE_MAX_ROWS: int = 50_000
+
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 20.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+
+    EMBEDDING_INGEST_BATCH_SIZE: int = 100
+    EMBEDDING_INGEST_CONCURRENCY: int = 4
+    EMBEDDING_INGEST_MAX_CONCURRENCY: int = 16
+    EMBEDDING_INGEST_MAX_RETRIES: int = 8
+    PRODUCT_DOCUMENT_WORKERS: int = 4
+
+    MEMORY_MAX_WORKERS: int = 4
+    MEMORY_PREFERENCES_CACHE_TTL_SECONDS: float = 300.0
+    MEMORY_PREFERENCES_CACHE_MAX_USERS: int = 10_000
+
+    PERSONALIZATION_WORKERS: int = 4
+    PERSONALIZATION_JOB_VISIBILITY_TIMEOUT_SECONDS: float = 180.0
+    PERSONALIZATION_JOB_MAX_ATTEMPTS: int = 3
+    PERSONALIZATION_JOB_RETRY_BACKOFF_SECONDS: float = 5.0
+    PERSONALIZATION_JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    PERSONALIZATION_WAIT_TIMEOUT_SECONDS: float = 60.0
+    PERSONALIZATION_WAIT_RECHECK_SECONDS: float = 10.0
+    # Direct Postgres URL for LISTEN, when the app connects through PgBouncer
+    PERSONALIZATION_NOTIFY_DATABASE_URL: Optional[str] = None
 
     APP_VERSION: str = "0.1.0"
     DEBUG: bool = False
@@ -1,16 +1,50 @@
+from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
 from src.config.config import settings
+from src.database import Session
+from src.llama_index.embeddings.batching import MicroBatchingEmbedding
+from src.llama_index.embeddings.cached import CachedQueryEmbedding
 
 
 class EmbedModelManager:
 
     @classmethod
-    async def get_embed_model(cls) -> AzureOpenAIEmbedding:
+    async def get_embed_model(
+        cls,
+        use_query_cache: bool = settings.EMBEDDING_CACHE_ENABLED,
+        use_micro_batching: bool = settings.EMBEDDING_BATCH_ENABLED,
+        max_retries: int = 10,
+    ) -> BaseEmbedding:
 
-        return AzureOpenAIEmbedding(
+        embed_model = AzureOpenAIEmbedding(
             model=settings.EMBEDDING_MODEL,
             deployment_name=settings.EMBEDDING_MODEL,
             api_key=settings.AZURE_OPENAI_API_KEY,
             azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
             api_version=settings.AZURE_API_VERSION_EMBEDDING_MODEL,
+            max_retries=max_retries,
+        )
+        if max_retries == 0:
+            # AzureOpenAIEmbedding applies max_retries to its own retry loop only; its
+            # openai clients would still retry twice, hiding 429s from the caller
+            embed_model._client = embed_model._get_client().with_options(max_retries=0)
+            embed_model._aclient = embed_model._get_aclient().with_options(
+                max_retries=0,
+            )
+        if use_micro_batching:
+            embed_model = MicroBatchingEmbedding(
+                embed_model=embed_model,
+                window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+                max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            )
+        if not use_query_cache:
+            return embed_model
+
+        return CachedQueryEmbedding(
+            embed_model=embed_model,
+            session_factory=Session,
+            max_memory_bytes=settings.EMBEDDING_CACHE_MEMORY_BYTES,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+            max_rows=settings.EMBEDDING_CACHE_MAX_ROWS,
         )
@@ -1,5 +1,8 @@
+from llama_index.core.llms.function_calling import FunctionCallingLLM
 from llama_index.llms.azure_openai import AzureOpenAI
 from src.config.config import settings
+from src.database import Session
+from src.llama_index.llms.cached import CachedLLM
 
 
 class LLMManager:
@@ -14,3 +17,24 @@ class LLMManager:
             azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
             api_version=settings.AZURE_API_VERSION_LLM,
         )
+
+    @classmethod
+    def get_agent_llm(
+        cls,
+        llm: FunctionCallingLLM,
+        agent_name: str,
+    ) -> FunctionCallingLLM:
+        """`llm`, with its responses cached if the agent opted in via LLM_CACHE_AGENTS."""
+        if (
+            not settings.LLM_CACHE_ENABLED
+            or agent_name not in settings.LLM_CACHE_AGENTS
+        ):
+            return llm
+        return CachedLLM(
+            llm=llm,
+            session_factory=Session,
+            cache_name=agent_name,
+            max_memory_bytes=settings.LLM_CACHE_MEMORY_BYTES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            max_rows=settings.LLM_CACHE_MAX_ROWS,
+        )
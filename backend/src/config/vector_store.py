@@ -1,11 +1,53 @@
 from src.config.config import settings
+from src.database import PoolRole, pools
 from src.llama_index.vector_stores.pgdiskann import PGDiskAnnVectorStore
+from src.llama_index.vector_stores.pgdiskann.tuning import tuned_search_params
+
+# Metadata keys filtered on by each embedding table, stored as indexed columns
+PROMOTED_FILTER_COLUMNS = {
+    settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS: {
+        "product_id": "bigint",
+        "category": "varchar",
+    },
+    settings.DB_EMBEDDING_TABLE_FOR_REVIEWS: {"product_id": "bigint"},
+}
+
+# Embedding tables with a full-text column for hybrid (lexical + vector) queries
+HYBRID_SEARCH_TABLES = {settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS}
 
 
 class VectorStoreManager:
 
+    @classmethod
+    def get_search_params(cls, db_embedding_table_name: str) -> dict:
+        """
+        Query-time pg_diskann params for a table: the cheapest tuned settings meeting the
+        table's recall target when a tuning file is configured, the defaults otherwise.
+        Tuning drops the full-precision re-rank when index order alone meets the target.
+        """
+        search_params = {
+            "diskann_l_value_is": settings.DISKANN_L_VALUE_IS,
+            "quantized_fetch_limit": settings.DISKANN_QUANTIZED_FETCH_LIMIT,
+            "use_reranking": settings.VECTOR_SEARCH_RERANK,
+        }
+        if settings.VECTOR_SEARCH_TUNING_FILE:
+            recall_target = settings.VECTOR_SEARCH_RECALL_TARGETS.get(
+                db_embedding_table_name,
+                settings.VECTOR_SEARCH_RECALL_TARGET,
+            )
+            search_params.update(
+                tuned_search_params(
+                    settings.VECTOR_SEARCH_TUNING_FILE,
+                    db_embedding_table_name,
+                    recall_target,
+                )
+                or {},
+            )
+        return search_params
+
     @classmethod
     async def get_vector_store(cls, db_embedding_table_name) -> PGDiskAnnVectorStore:
+        search_params = cls.get_search_params(db_embedding_table_name)
         return PGDiskAnnVectorStore.from_params(
             database=settings.DB_NAME,
             host=settings.DB_HOST,
@@ -13,15 +55,23 @@ class VectorStoreManager:
             port=settings.DB_PORT,
             user=settings.DB_USER,
             table_name=db_embedding_table_name,
+            schema_name=settings.DB_EMBEDDING_SCHEMA,
+            engine=pools.get_engine(PoolRole.SYNC),
+            async_engine=pools.get_async_engine(PoolRole.APP),
             embed_dim=1536,
-            use_reranking=True,
+            use_reranking=search_params.pop("use_reranking"),
+            storage=settings.VECTOR_STORAGE,
+            hybrid_search=db_embedding_table_name in HYBRID_SEARCH_TABLES,
+            text_search_config=settings.TEXT_SEARCH_CONFIG,
+            hybrid_rrf_k=settings.HYBRID_SEARCH_RRF_K,
+            exact_search_threshold=settings.VECTOR_SEARCH_EXACT_THRESHOLD,
+            promoted_columns=PROMOTED_FILTER_COLUMNS.get(db_embedding_table_name),
             pgdiskann_kwargs={
-                "diskann_max_neighbors": 32,
-                "diskann_l_value_ib": 128,
-                "pq_param_num_chunks": 128,
+                "diskann_max_neighbors": settings.DISKANN_MAX_NEIGHBORS,
+                "diskann_l_value_ib": settings.DISKANN_L_VALUE_IB,
+                "pq_param_num_chunks": settings.DISKANN_PQ_NUM_CHUNKS,
                 "product_quantized": True,
-                "diskann_dist_method": "vector_cosine_ops",
-                "diskann_l_value_is": 64.0,
-                "quantized_fetch_limit": 50,
+                "diskann_dist_method": f"{settings.VECTOR_STORAGE}_cosine_ops",
+                **search_params,
             },
         )
@@ -1,24 +1,179 @@
+import threading
+import time
 import traceback
-from typing import AsyncGenerator
+import uuid
+from enum import Enum
+from typing import AsyncGenerator, Dict, Optional
 
-from sqlalchemy import create_engine, event
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from src.config.config import settings
 from src.logger import logger
 
-sync_engine = create_engine(
-    settings.get_database_url(is_async=False),
-    pool_size=settings.SQLALCHEMY_CONNECTION_POOL_SIZE,
-    echo=False,
-)
+
+class PoolRole(str, Enum):
+    """Connection pools a worker may open; each has its own size limits."""
+
+    APP = "app"  # async: request handlers, vector store queries, caches
+    SYNC = "sync"  # sync: inventory SQL agent, vector store setup and sync calls
+
+
+class PoolWaitStats:
+    """Time spent waiting for a connection to be checked out of a pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def record(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            self.timeouts += int(timed_out)
+
+    def as_dict(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": (
+                self.total_wait_seconds / self.checkouts * 1000
+                if self.checkouts
+                else 0.0
+            ),
+            "max_wait_ms": self.max_wait_seconds * 1000,
+            "timeouts": self.timeouts,
+        }
+
+
+class _WaitTimingPoolMixin:
+    # Set on the per-role subclass, so it survives `Pool.recreate()` on dispose
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return entry
+
+
+def _timed_pool_class(base: type, wait_stats: PoolWaitStats) -> type:
+    return type(
+        f"WaitTimed{base.__name__}",
+        (_WaitTimingPoolMixin, base),
+        {"wait_stats": wait_stats},
+    )
+
+
+class PoolRegistry:
+    """
+    Owns every SQLAlchemy engine of the worker, one per `PoolRole`.
+
+    Components borrow engines from the registry instead of creating their own, so the
+    number of Postgres connections per worker is bounded by the per-role pool size and
+    max overflow settings. With `DB_PGBOUNCER_MODE`
+    enabled, asyncpg is configured not to cache server-side prepared statements, which
+    PgBouncer in transaction pooling mode cannot route.
+    """
+
+    def __init__(self) -> None:
+        self._engines: Dict[PoolRole, Engine] = {}
+        self._async_engines: Dict[PoolRole, AsyncEngine] = {}
+
+    @staticmethod
+    def _pool_limits(role: PoolRole) -> dict:
+        pool_size, max_overflow = {
+            PoolRole.APP: (
+                settings.SQLALCHEMY_CONNECTION_POOL_SIZE,
+                settings.DB_POOL_APP_MAX_OVERFLOW,
+            ),
+            PoolRole.SYNC: (
+                settings.DB_POOL_SYNC_SIZE,
+                settings.DB_POOL_SYNC_MAX_OVERFLOW,
+            ),
+        }[role]
+        return {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        }
+
+    def get_engine(self, role: PoolRole = PoolRole.SYNC) -> Engine:
+        if role not in self._engines:
+            self._engines[role] = create_engine(
+                settings.get_database_url(is_async=False),
+                poolclass=_timed_pool_class(QueuePool, PoolWaitStats()),
+                echo=False,
+                **self._pool_limits(role),
+            )
+        return self._engines[role]
+
+    def get_async_engine(self, role: PoolRole = PoolRole.APP) -> AsyncEngine:
+        if role not in self._async_engines:
+            connect_args = {}
+            if settings.DB_PGBOUNCER_MODE:
+                connect_args = {
+                    "statement_cache_size": 0,
+                    "prepared_statement_cache_size": 0,
+                    # Unique names, so unnamed statements never collide across clients
+                    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+                }
+            self._async_engines[role] = create_async_engine(
+                settings.get_database_url(is_async=True),
+                poolclass=_timed_pool_class(AsyncAdaptedQueuePool, PoolWaitStats()),
+                connect_args=connect_args,
+                echo=False,
+                **self._pool_limits(role),
+            )
+        return self._async_engines[role]
+
+    def stats(self) -> dict:
+        """Current occupancy and checkout wait times of every open pool."""
+        engines = {
+            role.value: async_engine.sync_engine
+            for role, async_engine in self._async_engines.items()
+        }
+        for role, engine in self._engines.items():
+            engines[f"{role.value}_sync" if role.value in engines else role.value] = (
+                engine
+            )
+        stats = {}
+        for name, engine in engines.items():
+            pool = engine.pool
+            stats[name] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "idle": pool.checkedin(),
+                **pool.wait_stats.as_dict(),
+            }
+        return stats
+
+    async def dispose(self, role: Optional[PoolRole] = None) -> None:
+        """Close the pooled connections of `role`, or of every pool."""
+        for engine_role, engine in self._engines.items():
+            if role in (None, engine_role):
+                engine.dispose()
+        for engine_role, async_engine in self._async_engines.items():
+            if role in (None, engine_role):
+                await async_engine.dispose()
+
+
+pools = PoolRegistry()
+
+sync_engine = pools.get_engine(PoolRole.SYNC)
 
 # Create asynchronous engine and session
-engine = create_async_engine(
-    settings.get_database_url(is_async=True),
-    pool_size=settings.SQLALCHEMY_CONNECTION_POOL_SIZE,
-    echo=False,
-)
+engine = pools.get_async_engine(PoolRole.APP)
 Session = sessionmaker(
     bind=engine,
     class_=AsyncSession,
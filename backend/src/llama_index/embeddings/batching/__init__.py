@@ -0,0 +1,3 @@
+from src.llama_index.embeddings.batching.base import MicroBatchingEmbedding
+
+__all__ = ["MicroBatchingEmbedding"]
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from typing import Any, List, Optional, Set, Tuple
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+_logger = logging.getLogger(__name__)
+
+_PendingRequest = Tuple[str, asyncio.Future]
+
+
+class MicroBatchingEmbedding(BaseEmbedding):
+    """
+    Coalesces concurrent async query embedding calls into batched embedding requests.
+
+    The first call opens a batch window; every call arriving within `window_ms` of the
+    previous one joins the batch, up to `max_wait_ms` after the first call or until
+    `max_batch_size` queries are pending, whichever comes first. The batch is then sent
+    to the wrapped model as a single `_aget_text_embeddings` request and the vectors are
+    fanned back out to the waiting callers. Identical queries within a batch are
+    embedded once.
+
+    Batched queries are embedded with the wrapped model's text embedding call, which is
+    the same endpoint as query embedding for OpenAI/Azure OpenAI embedding models.
+    Sync calls and text embeddings pass through unbatched.
+    """
+
+    window_ms: float
+    max_wait_ms: float
+    max_batch_size: int
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _pending: List[_PendingRequest] = PrivateAttr(default_factory=list)
+    _batch_opened_at: float = PrivateAttr(default=0.0)
+    _flush_handle: Optional[asyncio.TimerHandle] = PrivateAttr(default=None)
+    _inflight: Set[asyncio.Task] = PrivateAttr(default_factory=set)
+    _requests: int = PrivateAttr(default=0)
+    _batches: int = PrivateAttr(default=0)
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        window_ms: float = 5.0,
+        max_wait_ms: float = 20.0,
+        max_batch_size: int = 64,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            window_ms=window_ms,
+            max_wait_ms=max_wait_ms,
+            max_batch_size=max_batch_size,
+            **kwargs,
+        )
+        self._embed_model = embed_model
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "MicroBatchingEmbedding"
+
+    def batch_stats(self) -> dict:
+        return {
+            "requests": self._requests,
+            "batches": self._batches,
+            "avg_batch_size": self._requests / self._batches if self._batches else 0.0,
+        }
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        deadline = min(
+            loop.time() + self.window_ms / 1000,
+            self._batch_opened_at + self.max_wait_ms / 1000,
+        )
+        self._flush_handle = loop.call_at(deadline, self._flush)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._embed_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _embed_batch(self, batch: List[_PendingRequest]) -> None:
+        texts = list(dict.fromkeys(query for query, _ in batch))
+        self._requests += len(batch)
+        self._batches += 1
+        try:
+            embeddings = await self._embed_model._aget_text_embeddings(texts)
+        except Exception as exc:
+            _logger.warning(
+                f"Batched embedding request of {len(texts)} queries failed: {exc}",
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            by_text = dict(zip(texts, embeddings))
+            for query, future in batch:
+                if not future.done():
+                    future.set_result(by_text[query])
+        finally:
+            # Cancelled, e.g. on shutdown: callers must not wait forever
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            self._batch_opened_at = loop.time()
+        self._pending.append((query, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        else:
+            self._schedule_flush(loop)
+        return await future
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed_model.get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed_model.get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return await self._embed_model.aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_model.get_text_embedding_batch(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self._embed_model.aget_text_embedding_batch(texts)
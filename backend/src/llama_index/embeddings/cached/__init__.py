@@ -0,0 +1,3 @@
+from src.llama_index.embeddings.cached.base import CachedQueryEmbedding
+
+__all__ = ["CachedQueryEmbedding"]
@@ -0,0 +1,218 @@
+import logging
+import sys
+import unicodedata
+from array import array
+from datetime import timedelta
+from typing import Any, Callable, List, Optional
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+from src.models.embedding_cache import QueryEmbeddingCache
+from src.utils.cache import ByteBoundedLRUCache
+
+_logger = logging.getLogger(__name__)
+
+
+def _sizeof_embedding(embedding: array) -> int:
+    return sys.getsizeof(embedding)
+
+
+class CachedQueryEmbedding(BaseEmbedding):
+    """
+    Two-tier query embedding cache in front of another embedding model.
+
+    Query embeddings are looked up by normalized query text, first in an in-process
+    LRU bounded by bytes and then in the `query_embedding_cache` Postgres table, which
+    is shared by all uvicorn workers. On a miss the wrapped model embeds the normalized
+    query and both tiers are filled.
+
+    Postgres rows expire `ttl_seconds` after they were written, and each model keeps at
+    most `max_rows` rows; the least recently accessed rows are pruned after every
+    `prune_every` writes. Postgres errors are logged and treated as misses, so the
+    cache never fails a search.
+
+    Only query embeddings are cached; text embeddings (ingestion) and the sync
+    `get_query_embedding` path use the in-process tier only.
+    """
+
+    ttl_seconds: int
+    max_rows: int
+    prune_every: int
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _session_factory: Callable[[], AsyncSession] = PrivateAttr()
+    _memory: ByteBoundedLRUCache[array] = PrivateAttr()
+    _db_hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+    _db_evictions: int = PrivateAttr(default=0)
+    _db_errors: int = PrivateAttr(default=0)
+    _writes: int = PrivateAttr(default=0)
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        session_factory: Callable[[], AsyncSession],
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: int = 30 * 24 * 3600,
+        max_rows: int = 100_000,
+        prune_every: int = 500,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            ttl_seconds=ttl_seconds,
+            max_rows=max_rows,
+            prune_every=prune_every,
+            **kwargs,
+        )
+        self._embed_model = embed_model
+        self._session_factory = session_factory
+        self._memory = ByteBoundedLRUCache(max_memory_bytes, _sizeof_embedding)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedQueryEmbedding"
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Case-fold, NFKC-normalize and collapse whitespace, so trivial variants share an entry."""
+        return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+    def cache_stats(self) -> dict:
+        """Counters for both tiers; `misses` are calls that reached the embedding model."""
+        memory = self._memory.stats()
+        return {
+            "memory": memory,
+            "postgres": {
+                "hits": self._db_hits,
+                "evictions": self._db_evictions,
+                "errors": self._db_errors,
+            },
+            "hits": memory["hits"] + self._db_hits,
+            "misses": self._misses,
+        }
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    async def _load(self, query: str) -> Optional[List[float]]:
+        stmt = (
+            update(QueryEmbeddingCache)
+            .where(
+                QueryEmbeddingCache.model == self.model_name,
+                QueryEmbeddingCache.query == query,
+                QueryEmbeddingCache.created_at
+                > func.now() - timedelta(seconds=self.ttl_seconds),
+            )
+            .values(
+                hits=QueryEmbeddingCache.hits + 1,
+                last_accessed_at=func.now(),
+            )
+            .returning(QueryEmbeddingCache.embedding)
+        )
+        try:
+            async with self._session_factory() as session:
+                embedding = (await session.execute(stmt)).scalar_one_or_none()
+                await session.commit()
+        except SQLAlchemyError as exc:
+            self._db_errors += 1
+            _logger.warning(f"Query embedding cache lookup failed: {exc}")
+            return None
+        return embedding
+
+    async def _store(self, query: str, embedding: List[float]) -> None:
+        stmt = insert(QueryEmbeddingCache).values(
+            model=self.model_name,
+            query=query,
+            embedding=embedding,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[QueryEmbeddingCache.model, QueryEmbeddingCache.query],
+            set_={
+                "embedding": stmt.excluded.embedding,
+                "created_at": func.now(),
+                "last_accessed_at": func.now(),
+            },
+        )
+        try:
+            async with self._session_factory() as session:
+                await session.execute(stmt)
+                await session.commit()
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                await self.aprune()
+        except SQLAlchemyError as exc:
+            self._db_errors += 1
+            _logger.warning(f"Query embedding cache write failed: {exc}")
+
+    async def aprune(self) -> int:
+        """Delete expired rows and the least recently accessed rows beyond `max_rows`."""
+        expired = delete(QueryEmbeddingCache).where(
+            QueryEmbeddingCache.model == self.model_name,
+            QueryEmbeddingCache.created_at
+            <= func.now() - timedelta(seconds=self.ttl_seconds),
+        )
+        overflow = (
+            select(QueryEmbeddingCache.query)
+            .where(QueryEmbeddingCache.model == self.model_name)
+            .order_by(QueryEmbeddingCache.last_accessed_at.desc())
+            .offset(self.max_rows)
+        )
+        least_recent = delete(QueryEmbeddingCache).where(
+            QueryEmbeddingCache.model == self.model_name,
+            QueryEmbeddingCache.query.in_(overflow.scalar_subquery()),
+        )
+        async with self._session_factory() as session:
+            deleted = (await session.execute(expired)).rowcount
+            deleted += (await session.execute(least_recent)).rowcount
+            await session.commit()
+        self._db_evictions += deleted
+        if deleted:
+            _logger.info(f"Pruned {deleted} rows from the query embedding cache")
+        return deleted
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        key = self.normalize_query(query)
+        cached = self._memory.get(key)
+        if cached is not None:
+            return cached.tolist()
+
+        embedding = await self._load(key)
+        if embedding is not None:
+            self._db_hits += 1
+        else:
+            self._misses += 1
+            embedding = await self._embed_model.aget_query_embedding(key)
+            await self._store(key, embedding)
+
+        self._memory.put(key, array("f", embedding))
+        return list(embedding)
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        key = self.normalize_query(query)
+        cached = self._memory.get(key)
+        if cached is not None:
+            return cached.tolist()
+
+        self._misses += 1
+        embedding = self._embed_model.get_query_embedding(key)
+        self._memory.put(key, array("f", embedding))
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed_model.get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return await self._embed_model.aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_model.get_text_embedding_batch(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self._embed_model.aget_text_embedding_batch(texts)
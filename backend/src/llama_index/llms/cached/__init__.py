@@ -0,0 +1,3 @@
+from src.llama_index.llms.cached.base import CachedLLM
+
+__all__ = ["CachedLLM"]
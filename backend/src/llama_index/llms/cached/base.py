@@ -0,0 +1,412 @@
+import hashlib
+import json
+import logging
+import sys
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseAsyncGen,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseAsyncGen,
+    CompletionResponseGen,
+    LLMMetadata,
+)
+from llama_index.core.bridge.pydantic import BaseModel, PrivateAttr
+from llama_index.core.llms.function_calling import FunctionCallingLLM
+from llama_index.core.llms.llm import ToolSelection
+from openai.types.chat import ChatCompletionMessageToolCall
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+from src.models.llm_cache import LLMResponseCache
+from src.utils.cache import ByteBoundedLRUCache
+
+_logger = logging.getLogger(__name__)
+
+
+def _tool_call_dict(tool_call: Any) -> dict:
+    # Streamed (ChoiceDeltaToolCall) and complete tool calls hash and store alike
+    return {
+        "id": tool_call.id,
+        "type": tool_call.type,
+        "function": {
+            "name": tool_call.function.name,
+            "arguments": tool_call.function.arguments,
+        },
+    }
+
+
+def _message_dict(message: ChatMessage) -> dict:
+    additional_kwargs = dict(message.additional_kwargs)
+    if additional_kwargs.get("tool_calls"):
+        additional_kwargs["tool_calls"] = [
+            _tool_call_dict(tool_call) for tool_call in additional_kwargs["tool_calls"]
+        ]
+    return {
+        "role": message.role.value,
+        "content": message.content,
+        "additional_kwargs": additional_kwargs,
+    }
+
+
+def _restore_message(data: dict) -> ChatMessage:
+    additional_kwargs = dict(data["additional_kwargs"])
+    if additional_kwargs.get("tool_calls"):
+        additional_kwargs["tool_calls"] = [
+            ChatCompletionMessageToolCall.model_validate(tool_call)
+            for tool_call in additional_kwargs["tool_calls"]
+        ]
+    return ChatMessage(
+        role=data["role"],
+        content=data["content"],
+        additional_kwargs=additional_kwargs,
+    )
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+class CachedLLM(FunctionCallingLLM):
+    """
+    Two-tier response cache in front of a function calling LLM.
+
+    Chat responses are keyed by a sha256 of the canonical request: model, messages
+    (including the system prompt), tool specs and choice, and the sampling parameters.
+    They are looked up first in an in-process LRU bounded by bytes and then in the
+    `llm_response_cache` Postgres table, which is shared by all uvicorn workers.
+
+    Tool preparation and tool call parsing are delegated to the wrapped LLM, and cached
+    tool calls are restored as OpenAI tool calls, so `FunctionAgent` handles a cached
+    response like a live one. A cached streamed response is replayed as a single chunk.
+
+    Postgres rows expire `ttl_seconds` after they were written and at most `max_rows`
+    rows are kept; the least recently accessed rows are pruned after every
+    `prune_every` writes. Postgres errors are logged and treated as misses. Completion
+    calls and sync streaming pass through uncached.
+    """
+
+    cache_name: str
+    ttl_seconds: int
+    max_rows: int
+    prune_every: int
+
+    _llm: FunctionCallingLLM = PrivateAttr()
+    _session_factory: Callable[[], AsyncSession] = PrivateAttr()
+    _memory: ByteBoundedLRUCache[str] = PrivateAttr()
+    _db_hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+    _db_evictions: int = PrivateAttr(default=0)
+    _db_errors: int = PrivateAttr(default=0)
+    _writes: int = PrivateAttr(default=0)
+
+    def __init__(
+        self,
+        llm: FunctionCallingLLM,
+        session_factory: Callable[[], AsyncSession],
+        cache_name: str = "default",
+        max_memory_bytes: int = 8 * 1024 * 1024,
+        ttl_seconds: int = 24 * 3600,
+        max_rows: int = 50_000,
+        prune_every: int = 500,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            callback_manager=llm.callback_manager,
+            cache_name=cache_name,
+            ttl_seconds=ttl_seconds,
+            max_rows=max_rows,
+            prune_every=prune_every,
+            **kwargs,
+        )
+        self._llm = llm
+        self._session_factory = session_factory
+        self._memory = ByteBoundedLRUCache(max_memory_bytes, sys.getsizeof)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedLLM"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return self._llm.metadata
+
+    def cache_stats(self) -> dict:
+        """Counters for both tiers; `misses` are calls that reached the LLM."""
+        memory = self._memory.stats()
+        hits = memory["hits"] + self._db_hits
+        return {
+            "memory": memory,
+            "postgres": {
+                "hits": self._db_hits,
+                "evictions": self._db_evictions,
+                "errors": self._db_errors,
+            },
+            "hits": hits,
+            "misses": self._misses,
+            "hit_rate": hits / (hits + self._misses) if hits + self._misses else 0.0,
+        }
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def _cache_key(
+        self,
+        messages: Sequence[ChatMessage],
+        kwargs: Dict[str, Any],
+    ) -> str:
+        request = {
+            "model": self.metadata.model_name,
+            "temperature": getattr(self._llm, "temperature", None),
+            "max_tokens": getattr(self._llm, "max_tokens", None),
+            "additional_kwargs": getattr(self._llm, "additional_kwargs", None),
+            "messages": [_message_dict(message) for message in messages],
+            # tools, tool_choice, parallel_tool_calls, ...
+            "kwargs": kwargs,
+        }
+        canonical = json.dumps(
+            request,
+            sort_keys=True,
+            separators=(",", ":"),
+            default=_jsonable,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    async def _load(self, key: str) -> Optional[dict]:
+        stmt = (
+            update(LLMResponseCache)
+            .where(
+                LLMResponseCache.key == key,
+                LLMResponseCache.created_at
+                > func.now() - timedelta(seconds=self.ttl_seconds),
+            )
+            .values(hits=LLMResponseCache.hits + 1, last_accessed_at=func.now())
+            .returning(LLMResponseCache.response)
+        )
+        try:
+            async with self._session_factory() as session:
+                response = (await session.execute(stmt)).scalar_one_or_none()
+                await session.commit()
+        except SQLAlchemyError as exc:
+            self._db_errors += 1
+            _logger.warning(f"LLM response cache lookup failed: {exc}")
+            return None
+        return response
+
+    async def _store(self, key: str, response: dict) -> None:
+        stmt = insert(LLMResponseCache).values(
+            key=key,
+            model=self.metadata.model_name,
+            response=response,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LLMResponseCache.key],
+            set_={
+                "response": stmt.excluded.response,
+                "created_at": func.now(),
+                "last_accessed_at": func.now(),
+            },
+        )
+        try:
+            async with self._session_factory() as session:
+                await session.execute(stmt)
+                await session.commit()
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                await self.aprune()
+        except SQLAlchemyError as exc:
+            self._db_errors += 1
+            _logger.warning(f"LLM response cache write failed: {exc}")
+
+    async def aprune(self) -> int:
+        """Delete expired rows and the least recently accessed rows beyond `max_rows`."""
+        expired = delete(LLMResponseCache).where(
+            LLMResponseCache.created_at
+            <= func.now() - timedelta(seconds=self.ttl_seconds),
+        )
+        overflow = (
+            select(LLMResponseCache.key)
+            .order_by(LLMResponseCache.last_accessed_at.desc())
+            .offset(self.max_rows)
+        )
+        least_recent = delete(LLMResponseCache).where(
+            LLMResponseCache.key.in_(overflow.scalar_subquery()),
+        )
+        async with self._session_factory() as session:
+            deleted = (await session.execute(expired)).rowcount
+            deleted += (await session.execute(least_recent)).rowcount
+            await session.commit()
+        self._db_evictions += deleted
+        if deleted:
+            _logger.info(f"Pruned {deleted} rows from the LLM response cache")
+        return deleted
+
+    async def _aget_cached(self, key: str) -> Optional[ChatMessage]:
+        cached = self._memory.get(key)
+        if cached is not None:
+            return _restore_message(json.loads(cached))
+
+        response = await self._load(key)
+        if response is None:
+            self._misses += 1
+            return None
+        self._db_hits += 1
+        self._memory.put(key, json.dumps(response))
+        return _restore_message(response)
+
+    async def _acache(self, key: str, message: ChatMessage) -> None:
+        if not message.content and not message.additional_kwargs.get("tool_calls"):
+            return
+        serialized = json.dumps(_message_dict(message), default=_jsonable)
+        self._memory.put(key, serialized)
+        await self._store(key, json.loads(serialized))
+
+    def _prepare_chat_with_tools(
+        self,
+        tools: Sequence[Any],
+        user_msg: Optional[Any] = None,
+        chat_history: Optional[List[ChatMessage]] = None,
+        verbose: bool = False,
+        allow_parallel_tool_calls: bool = False,
+        tool_required: bool = False,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        return self._llm._prepare_chat_with_tools_compat(
+            tools,
+            user_msg=user_msg,
+            chat_history=chat_history,
+            verbose=verbose,
+            allow_parallel_tool_calls=allow_parallel_tool_calls,
+            tool_required=tool_required,
+            **kwargs,
+        )
+
+    def _validate_chat_with_tools_response(
+        self,
+        response: ChatResponse,
+        tools: Sequence[Any],
+        allow_parallel_tool_calls: bool = False,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        return self._llm._validate_chat_with_tools_response(
+            response,
+            tools,
+            allow_parallel_tool_calls=allow_parallel_tool_calls,
+            **kwargs,
+        )
+
+    def get_tool_calls_from_response(
+        self,
+        response: ChatResponse,
+        error_on_no_tool_call: bool = True,
+        **kwargs: Any,
+    ) -> List[ToolSelection]:
+        return self._llm.get_tool_calls_from_response(
+            response,
+            error_on_no_tool_call=error_on_no_tool_call,
+            **kwargs,
+        )
+
+    async def achat(
+        self,
+        messages: Sequence[ChatMessage],
+        **kwargs: Any,
+    ) -> ChatResponse:
+        key = self._cache_key(messages, kwargs)
+        cached = await self._aget_cached(key)
+        if cached is not None:
+            return ChatResponse(message=cached)
+
+        response = await self._llm.achat(messages, **kwargs)
+        await self._acache(key, response.message)
+        return response
+
+    async def astream_chat(
+        self,
+        messages: Sequence[ChatMessage],
+        **kwargs: Any,
+    ) -> ChatResponseAsyncGen:
+        key = self._cache_key(messages, kwargs)
+        cached = await self._aget_cached(key)
+        if cached is not None:
+
+            async def replay() -> ChatResponseAsyncGen:
+                yield ChatResponse(message=cached, delta=cached.content)
+
+            return replay()
+
+        stream = await self._llm.astream_chat(messages, **kwargs)
+
+        async def record() -> ChatResponseAsyncGen:
+            last = None
+            async for last in stream:
+                yield last
+            # Only complete streams are cached: a consumer that stops early never gets here
+            if last is not None:
+                await self._acache(key, last.message)
+
+        return record()
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        key = self._cache_key(messages, kwargs)
+        cached = self._memory.get(key)
+        if cached is not None:
+            return ChatResponse(message=_restore_message(json.loads(cached)))
+
+        self._misses += 1
+        response = self._llm.chat(messages, **kwargs)
+        if response.message.content or response.message.additional_kwargs.get(
+            "tool_calls",
+        ):
+            self._memory.put(
+                key,
+                json.dumps(_message_dict(response.message), default=_jsonable),
+            )
+        return response
+
+    def stream_chat(
+        self,
+        messages: Sequence[ChatMessage],
+        **kwargs: Any,
+    ) -> ChatResponseGen:
+        return self._llm.stream_chat(messages, **kwargs)
+
+    def complete(
+        self,
+        prompt: str,
+        formatted: bool = False,
+        **kwargs: Any,
+    ) -> CompletionResponse:
+        return self._llm.complete(prompt, formatted=formatted, **kwargs)
+
+    async def acomplete(
+        self,
+        prompt: str,
+        formatted: bool = False,
+        **kwargs: Any,
+    ) -> CompletionResponse:
+        return await self._llm.acomplete(prompt, formatted=formatted, **kwargs)
+
+    def stream_complete(
+        self,
+        prompt: str,
+        formatted: bool = False,
+        **kwargs: Any,
+    ) -> CompletionResponseGen:
+        return self._llm.stream_complete(prompt, formatted=formatted, **kwargs)
+
+    async def astream_complete(
+        self,
+        prompt: str,
+        formatted: bool = False,
+        **kwargs: Any,
+    ) -> CompletionResponseAsyncGen:
+        return await self._llm.astream_complete(prompt, formatted=formatted, **kwargs)
@@ -1,3 +1,8 @@
-from src.llama_index.vector_stores.pgdiskann.base import PGDiskAnnVectorStore
+from src.llama_index.vector_stores.pgdiskann.base import (
+    BulkIngestStats,
+    PGDiskAnnVectorStore,
+    UpsertPlan,
+    UpsertStats,
+)
 
-__all__ = ["PGDiskAnnVectorStore"]
+__all__ = ["BulkIngestStats", "PGDiskAnnVectorStore", "UpsertPlan", "UpsertStats"]
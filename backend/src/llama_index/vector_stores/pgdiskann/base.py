@@ -1,7 +1,27 @@
+import hashlib
+import io
+import json
 import logging
 import re
-from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Type, Union
+import struct
+import time
+from itertools import batched
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Type,
+    Union,
+)
 
+import numpy as np
 import sqlalchemy
 from llama_index.core.bridge.pydantic import PrivateAttr
 from llama_index.core.schema import BaseNode, MetadataMode, TextNode
@@ -18,6 +38,7 @@ from llama_index.core.vector_stores.utils import (
     metadata_dict_to_node,
     node_to_metadata_dict,
 )
+from src.utils.cache import ByteBoundedLRUCache
 
 if TYPE_CHECKING:
     from sqlalchemy.sql.selectable import Select
@@ -30,8 +51,150 @@ class DBEmbeddingRow(NamedTuple):
     similarity: float
 
 
+class _ExactCandidates(NamedTuple):
+    """Rows matching a filter, loaded once for exact in-process scoring."""
+
+    loaded_at: float
+    node_ids: List[str]
+    texts: List[str]
+    metadatas: List[dict]
+    # (rows, embed_dim) float32, L2-normalised; None when the filter matched too many rows
+    embeddings: Any
+
+
+class BulkIngestStats(NamedTuple):
+    rows: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class UpsertPlan(NamedTuple):
+    """What an upsert has to do, from comparing nodes with the stored content hashes."""
+
+    pending: List[BaseNode]  # new or changed nodes, to embed and write
+    replaced_ids: List[str]  # node ids of changed nodes, whose rows are rewritten
+    orphan_ids: List[str]  # node ids stored but absent from the nodes, to delete
+    skipped: int  # unchanged nodes
+
+
+class UpsertStats(NamedTuple):
+    inserted: int
+    updated: int
+    skipped: int
+    deleted: int
+    elapsed: float
+
+
 _logger = logging.getLogger(__name__)
 
+# Columns written by the COPY ingest path, in COPY order.
+# `id` is left to its sequence default.
+COPY_COLUMNS = ("text", "metadata_", "node_id", "embedding", "content_hash")
+
+# PGCOPY binary header: signature, flags field and header extension length.
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack("!h", -1)
+
+
+class _CopyBinaryStream(io.RawIOBase):
+    """
+    File-like object over an iterator of PGCOPY binary chunks.
+
+    psycopg2's `copy_expert` pulls from it with `read(size)`, so rows are only
+    encoded as COPY consumes them.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = bytearray()
+        self._exhausted = False
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._exhausted and (size < 0 or len(self._buffer) < size):
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                self._exhausted = True
+
+        if size < 0 or size >= len(self._buffer):
+            data, self._buffer = bytes(self._buffer), bytearray()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+
+# SQL types a metadata key can be promoted to, with the Python type filter values are
+# coerced to before being bound
+PROMOTED_COLUMN_TYPES = {
+    "bigint": int,
+    "integer": int,
+    "double precision": float,
+    "varchar": str,
+    "boolean": bool,
+}
+# Embedding column types; halfvec stores 2-byte floats, halving table and index size
+VECTOR_STORAGE_TYPES = ("vector", "halfvec")
+
+_RESERVED_COLUMNS = {
+    "id",
+    "text",
+    "metadata_",
+    "node_id",
+    "embedding",
+    "content_hash",
+    "text_search_tsv",
+}
+
+
+def node_content_hash(node: BaseNode) -> str:
+    """SHA-256 of what a node's row is derived from: its embedded content and metadata."""
+    digest = hashlib.sha256(
+        node.get_content(metadata_mode=MetadataMode.EMBED).encode("utf-8"),
+    )
+    digest.update(b"\0")
+    digest.update(
+        json.dumps(node.metadata, sort_keys=True, default=str).encode("utf-8"),
+    )
+    return digest.hexdigest()
+
+
+def _promoted_column(key: str, sql_type: str) -> Any:
+    from sqlalchemy import BOOLEAN, Column, Computed
+    from sqlalchemy.dialects.postgresql import (
+        BIGINT,
+        DOUBLE_PRECISION,
+        INTEGER,
+        VARCHAR,
+    )
+
+    if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", key) or key in _RESERVED_COLUMNS:
+        raise ValueError(f"Invalid promoted metadata key: {key}")
+    column_types = {
+        "bigint": BIGINT,
+        "integer": INTEGER,
+        "double precision": DOUBLE_PRECISION,
+        "varchar": VARCHAR,
+        "boolean": BOOLEAN,
+    }
+    if sql_type not in column_types:
+        raise ValueError(f"Unsupported promoted column type: {sql_type}")
+
+    expression = f"metadata_->>'{key}'"
+    if sql_type != "varchar":
+        expression = f"({expression})::{sql_type}"
+    return Column(
+        column_types[sql_type],
+        Computed(expression, persisted=True),
+        index=True,
+    )
+
 
 def get_data_model(
     base: Type,
@@ -39,37 +202,87 @@ def get_data_model(
     schema_name: str,
     embed_dim: int = 1536,
     use_jsonb: bool = False,
+    promoted_columns: Optional[Dict[str, str]] = None,
+    storage: str = "vector",
+    hybrid_search: bool = False,
+    text_search_config: str = "english",
 ) -> Any:
     """
     This part create a dynamic sqlalchemy model with a new table.
+
+    Each `promoted_columns` entry (metadata key -> SQL type) becomes a stored generated
+    column computed from `metadata_`, with a B-tree index. `storage` picks the embedding
+    column type, one of VECTOR_STORAGE_TYPES. With `hybrid_search`, a stored
+    `text_search_tsv` column holds `to_tsvector(text_search_config, text)`.
     """
-    from pgvector.sqlalchemy import Vector
-    from sqlalchemy import Column
-    from sqlalchemy.dialects.postgresql import BIGINT, JSON, JSONB, VARCHAR
+    from pgvector.sqlalchemy import HALFVEC, Vector
+    from sqlalchemy import Column, Computed
+    from sqlalchemy.dialects.postgresql import BIGINT, JSON, JSONB, TSVECTOR, VARCHAR
 
     tablename = "data_%s" % index_name  # dynamic table name
     class_name = "Data%s" % index_name  # dynamic class name
 
     metadata_dtype = JSONB if use_jsonb else JSON
-    embedding_col = Column(Vector(embed_dim))  # type: ignore
+    vector_type = HALFVEC if storage == "halfvec" else Vector
+    embedding_col = Column(vector_type(embed_dim))  # type: ignore
+    text_search_columns = {}
+    if hybrid_search:
+        text_search_columns["text_search_tsv"] = Column(
+            TSVECTOR,
+            Computed(f"to_tsvector('{text_search_config}', text)", persisted=True),
+        )
 
     class AbstractData(base):  # type: ignore
         __abstract__ = True  # this line is necessary
         id = Column(BIGINT, primary_key=True, autoincrement=True)
         text = Column(VARCHAR, nullable=False)
         metadata_ = Column(metadata_dtype)
-        node_id = Column(VARCHAR)
+        node_id = Column(VARCHAR, index=True)
         embedding = embedding_col
+        content_hash = Column(VARCHAR)
 
     model = type(
         class_name,
         (AbstractData,),
-        {"__tablename__": tablename, "__table_args__": {"schema": schema_name}},
+        {
+            "__tablename__": tablename,
+            "__table_args__": {"schema": schema_name},
+            **{
+                key: _promoted_column(key, sql_type)
+                for key, sql_type in (promoted_columns or {}).items()
+            },
+            **text_search_columns,
+        },
     )
 
     return model
 
 
+def _embedding_to_numpy(embedding: Any) -> np.ndarray:
+    # halfvec columns load as `HalfVector`, vector columns as numpy arrays
+    if hasattr(embedding, "to_numpy"):
+        embedding = embedding.to_numpy()
+    return np.asarray(embedding, dtype=np.float32)
+
+
+async def _reset_vector_codecs(asyncpg_conn: Any) -> None:
+    """Undoes pgvector's `register_vector` on an asyncpg connection."""
+    for type_name in ("vector", "halfvec", "sparsevec"):
+        try:
+            await asyncpg_conn.reset_type_codec(type_name)
+        except ValueError as e:
+            # Older pgvector versions lack halfvec and sparsevec
+            if not str(e).startswith("unknown type:"):
+                raise
+
+
+def _sizeof_candidates(candidates: _ExactCandidates) -> int:
+    size = sum(len(text) for text in candidates.texts) + 256 * len(candidates.node_ids)
+    if candidates.embeddings is not None:
+        size += candidates.embeddings.nbytes
+    return size
+
+
 class PGDiskAnnVectorStore(BasePydanticVectorStore):
     """Postgres Vector Store.
 
@@ -106,6 +319,13 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
     use_jsonb: bool
     create_engine_kwargs: Dict
     initialization_fail_on_error: bool = False
+    exact_search_threshold: int = 0
+    exact_search_cache_ttl: float = 300.0
+    promoted_columns: Dict[str, str] = {}
+    storage: str = "vector"
+    hybrid_search: bool = False
+    text_search_config: str = "english"
+    hybrid_rrf_k: int = 60
 
     pgdiskann_kwargs: Optional[Dict[str, Any]]
     stores_text: bool = True
@@ -118,6 +338,9 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
     _session: Any = PrivateAttr()
     _async_engine: Any = PrivateAttr()
     _async_session: Any = PrivateAttr()
+    _owns_engine: bool = PrivateAttr(default=True)
+    _owns_async_engine: bool = PrivateAttr(default=True)
+    _exact_candidates: Any = PrivateAttr()
     _is_initialized: bool = PrivateAttr(default=False)
 
     def __init__(
@@ -134,6 +357,16 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
         pgdiskann_kwargs: Optional[Dict[str, Any]] = None,
         create_engine_kwargs: Optional[Dict[str, Any]] = None,
         initialization_fail_on_error: bool = False,
+        engine: Optional[sqlalchemy.engine.Engine] = None,
+        async_engine: Optional[Any] = None,
+        exact_search_threshold: int = 0,
+        exact_search_cache_bytes: int = 64 * 1024 * 1024,
+        exact_search_cache_ttl: float = 300.0,
+        promoted_columns: Optional[Dict[str, str]] = None,
+        storage: str = "vector",
+        hybrid_search: bool = False,
+        text_search_config: str = "english",
+        hybrid_rrf_k: int = 60,
     ) -> None:
         """Constructor.
 
@@ -143,6 +376,9 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
             table_name (str): Table name.
             schema_name (str): Schema name.
             embed_dim (int, optional): Embedding dimensions. Defaults to 1536.
+            use_reranking (bool, optional): Re-rank the quantized index candidates on
+                full-precision distance. Queries can override it with a `use_reranking`
+                kwarg. Defaults to True.
             cache_ok (bool, optional): Enable cache. Defaults to False.
             perform_setup (bool, optional): If db should be set up. Defaults to True.
             debug (bool, optional): Debug mode. Defaults to False.
@@ -151,7 +387,34 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
                 contains "diskann_l_value_ib", "diskann_l_value_is", "diskann_max_neighbors", and optionally "diskann_dist_method".
             create_engine_kwargs (Optional[Dict[str, Any]], optional): Engine parameters to pass to create_engine. Defaults to None
             stores_text (bool, optional): Whether the store contains text. Defaults to True.
+            engine (Optional[sqlalchemy.engine.Engine], optional): Existing sync engine to borrow
+                instead of creating one from `connection_string`. Defaults to None.
+            async_engine (Optional[AsyncEngine], optional): Existing async engine to borrow
+                instead of creating one from `async_connection_string`. Defaults to None.
+            exact_search_threshold (int, optional): Filtered queries matching at most this many
+                rows are scored exactly in-process instead of through the index. Defaults to 0 (off).
+            exact_search_cache_bytes (int, optional): Memory bound of the per-filter candidate
+                cache used by exact search. Defaults to 64 MiB.
+            exact_search_cache_ttl (float, optional): Seconds a cached candidate set stays valid;
+                bounds staleness after writes made by other processes. Defaults to 300.
+            promoted_columns (Optional[Dict[str, str]], optional): Metadata keys stored as indexed
+                generated columns (key -> SQL type, see PROMOTED_COLUMN_TYPES). Filters on them
+                compile to bound parameters against the column. Defaults to None.
+            storage (str, optional): Embedding column type, "vector" or "halfvec". halfvec
+                halves table and index size at 16-bit precision. Defaults to "vector".
+            hybrid_search (bool, optional): Maintain a GIN-indexed `text_search_tsv` column so
+                HYBRID queries can fuse full-text and ANN rankings. Defaults to False.
+            text_search_config (str, optional): Postgres text search configuration of the
+                tsvector column and queries. Defaults to "english".
+            hybrid_rrf_k (int, optional): Rank offset k of reciprocal rank fusion; larger
+                values flatten the advantage of top ranks. Defaults to 60.
         """
+        if storage not in VECTOR_STORAGE_TYPES:
+            raise ValueError(
+                f"Unsupported storage {storage!r}, expected one of {VECTOR_STORAGE_TYPES}",
+            )
+        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", text_search_config):
+            raise ValueError(f"Invalid text search config: {text_search_config}")
         table_name = table_name.lower()
         schema_name = schema_name.lower()
 
@@ -170,6 +433,20 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
             pgdiskann_kwargs=pgdiskann_kwargs,
             create_engine_kwargs=create_engine_kwargs or {},
             initialization_fail_on_error=initialization_fail_on_error,
+            exact_search_threshold=exact_search_threshold,
+            exact_search_cache_ttl=exact_search_cache_ttl,
+            promoted_columns=promoted_columns or {},
+            storage=storage,
+            hybrid_search=hybrid_search,
+            text_search_config=text_search_config,
+            hybrid_rrf_k=hybrid_rrf_k,
+        )
+
+        self._engine = engine
+        self._async_engine = async_engine
+        self._exact_candidates = ByteBoundedLRUCache(
+            exact_search_cache_bytes,
+            _sizeof_candidates,
         )
 
         # sqlalchemy model
@@ -180,18 +457,23 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
             schema_name,
             embed_dim=embed_dim,
             use_jsonb=use_jsonb,
+            promoted_columns=promoted_columns,
+            storage=storage,
+            hybrid_search=hybrid_search,
+            text_search_config=text_search_config,
         )
 
         self._initialize()
 
     async def close(self) -> None:
+        """Dispose the engines this store created; borrowed engines are left to their owner."""
         if not self._is_initialized:
             return
 
-        self._session.close_all()
-        self._engine.dispose()
-
-        await self._async_engine.dispose()
+        if self._owns_engine:
+            self._engine.dispose()
+        if self._owns_async_engine:
+            await self._async_engine.dispose()
 
     @classmethod
     def class_name(cls) -> str:
@@ -216,6 +498,14 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
         use_jsonb: bool = False,
         pgdiskann_kwargs: Optional[Dict[str, Any]] = None,
         create_engine_kwargs: Optional[Dict[str, Any]] = None,
+        engine: Optional[sqlalchemy.engine.Engine] = None,
+        async_engine: Optional[Any] = None,
+        exact_search_threshold: int = 0,
+        promoted_columns: Optional[Dict[str, str]] = None,
+        storage: str = "vector",
+        hybrid_search: bool = False,
+        text_search_config: str = "english",
+        hybrid_rrf_k: int = 60,
     ) -> "PGDiskAnnVectorStore":
         """Construct from params.
 
@@ -236,6 +526,14 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
             pgdiskann_kwargs (Optional[Dict[str, Any]], optional): PGDiskAnn kwargs, a dict that
                 contains "diskann_l_value_ib", "diskann_l_value_is", "diskann_max_neighbors".
             create_engine_kwargs (Optional[Dict[str, Any]], optional): Engine parameters to pass to create_engine. Defaults to None
+            engine (Optional[sqlalchemy.engine.Engine], optional): Existing sync engine to borrow. Defaults to None.
+            async_engine (Optional[AsyncEngine], optional): Existing async engine to borrow. Defaults to None.
+            exact_search_threshold (int, optional): Max filtered rows scored exactly in-process. Defaults to 0 (off).
+            promoted_columns (Optional[Dict[str, str]], optional): Metadata keys stored as indexed columns. Defaults to None.
+            storage (str, optional): Embedding column type, "vector" or "halfvec". Defaults to "vector".
+            hybrid_search (bool, optional): Enable HYBRID (full-text + ANN) queries. Defaults to False.
+            text_search_config (str, optional): Postgres text search configuration. Defaults to "english".
+            hybrid_rrf_k (int, optional): Rank offset of reciprocal rank fusion. Defaults to 60.
 
         Returns:
             PGDiskAnnVectorStore: Instance of PGDiskAnnVectorStore constructed from params.
@@ -259,6 +557,14 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
             use_jsonb=use_jsonb,
             pgdiskann_kwargs=pgdiskann_kwargs,
             create_engine_kwargs=create_engine_kwargs,
+            engine=engine,
+            async_engine=async_engine,
+            exact_search_threshold=exact_search_threshold,
+            promoted_columns=promoted_columns,
+            storage=storage,
+            hybrid_search=hybrid_search,
+            text_search_config=text_search_config,
+            hybrid_rrf_k=hybrid_rrf_k,
         )
 
     @property
@@ -272,17 +578,21 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
         from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
         from sqlalchemy.orm import sessionmaker
 
-        self._engine = create_engine(
-            self.connection_string,
-            echo=self.debug,
-            **self.create_engine_kwargs,
-        )
+        self._owns_engine = self._engine is None
+        if self._owns_engine:
+            self._engine = create_engine(
+                self.connection_string,
+                echo=self.debug,
+                **self.create_engine_kwargs,
+            )
         self._session = sessionmaker(self._engine)
 
-        self._async_engine = create_async_engine(
-            self.async_connection_string,
-            **self.create_engine_kwargs,
-        )
+        self._owns_async_engine = self._async_engine is None
+        if self._owns_async_engine:
+            self._async_engine = create_async_engine(
+                self.async_connection_string,
+                **self.create_engine_kwargs,
+            )
         self._async_session = sessionmaker(self._async_engine, class_=AsyncSession)  # type: ignore
 
     def _create_schema_if_not_exists(self) -> bool:
@@ -316,6 +626,35 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
         with self._session() as session, session.begin():
             self._base.metadata.create_all(session.connection())
 
+    def _create_metadata_gin_index(self) -> None:
+        """GIN index serving containment filters on metadata keys that are not promoted."""
+        import sqlalchemy
+
+        metadata_expression = "metadata_" if self.use_jsonb else "(metadata_::jsonb)"
+        with self._session() as session, session.begin():
+            session.execute(
+                sqlalchemy.text(
+                    f"CREATE INDEX IF NOT EXISTS {self._table_class.__tablename__}_metadata_gin_idx "
+                    f"ON {self.schema_name}.{self._table_class.__tablename__} "
+                    f"USING gin ({metadata_expression} jsonb_path_ops)",
+                ),
+            )
+            session.commit()
+
+    def _create_text_search_index(self) -> None:
+        """GIN index serving the full-text half of hybrid queries."""
+        import sqlalchemy
+
+        with self._session() as session, session.begin():
+            session.execute(
+                sqlalchemy.text(
+                    f"CREATE INDEX IF NOT EXISTS {self._table_class.__tablename__}_text_search_tsv_idx "
+                    f"ON {self.schema_name}.{self._table_class.__tablename__} "
+                    f"USING gin (text_search_tsv)",
+                ),
+            )
+            session.commit()
+
     def _create_extension(self) -> None:
         import sqlalchemy
 
@@ -344,7 +683,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
         if "diskann_dist_method" in self.pgdiskann_kwargs:
             diskann_dist_method = self.pgdiskann_kwargs.get("diskann_dist_method")
         else:
-            diskann_dist_method = "vector_cosine_ops"
+            diskann_dist_method = f"{self.storage}_cosine_ops"
 
         product_quantized = self.pgdiskann_kwargs.get(
             "product_quantized",
@@ -407,6 +746,21 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
                     _logger.warning(f"PG Setup: Error creating tables: {e}")
                     if fail_on_error:
                         raise
+                try:
+                    self._create_metadata_gin_index()
+                except Exception as e:
+                    _logger.warning(f"PG Setup: Error creating metadata GIN index: {e}")
+                    if fail_on_error:
+                        raise
+                if self.hybrid_search:
+                    try:
+                        self._create_text_search_index()
+                    except Exception as e:
+                        _logger.warning(
+                            f"PG Setup: Error creating text search index: {e}",
+                        )
+                        if fail_on_error:
+                            raise
                 if self.pgdiskann_kwargs is not None:
                     try:
                         self._create_pgdiskann_index()
@@ -422,6 +776,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
         return self._table_class(
             node_id=node.node_id,
             embedding=node.get_embedding(),
+            content_hash=node_content_hash(node),
             text=node.get_content(metadata_mode=MetadataMode.NONE),
             metadata_=node_to_metadata_dict(
                 node,
@@ -438,6 +793,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
                 item = self._node_to_table_row(node)
                 session.add(item)
             session.commit()
+        self._invalidate_exact_candidates()
         return ids
 
     async def async_add(self, nodes: List[BaseNode], **kwargs: Any) -> List[str]:
@@ -448,83 +804,419 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
                 item = self._node_to_table_row(node)
                 session.add(item)
             await session.commit()
+        self._invalidate_exact_candidates()
         return ids
 
-    def _to_postgres_operator(self, operator: FilterOperator) -> str:
-        if operator == FilterOperator.EQ:
-            return "="
-        elif operator == FilterOperator.GT:
-            return ">"
-        elif operator == FilterOperator.LT:
-            return "<"
-        elif operator == FilterOperator.NE:
-            return "!="
-        elif operator == FilterOperator.GTE:
-            return ">="
-        elif operator == FilterOperator.LTE:
-            return "<="
-        elif operator == FilterOperator.IN:
-            return "IN"
-        elif operator == FilterOperator.NIN:
-            return "NOT IN"
-        elif operator == FilterOperator.CONTAINS:
-            return "@>"
-        elif operator == FilterOperator.TEXT_MATCH:
-            return "LIKE"
-        elif operator == FilterOperator.TEXT_MATCH_INSENSITIVE:
-            return "ILIKE"
-        else:
-            _logger.warning(f"Unknown operator: {operator}, fallback to '='")
-            return "="
+    def _node_to_copy_record(self, node: BaseNode) -> tuple:
+        metadata = node_to_metadata_dict(
+            node,
+            remove_text=True,
+            flat_metadata=self.flat_metadata,
+        )
+        return (
+            node.get_content(metadata_mode=MetadataMode.NONE),
+            json.dumps(metadata),
+            node.node_id,
+            node.get_embedding(),
+            node_content_hash(node),
+        )
 
-    def _build_filter_clause(self, filter_: MetadataFilter) -> Any:
-        from sqlalchemy import text
+    def _encode_copy_row(self, node: BaseNode) -> bytes:
+        from pgvector.utils import HalfVector, Vector
 
-        if filter_.operator in [FilterOperator.IN, FilterOperator.NIN]:
-            # Expects a single value in the metadata, and a list to compare
+        text, metadata, node_id, embedding, content_hash = self._node_to_copy_record(
+            node,
+        )
+        metadata_bytes = metadata.encode("utf-8")
+        if self.use_jsonb:
+            # jsonb binary representation is a version byte followed by the text
+            metadata_bytes = b"\x01" + metadata_bytes
+
+        fields = (
+            text.encode("utf-8"),
+            metadata_bytes,
+            node_id.encode("utf-8"),
+            (HalfVector if self.storage == "halfvec" else Vector)(
+                embedding,
+            ).to_binary(),
+            content_hash.encode("utf-8"),
+        )
+        row = [struct.pack("!h", len(fields))]
+        for field in fields:
+            row.append(struct.pack("!i", len(field)))
+            row.append(field)
+        return b"".join(row)
+
+    def _log_ingest_progress(self, rows: int, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        _logger.info(
+            f"COPY ingest into {self._table_class.__tablename__}: {rows} rows, "
+            f"{BulkIngestStats(rows, elapsed).rows_per_second:.1f} rows/sec",
+        )
+
+    def bulk_add(
+        self,
+        nodes: Iterable[BaseNode],
+        log_every: int = 10000,
+    ) -> BulkIngestStats:
+        """Streams nodes into the table with a single binary COPY.
+
+        Nodes must already carry their embeddings. `nodes` can be a generator,
+        rows are encoded as COPY reads them, so the corpus is never materialized.
+
+        Args:
+            nodes (Iterable[BaseNode]): Embedded nodes to ingest.
+            log_every (int, optional): Log throughput every N rows. Defaults to 10000.
+
+        Returns:
+            BulkIngestStats: Number of rows written and elapsed time.
+        """
+        started = time.perf_counter()
+        with self._session() as session, session.begin():
+            rows = self._copy_nodes(session, nodes, log_every, started)
+            session.commit()
+
+        self._invalidate_exact_candidates()
+        stats = BulkIngestStats(rows=rows, elapsed=time.perf_counter() - started)
+        self._log_ingest_progress(stats.rows, started)
+        return stats
+
+    def _copy_nodes(
+        self,
+        session: Any,
+        nodes: Iterable[BaseNode],
+        log_every: int,
+        started: float,
+    ) -> int:
+        """COPY `nodes` into the table within `session`'s transaction; returns the row count."""
+        rows = 0
+
+        def chunks() -> Iterator[bytes]:
+            nonlocal rows
+            yield _PGCOPY_HEADER
+            for node in nodes:
+                yield self._encode_copy_row(node)
+                rows += 1
+                if rows % log_every == 0:
+                    self._log_ingest_progress(rows, started)
+            yield _PGCOPY_TRAILER
+
+        statement = (
+            f"COPY {self.schema_name}.{self._table_class.__tablename__} "
+            f"({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT BINARY)"
+        )
+        dbapi_connection = session.connection().connection.driver_connection
+        with dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(statement, _CopyBinaryStream(chunks()))
+        return rows
+
+    def upsert_nodes(
+        self,
+        nodes: Iterable[BaseNode],
+        embed_nodes: Callable[[Iterable[BaseNode]], Iterable[BaseNode]],
+        delete_orphans: bool = True,
+        batch_size: int = 200,
+        log_every: int = 10000,
+    ) -> UpsertStats:
+        """Synchronises the table with `nodes`, embedding only what changed.
+
+        Nodes are matched to rows on `node_id`, so they need stable ids. Nodes whose
+        content hash equals their row's are skipped; new and changed nodes are passed
+        through `embed_nodes` and streamed in with COPY, replacing their old rows. Rows
+        whose node_id is absent from `nodes` are deleted in bulk unless
+        `delete_orphans` is False.
+
+        Embedding happens outside any transaction: each batch of `batch_size` embedded
+        nodes is written in its own short transaction, so a failure part way keeps the
+        batches already written, and a rerun skips them by their hashes.
+
+        Args:
+            nodes (Iterable[BaseNode]): Complete set of nodes the table should hold, not embedded.
+            embed_nodes (Callable): Lazily embeds an iterable of nodes, e.g. in batches.
+            delete_orphans (bool, optional): Delete rows of nodes not in `nodes`. Defaults to True.
+            batch_size (int, optional): Embedded nodes written per transaction. Defaults to 200.
+            log_every (int, optional): Log throughput every N rows. Defaults to 10000.
 
-            # In Python, to create a tuple with a single element, you need to include a comma after the element
-            # This code will correctly format the IN clause whether there is one element or multiple elements in the list:
-            filter_value = ", ".join(f"'{e}'" for e in filter_.value)
+        Returns:
+            UpsertStats: Inserted, updated, skipped and deleted counts and elapsed time.
+        """
+        started = time.perf_counter()
+        with self._session() as session:
+            plan = self._plan_upsert(
+                dict(session.execute(self._stored_hashes_query()).all()),
+                nodes,
+                delete_orphans,
+            )
 
-            return text(
-                f"metadata_->>'{filter_.key}' "
-                f"{self._to_postgres_operator(filter_.operator)} "
-                f"({filter_value})",
+        if plan.orphan_ids:
+            with self._session() as session, session.begin():
+                session.execute(self._delete_node_ids_stmt(plan.orphan_ids))
+                session.commit()
+
+        replaced_ids = set(plan.replaced_ids)
+        rows = 0
+        try:
+            for batch in batched(embed_nodes(plan.pending), batch_size):
+                with self._session() as session, session.begin():
+                    batch_replaced_ids = [
+                        node.node_id for node in batch if node.node_id in replaced_ids
+                    ]
+                    if batch_replaced_ids:
+                        session.execute(self._delete_node_ids_stmt(batch_replaced_ids))
+                    self._copy_nodes(session, batch, log_every, started)
+                    session.commit()
+                if (rows + len(batch)) // log_every > rows // log_every:
+                    self._log_ingest_progress(rows + len(batch), started)
+                rows += len(batch)
+        finally:
+            self._invalidate_exact_candidates()
+
+        return UpsertStats(
+            inserted=len(plan.pending) - len(plan.replaced_ids),
+            updated=len(plan.replaced_ids),
+            skipped=plan.skipped,
+            deleted=len(plan.orphan_ids),
+            elapsed=time.perf_counter() - started,
+        )
+
+    async def aplan_upsert(
+        self,
+        nodes: Iterable[BaseNode],
+        delete_orphans: bool = True,
+    ) -> UpsertPlan:
+        """Compares `nodes` with the stored content hashes without writing anything.
+
+        Callers that embed and write the pending nodes themselves, such as a batched
+        ingest pipeline, use it with `areplace_nodes` and `adelete_nodes`.
+        """
+        async with self._async_session() as async_session:
+            stored_hashes = dict(
+                (await async_session.execute(self._stored_hashes_query())).all(),
             )
+        return self._plan_upsert(stored_hashes, nodes, delete_orphans)
+
+    async def areplace_nodes(
+        self,
+        nodes: List[BaseNode],
+        async_session: Optional[Any] = None,
+    ) -> int:
+        """Writes embedded nodes with COPY, replacing rows that have the same node ids.
+
+        Replacing makes the write idempotent, so a batch written twice (e.g. by a
+        resumed ingest) leaves one row per node. With `async_session`, runs inside its
+        transaction and leaves the commit to the caller.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if async_session is None:
+            async with self._async_session() as async_session, async_session.begin():
+                return await self.areplace_nodes(nodes, async_session)
+
+        await async_session.execute(
+            self._delete_node_ids_stmt([node.node_id for node in nodes]),
+        )
+        rows = await self._acopy_nodes(
+            async_session,
+            nodes,
+            log_every=len(nodes) + 1,
+            started=time.perf_counter(),
+        )
+        self._invalidate_exact_candidates()
+        return rows
+
+    def _stored_hashes_query(self) -> Any:
+        from sqlalchemy import select
+
+        return select(self._table_class.node_id, self._table_class.content_hash)
+
+    def _plan_upsert(
+        self,
+        stored_hashes: Dict[str, Optional[str]],
+        nodes: Iterable[BaseNode],
+        delete_orphans: bool,
+    ) -> UpsertPlan:
+        pending, seen_ids, replaced_ids = [], set(), []
+        skipped = 0
+        for node in nodes:
+            seen_ids.add(node.node_id)
+            if node.node_id in stored_hashes:
+                if stored_hashes[node.node_id] == node_content_hash(node):
+                    skipped += 1
+                    continue
+                replaced_ids.append(node.node_id)
+            pending.append(node)
+
+        orphan_ids = []
+        if delete_orphans:
+            orphan_ids = [
+                node_id for node_id in stored_hashes if node_id not in seen_ids
+            ]
+        return UpsertPlan(pending, replaced_ids, orphan_ids, skipped)
+
+    def _delete_node_ids_stmt(self, node_ids: List[str]) -> Any:
+        from sqlalchemy import any_, delete, literal
+        from sqlalchemy.dialects.postgresql import ARRAY, VARCHAR
+
+        # One array parameter instead of an IN list with a placeholder per id
+        return delete(self._table_class).where(
+            self._table_class.node_id == any_(literal(node_ids, ARRAY(VARCHAR))),
+        )
+
+    async def abulk_add(
+        self,
+        nodes: Union[Iterable[BaseNode], AsyncIterable[BaseNode]],
+        log_every: int = 10000,
+    ) -> BulkIngestStats:
+        """Asynchronously streams nodes into the table with binary COPY.
+
+        Uses asyncpg's `copy_records_to_table`, which pulls records lazily from
+        `nodes` (sync or async iterable) and encodes vectors with the pgvector codec.
+
+        Args:
+            nodes (Union[Iterable[BaseNode], AsyncIterable[BaseNode]]): Embedded nodes to ingest.
+            log_every (int, optional): Log throughput every N rows. Defaults to 10000.
+
+        Returns:
+            BulkIngestStats: Number of rows written and elapsed time.
+        """
+        started = time.perf_counter()
+        async with self._async_session() as session, session.begin():
+            rows = await self._acopy_nodes(session, nodes, log_every, started)
+            await session.commit()
+
+        self._invalidate_exact_candidates()
+        stats = BulkIngestStats(rows=rows, elapsed=time.perf_counter() - started)
+        self._log_ingest_progress(stats.rows, started)
+        return stats
+
+    async def _acopy_nodes(
+        self,
+        async_session: Any,
+        nodes: Union[Iterable[BaseNode], AsyncIterable[BaseNode]],
+        log_every: int,
+        started: float,
+    ) -> int:
+        """COPY `nodes` within `async_session`'s transaction; returns the row count."""
+        from pgvector.asyncpg import register_vector
+
+        rows = 0
+
+        async def iter_nodes():
+            if isinstance(nodes, AsyncIterable):
+                async for node in nodes:
+                    yield node
+            else:
+                for node in nodes:
+                    yield node
+
+        async def records():
+            nonlocal rows
+            async for node in iter_nodes():
+                yield self._node_to_copy_record(node)
+                rows += 1
+                if rows % log_every == 0:
+                    self._log_ingest_progress(rows, started)
+
+        connection = await async_session.connection()
+        raw_connection = await connection.get_raw_connection()
+        asyncpg_conn = raw_connection.driver_connection
+        # Binary COPY needs the pgvector codecs, but SQLAlchemy's pgvector type binds
+        # vectors as text, so a pooled connection must not keep them
+        await register_vector(asyncpg_conn)
+        try:
+            await asyncpg_conn.copy_records_to_table(
+                self._table_class.__tablename__,
+                schema_name=self.schema_name,
+                columns=list(COPY_COLUMNS),
+                records=records(),
+            )
+            await _reset_vector_codecs(asyncpg_conn)
+        except BaseException:
+            # The codecs cannot be reset in an aborted transaction: discard the
+            # connection instead of returning it to the pool with them
+            await connection.invalidate()
+            raise
+        return rows
+
+    def _build_promoted_filter_clause(self, filter_: MetadataFilter) -> Any:
+        column = getattr(self._table_class, filter_.key)
+        coerce = PROMOTED_COLUMN_TYPES[self.promoted_columns[filter_.key]]
+
+        if filter_.operator == FilterOperator.IN:
+            return column.in_([coerce(value) for value in filter_.value])
+        elif filter_.operator == FilterOperator.NIN:
+            return column.not_in([coerce(value) for value in filter_.value])
+        elif filter_.operator == FilterOperator.TEXT_MATCH:
+            return column.like(f"%{filter_.value}%")
+        elif filter_.operator == FilterOperator.TEXT_MATCH_INSENSITIVE:
+            return column.ilike(f"%{filter_.value}%")
+
+        operators = {
+            FilterOperator.EQ: column.__eq__,
+            FilterOperator.NE: column.__ne__,
+            FilterOperator.GT: column.__gt__,
+            FilterOperator.LT: column.__lt__,
+            FilterOperator.GTE: column.__ge__,
+            FilterOperator.LTE: column.__le__,
+        }
+        if filter_.operator not in operators:
+            _logger.warning(f"Unknown operator: {filter_.operator}, fallback to '='")
+        return operators.get(filter_.operator, column.__eq__)(coerce(filter_.value))
+
+    def _build_filter_clause(self, filter_: MetadataFilter) -> Any:
+        """
+        Compiles a filter to a SQL expression with bound parameters.
+
+        Promoted keys compare against their indexed column. Other keys read `metadata_`
+        with the coercion metadata filters have always had: numeric values compare
+        as floats, others as text, so 5 matches a stored "5" and the reverse. Only
+        CONTAINS, type-exact by definition, uses JSONB containment and the GIN index.
+        """
+        from sqlalchemy import Float, cast
+        from sqlalchemy.dialects.postgresql import JSONB
+
+        if (
+            filter_.key in self.promoted_columns
+            and filter_.operator != FilterOperator.CONTAINS
+        ):
+            return self._build_promoted_filter_clause(filter_)
+
+        metadata = self._table_class.metadata_
+        metadata_jsonb = metadata if self.use_jsonb else cast(metadata, JSONB)
+        value_text = metadata[filter_.key].astext
+
+        if filter_.operator == FilterOperator.IN:
+            # Expects a single value in the metadata, and a list to compare
+            return value_text.in_([str(value) for value in filter_.value])
+        elif filter_.operator == FilterOperator.NIN:
+            return value_text.not_in([str(value) for value in filter_.value])
         elif filter_.operator == FilterOperator.CONTAINS:
             # Expects a list stored in the metadata, and a single value to compare
-            return text(
-                f"metadata_::jsonb->'{filter_.key}' "
-                f"{self._to_postgres_operator(filter_.operator)} "
-                f"'[\"{filter_.value}\"]'",
-            )
-        elif (
-            filter_.operator == FilterOperator.TEXT_MATCH
-            or filter_.operator == FilterOperator.TEXT_MATCH_INSENSITIVE
-        ):
-            # Where the operator is text_match or ilike, we need to wrap the filter in '%' characters
-            return text(
-                f"metadata_->>'{filter_.key}' "
-                f"{self._to_postgres_operator(filter_.operator)} "
-                f"'%{filter_.value}%'",
-            )
-        else:
-            # Check if value is a number. If so, cast the metadata value to a float
-            # This is necessary because the metadata is stored as a string
-            try:
-                return text(
-                    f"(metadata_->>'{filter_.key}')::float "
-                    f"{self._to_postgres_operator(filter_.operator)} "
-                    f"{float(filter_.value)}",
-                )
-            except ValueError:
-                # If not a number, then treat it as a string
-                return text(
-                    f"metadata_->>'{filter_.key}' "
-                    f"{self._to_postgres_operator(filter_.operator)} "
-                    f"'{filter_.value}'",
-                )
+            return metadata_jsonb.contains({filter_.key: [filter_.value]})
+        elif filter_.operator == FilterOperator.TEXT_MATCH:
+            return value_text.like(f"%{filter_.value}%")
+        elif filter_.operator == FilterOperator.TEXT_MATCH_INSENSITIVE:
+            return value_text.ilike(f"%{filter_.value}%")
+
+        operators = {
+            FilterOperator.EQ: "__eq__",
+            FilterOperator.NE: "__ne__",
+            FilterOperator.GT: "__gt__",
+            FilterOperator.LT: "__lt__",
+            FilterOperator.GTE: "__ge__",
+            FilterOperator.LTE: "__le__",
+        }
+        operator = operators.get(filter_.operator)
+        if operator is None:
+            _logger.warning(f"Unknown operator: {filter_.operator}, fallback to '='")
+            operator = "__eq__"
+        try:
+            # Numeric values compare numerically, as the metadata value is stored as text
+            value = float(filter_.value)
+            return getattr(cast(value_text, Float), operator)(value)
+        except (TypeError, ValueError):
+            return getattr(value_text, operator)(str(filter_.value))
 
     def _recursively_apply_filters(self, filters: List[MetadataFilters]) -> Any:
         """
@@ -575,7 +1267,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
     ) -> Any:
         from sqlalchemy import select, text
 
-        if not self.use_reranking:
+        if not kwargs.get("use_reranking", self.use_reranking):
             stmt = select(  # type: ignore
                 self._table_class.id,
                 self._table_class.node_id,
@@ -585,6 +1277,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
                     "distance",
                 ),
             ).order_by(text("distance asc"))
+            return self._apply_filters_and_limit(stmt, limit, metadata_filters)
         else:
             quantized_fetch_limit = kwargs.get(
                 "quantized_fetch_limit",
@@ -614,6 +1307,196 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
 
         return self._apply_filters_and_limit(stmt, limit)
 
+    def _build_batch_query(
+        self,
+        embeddings: List[List[float]],
+        limit: int = 10,
+        metadata_filters: Optional[MetadataFilters] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Builds a single statement that runs one top-k search per embedding.
+
+        The query vectors are unnested WITH ORDINALITY and each one drives a LATERAL
+        index scan, so N searches cost one round trip. Rows come back tagged with the
+        1-based `ordinality` of the embedding they belong to.
+        """
+        from sqlalchemy import cast, column, func, select, true
+        from sqlalchemy.dialects.postgresql import ARRAY, array
+
+        vector_type = self._table_class.embedding.type
+        query_vectors = (
+            func.unnest(
+                array(
+                    [cast(embedding, vector_type) for embedding in embeddings],
+                    type_=ARRAY(vector_type),
+                ),
+            )
+            .table_valued(
+                column("embedding", vector_type),
+                with_ordinality="ordinality",
+            )
+            .render_derived(name="query_vectors")
+        )
+        distance_to_query = self._table_class.embedding.cosine_distance(
+            query_vectors.c.embedding,
+        )
+
+        if not kwargs.get("use_reranking", self.use_reranking):
+            candidates = select(
+                self._table_class.node_id,
+                self._table_class.text,
+                self._table_class.metadata_,
+                distance_to_query.label("distance"),
+            ).order_by(distance_to_query)
+            candidates = self._apply_filters_and_limit(
+                candidates,
+                limit,
+                metadata_filters,
+            ).lateral("candidates")
+
+            return (
+                select(
+                    query_vectors.c.ordinality,
+                    candidates.c.node_id,
+                    candidates.c.text,
+                    candidates.c.metadata_,
+                    candidates.c.distance,
+                )
+                .select_from(query_vectors.join(candidates, true()))
+                .order_by(query_vectors.c.ordinality, candidates.c.distance)
+            )
+
+        quantized_fetch_limit = kwargs.get(
+            "quantized_fetch_limit",
+        ) or self.pgdiskann_kwargs.get("quantized_fetch_limit")
+        candidates = select(
+            self._table_class.embedding,
+            self._table_class.node_id,
+            self._table_class.text,
+            self._table_class.metadata_,
+        ).order_by(distance_to_query)
+        candidates = self._apply_filters_and_limit(
+            candidates,
+            quantized_fetch_limit,
+            metadata_filters,
+        ).lateral("candidates")
+
+        # Re-rank each query's quantized candidates on full-precision distance
+        distance = candidates.c.embedding.cosine_distance(query_vectors.c.embedding)
+        reranked = (
+            select(
+                query_vectors.c.ordinality,
+                candidates.c.node_id,
+                candidates.c.text,
+                candidates.c.metadata_,
+                distance.label("distance"),
+                func.row_number()
+                .over(partition_by=query_vectors.c.ordinality, order_by=distance)
+                .label("rank"),
+            )
+            .select_from(query_vectors.join(candidates, true()))
+            .subquery("reranked")
+        )
+        return (
+            select(
+                reranked.c.ordinality,
+                reranked.c.node_id,
+                reranked.c.text,
+                reranked.c.metadata_,
+                reranked.c.distance,
+            )
+            .where(reranked.c.rank <= limit)
+            .order_by(reranked.c.ordinality, reranked.c.rank)
+        )
+
+    def _build_hybrid_query(
+        self,
+        embedding: List[float],
+        query_str: str,
+        limit: int = 10,
+        metadata_filters: Optional[MetadataFilters] = None,
+        dense_top_k: Optional[int] = None,
+        sparse_top_k: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Builds one statement fusing the ANN and full-text rankings of a query.
+
+        The top `dense_top_k` rows by vector distance and the top `sparse_top_k` rows by
+        `ts_rank` over `text_search_tsv` are numbered by rank, full outer joined on id and
+        ordered by their reciprocal rank fusion score, sum(1 / (hybrid_rrf_k + rank)).
+        Query terms are OR-ed, so rows matching only some of them still rank lexically.
+        """
+        from sqlalchemy import Float, Text, bindparam, cast, func, literal, select
+        from sqlalchemy.dialects.postgresql import REGCONFIG, TSQUERY
+
+        table = self._table_class
+        dense = self._build_query(
+            embedding,
+            dense_top_k or limit,
+            metadata_filters,
+            **kwargs,
+        ).subquery("dense")
+        dense_ranked = select(
+            dense.c.id,
+            func.row_number().over(order_by=dense.c.distance).label("rank"),
+        ).subquery("dense_ranked")
+
+        text_search_config = cast(
+            bindparam("ts_config", self.text_search_config),
+            REGCONFIG,
+        )
+        tsquery = cast(
+            func.replace(
+                cast(func.plainto_tsquery(text_search_config, query_str), Text),
+                " & ",
+                " | ",
+            ),
+            TSQUERY,
+        )
+        # Normalization 1 divides by 1 + log(document length), as BM25 damps long texts
+        text_rank = func.ts_rank(table.text_search_tsv, tsquery, 1)
+        sparse = (
+            select(
+                table.id,
+                func.row_number().over(order_by=text_rank.desc()).label("rank"),
+            )
+            .where(table.text_search_tsv.op("@@")(tsquery))
+            .order_by(text_rank.desc())
+        )
+        sparse_ranked = self._apply_filters_and_limit(
+            sparse,
+            sparse_top_k or limit,
+            metadata_filters,
+        ).subquery("sparse_ranked")
+
+        rrf_k = literal(float(self.hybrid_rrf_k), Float)
+        score = func.coalesce(1.0 / (rrf_k + dense_ranked.c.rank), 0.0) + func.coalesce(
+            1.0 / (rrf_k + sparse_ranked.c.rank),
+            0.0,
+        )
+        fused = (
+            select(
+                func.coalesce(dense_ranked.c.id, sparse_ranked.c.id).label("id"),
+                score.label("score"),
+            )
+            .select_from(
+                dense_ranked.join(
+                    sparse_ranked,
+                    dense_ranked.c.id == sparse_ranked.c.id,
+                    full=True,
+                ),
+            )
+            .subquery("fused")
+        )
+        return (
+            select(table.node_id, table.text, table.metadata_, fused.c.score)
+            .join(fused, table.id == fused.c.id)
+            .order_by(fused.c.score.desc(), table.id)
+            .limit(limit)
+        )
+
     def _query_with_score(
         self,
         embedding: Optional[List[float]],
@@ -623,16 +1506,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
     ) -> List[DBEmbeddingRow]:
         stmt = self._build_query(embedding, limit, metadata_filters, **kwargs)
         with self._session() as session, session.begin():
-            from sqlalchemy import text
-
-            diskann_l_value_is = (
-                kwargs.get("diskann_l_value_is")
-                or self.pgdiskann_kwargs["diskann_l_value_is"]
-            )
-            session.execute(
-                text("SET diskann.l_value_is = :l_value_is"),
-                {"l_value_is": diskann_l_value_is},
-            )
+            self._set_search_params(session, **kwargs)
 
             res = session.execute(
                 stmt,
@@ -654,30 +1528,281 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
         metadata_filters: Optional[MetadataFilters] = None,
         **kwargs: Any,
     ) -> List[DBEmbeddingRow]:
-        stmt = self._build_query(embedding, limit, metadata_filters)
+        stmt = self._build_query(embedding, limit, metadata_filters, **kwargs)
         async with self._async_session() as async_session, async_session.begin():
-            from sqlalchemy import text
+            await self._aset_search_params(async_session, **kwargs)
 
-            if self.pgdiskann_kwargs:
-                diskann_l_value_is = (
-                    kwargs.get("diskann_l_value_is")
-                    or self.pgdiskann_kwargs["diskann_l_value_is"]
+            res = await async_session.execute(stmt)
+            return [
+                DBEmbeddingRow(
+                    node_id=item.node_id,
+                    text=item.text,
+                    metadata=item.metadata_,
+                    similarity=(1 - item.distance) if item.distance is not None else 0,
                 )
-                await async_session.execute(
-                    text(f"SET diskann.l_value_is = {diskann_l_value_is}"),
+                for item in res.all()
+            ]
+
+    def _set_search_params(self, session: Any, **kwargs: Any) -> None:
+        from sqlalchemy import text
+
+        diskann_l_value_is = (
+            kwargs.get("diskann_l_value_is")
+            or self.pgdiskann_kwargs["diskann_l_value_is"]
+        )
+        session.execute(
+            text("SELECT set_config('diskann.l_value_is', :l_value_is, true)"),
+            {"l_value_is": str(diskann_l_value_is)},
+        )
+
+    def _hybrid_query_with_score(
+        self,
+        embedding: Optional[List[float]],
+        query_str: Optional[str],
+        limit: int = 10,
+        metadata_filters: Optional[MetadataFilters] = None,
+        **kwargs: Any,
+    ) -> List[DBEmbeddingRow]:
+        if not self.hybrid_search:
+            raise ValueError(f"Hybrid search is not enabled for {self.table_name}")
+        if not query_str:
+            return self._query_with_score(embedding, limit, metadata_filters, **kwargs)
+
+        stmt = self._build_hybrid_query(
+            embedding,
+            query_str,
+            limit,
+            metadata_filters,
+            **kwargs,
+        )
+        with self._session() as session, session.begin():
+            self._set_search_params(session, **kwargs)
+            return [
+                DBEmbeddingRow(
+                    node_id=item.node_id,
+                    text=item.text,
+                    metadata=item.metadata_,
+                    similarity=item.score,
                 )
+                for item in session.execute(stmt).all()
+            ]
+
+    async def _ahybrid_query_with_score(
+        self,
+        embedding: Optional[List[float]],
+        query_str: Optional[str],
+        limit: int = 10,
+        metadata_filters: Optional[MetadataFilters] = None,
+        **kwargs: Any,
+    ) -> List[DBEmbeddingRow]:
+        if not self.hybrid_search:
+            raise ValueError(f"Hybrid search is not enabled for {self.table_name}")
+        if not query_str:
+            return await self._aquery_with_score(
+                embedding,
+                limit,
+                metadata_filters,
+                **kwargs,
+            )
 
+        stmt = self._build_hybrid_query(
+            embedding,
+            query_str,
+            limit,
+            metadata_filters,
+            **kwargs,
+        )
+        async with self._async_session() as async_session, async_session.begin():
+            await self._aset_search_params(async_session, **kwargs)
             res = await async_session.execute(stmt)
             return [
                 DBEmbeddingRow(
                     node_id=item.node_id,
                     text=item.text,
                     metadata=item.metadata_,
-                    similarity=(1 - item.distance) if item.distance is not None else 0,
+                    similarity=item.score,
                 )
                 for item in res.all()
             ]
 
+    async def _aset_search_params(self, async_session: Any, **kwargs: Any) -> None:
+        from sqlalchemy import text
+
+        if self.pgdiskann_kwargs:
+            diskann_l_value_is = (
+                kwargs.get("diskann_l_value_is")
+                or self.pgdiskann_kwargs["diskann_l_value_is"]
+            )
+            # Transaction-local, so the setting never leaks into a shared pool
+            await async_session.execute(
+                text("SELECT set_config('diskann.l_value_is', :l_value_is, true)"),
+                {"l_value_is": str(diskann_l_value_is)},
+            )
+
+    async def _aquery_many_with_score(
+        self,
+        embeddings: List[List[float]],
+        limits: List[int],
+        metadata_filters: List[Optional[MetadataFilters]],
+        **kwargs: Any,
+    ) -> List[List[DBEmbeddingRow]]:
+        # Queries sharing the same filters share one LATERAL statement
+        groups: Dict[Optional[str], List[int]] = {}
+        for position, filters in enumerate(metadata_filters):
+            key = filters.model_dump_json() if filters else None
+            groups.setdefault(key, []).append(position)
+
+        results: List[List[DBEmbeddingRow]] = [[] for _ in embeddings]
+        async with self._async_session() as async_session, async_session.begin():
+            await self._aset_search_params(async_session, **kwargs)
+
+            for positions in groups.values():
+                stmt = self._build_batch_query(
+                    [embeddings[position] for position in positions],
+                    max(limits[position] for position in positions),
+                    metadata_filters[positions[0]],
+                    **kwargs,
+                )
+                res = await async_session.execute(stmt)
+                for item in res.all():
+                    position = positions[item.ordinality - 1]
+                    if len(results[position]) >= limits[position]:
+                        continue
+                    results[position].append(
+                        DBEmbeddingRow(
+                            node_id=item.node_id,
+                            text=item.text,
+                            metadata=item.metadata_,
+                            similarity=(
+                                (1 - item.distance) if item.distance is not None else 0
+                            ),
+                        ),
+                    )
+
+        return results
+
+    def _invalidate_exact_candidates(self) -> None:
+        """Drop cached candidate sets after a write through this store."""
+        self._exact_candidates.clear()
+
+    def _exact_candidates_query(self, metadata_filters: MetadataFilters) -> Any:
+        from sqlalchemy import select
+
+        # Probe one row past the threshold: enough to tell a small set from a large one
+        stmt = select(
+            self._table_class.node_id,
+            self._table_class.text,
+            self._table_class.metadata_,
+            self._table_class.embedding,
+        ).where(self._recursively_apply_filters(metadata_filters))
+        return stmt.limit(self.exact_search_threshold + 1)
+
+    def _to_exact_candidates(self, rows: List[Any]) -> _ExactCandidates:
+        if len(rows) > self.exact_search_threshold:
+            return _ExactCandidates(time.monotonic(), [], [], [], None)
+
+        embeddings = np.array(
+            [_embedding_to_numpy(row.embedding) for row in rows],
+            dtype=np.float32,
+        ).reshape(len(rows), self.embed_dim)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1, norms)
+        return _ExactCandidates(
+            loaded_at=time.monotonic(),
+            node_ids=[row.node_id for row in rows],
+            texts=[row.text for row in rows],
+            metadatas=[row.metadata_ for row in rows],
+            embeddings=embeddings,
+        )
+
+    def _cached_exact_candidates(self, key: str) -> Optional[_ExactCandidates]:
+        candidates = self._exact_candidates.get(key)
+        if candidates is None:
+            return None
+        if time.monotonic() - candidates.loaded_at > self.exact_search_cache_ttl:
+            return None
+        return candidates
+
+    @staticmethod
+    def _exact_top_k(
+        candidates: _ExactCandidates,
+        embedding: List[float],
+        limit: int,
+    ) -> List[DBEmbeddingRow]:
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1
+        similarities = candidates.embeddings @ query
+
+        limit = min(limit, len(similarities))
+        if limit == 0:
+            return []
+        top = np.argpartition(-similarities, limit - 1)[:limit]
+        top = top[np.argsort(-similarities[top])]
+        return [
+            DBEmbeddingRow(
+                node_id=candidates.node_ids[i],
+                text=candidates.texts[i],
+                metadata=candidates.metadatas[i],
+                similarity=float(similarities[i]),
+            )
+            for i in top
+        ]
+
+    def _exact_query_with_score(
+        self,
+        embedding: Optional[List[float]],
+        limit: int,
+        metadata_filters: Optional[MetadataFilters],
+    ) -> Optional[List[DBEmbeddingRow]]:
+        """
+        Exact top-k for filters matching at most `exact_search_threshold` rows.
+
+        Returns None when exact search is off or the filter is not selective enough,
+        in which case the caller falls back to the index.
+        """
+        if not self.exact_search_threshold or not metadata_filters or embedding is None:
+            return None
+
+        key = metadata_filters.model_dump_json()
+        candidates = self._cached_exact_candidates(key)
+        if candidates is None:
+            with self._session() as session:
+                rows = session.execute(
+                    self._exact_candidates_query(metadata_filters),
+                ).all()
+            candidates = self._to_exact_candidates(rows)
+            self._exact_candidates.put(key, candidates)
+
+        if candidates.embeddings is None:
+            return None
+        return self._exact_top_k(candidates, embedding, limit)
+
+    async def _aexact_query_with_score(
+        self,
+        embedding: Optional[List[float]],
+        limit: int,
+        metadata_filters: Optional[MetadataFilters],
+    ) -> Optional[List[DBEmbeddingRow]]:
+        """Async version of `_exact_query_with_score`."""
+        if not self.exact_search_threshold or not metadata_filters or embedding is None:
+            return None
+
+        key = metadata_filters.model_dump_json()
+        candidates = self._cached_exact_candidates(key)
+        if candidates is None:
+            async with self._async_session() as async_session:
+                rows = (
+                    await async_session.execute(
+                        self._exact_candidates_query(metadata_filters),
+                    )
+                ).all()
+            candidates = self._to_exact_candidates(rows)
+            self._exact_candidates.put(key, candidates)
+
+        if candidates.embeddings is None:
+            return None
+        return self._exact_top_k(candidates, embedding, limit)
+
     def _db_rows_to_query_result(
         self,
         rows: List[DBEmbeddingRow],
@@ -712,10 +1837,26 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
         **kwargs: Any,
     ) -> VectorStoreQueryResult:
         if query.mode == VectorStoreQueryMode.DEFAULT:
-            results = await self._aquery_with_score(
+            results = await self._aexact_query_with_score(
                 query.query_embedding,
                 query.similarity_top_k,
                 query.filters,
+            )
+            if results is None:
+                results = await self._aquery_with_score(
+                    query.query_embedding,
+                    query.similarity_top_k,
+                    query.filters,
+                    **kwargs,
+                )
+        elif query.mode == VectorStoreQueryMode.HYBRID:
+            results = await self._ahybrid_query_with_score(
+                query.query_embedding,
+                query.query_str,
+                query.hybrid_top_k or query.similarity_top_k,
+                query.filters,
+                dense_top_k=query.similarity_top_k,
+                sparse_top_k=query.sparse_top_k,
                 **kwargs,
             )
         else:
@@ -723,12 +1864,60 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
 
         return self._db_rows_to_query_result(results)
 
+    async def aquery_many(
+        self,
+        queries: List[VectorStoreQuery],
+        **kwargs: Any,
+    ) -> List[VectorStoreQueryResult]:
+        """Runs several top-k searches in one round trip per distinct filter set.
+
+        All queries run in a single session; `diskann.l_value_is` is set once for
+        the whole batch. Queries with identical filters are answered by a single
+        LATERAL statement over the unnested query vectors.
+
+        Args:
+            queries (List[VectorStoreQuery]): Queries to run, in DEFAULT mode.
+
+        Returns:
+            List[VectorStoreQueryResult]: One result per query, in input order.
+        """
+        if not queries:
+            return []
+
+        for query in queries:
+            if query.mode != VectorStoreQueryMode.DEFAULT:
+                raise ValueError(f"Invalid query mode: {query.mode}")
+
+        results = await self._aquery_many_with_score(
+            [query.query_embedding for query in queries],
+            [query.similarity_top_k for query in queries],
+            [query.filters for query in queries],
+            **kwargs,
+        )
+        return [self._db_rows_to_query_result(rows) for rows in results]
+
     def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
         if query.mode == VectorStoreQueryMode.DEFAULT:
-            results = self._query_with_score(
+            results = self._exact_query_with_score(
                 query.query_embedding,
                 query.similarity_top_k,
                 query.filters,
+            )
+            if results is None:
+                results = self._query_with_score(
+                    query.query_embedding,
+                    query.similarity_top_k,
+                    query.filters,
+                    **kwargs,
+                )
+        elif query.mode == VectorStoreQueryMode.HYBRID:
+            results = self._hybrid_query_with_score(
+                query.query_embedding,
+                query.query_str,
+                query.hybrid_top_k or query.similarity_top_k,
+                query.filters,
+                dense_top_k=query.similarity_top_k,
+                sparse_top_k=query.sparse_top_k,
                 **kwargs,
             )
         else:
@@ -746,6 +1935,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
 
             session.execute(stmt)
             session.commit()
+        self._invalidate_exact_candidates()
 
     def delete_nodes(
         self,
@@ -768,13 +1958,14 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
             stmt = delete(self._table_class)
 
             if node_ids:
-                stmt = stmt.where(self._table_class.node_id.in_(node_ids))
+                stmt = self._delete_node_ids_stmt(node_ids)
 
             if filters:
                 stmt = stmt.where(self._recursively_apply_filters(filters))
 
             session.execute(stmt)
             session.commit()
+        self._invalidate_exact_candidates()
 
     async def adelete_nodes(
         self,
@@ -797,13 +1988,14 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
             stmt = delete(self._table_class)
 
             if node_ids:
-                stmt = stmt.where(self._table_class.node_id.in_(node_ids))
+                stmt = self._delete_node_ids_stmt(node_ids)
 
             if filters:
                 stmt = stmt.where(self._recursively_apply_filters(filters))
 
             await async_session.execute(stmt)
             await async_session.commit()
+        self._invalidate_exact_candidates()
 
     def clear(self) -> None:
         """Clears table."""
@@ -814,6 +2006,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
 
             session.execute(stmt)
             session.commit()
+        self._invalidate_exact_candidates()
 
     async def aclear(self) -> None:
         """Asynchronously clears table."""
@@ -824,6 +2017,7 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
 
             await async_session.execute(stmt)
             await async_session.commit()
+        self._invalidate_exact_candidates()
 
     def get_nodes(
         self,
@@ -860,6 +2054,8 @@ class PGDiskAnnVectorStore(BasePydanticVectorStore):
                 text = item.text
                 metadata = item.metadata_
                 embedding = item.embedding
+                if embedding is not None:
+                    embedding = _embedding_to_numpy(embedding).tolist()
 
                 try:
                     node = metadata_dict_to_node(metadata)
@@ -0,0 +1,194 @@
+"""
+Recall/latency tuning of pg_diskann search parameters.
+
+The exact top-k of every query is computed with a brute-force scan (index scans
+disabled for the transaction), then each combination of `diskann_l_value_is` and
+`quantized_fetch_limit` is timed and scored by recall@k against it. Every
+`diskann_l_value_is` is also measured without the full-precision re-rank, so the
+re-rank is only kept where the recall target needs it. Sweep results can be saved to a
+JSON tuning file and read back at startup to pick the cheapest settings that meet a
+recall target.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from src.llama_index.vector_stores.pgdiskann.base import PGDiskAnnVectorStore
+
+_logger = logging.getLogger(__name__)
+
+
+class TuningResult(NamedTuple):
+    diskann_l_value_is: float
+    quantized_fetch_limit: int
+    recall: float
+    p50_ms: float
+    p99_ms: float
+    # False: index order is final, `quantized_fetch_limit` is unused
+    use_reranking: bool = True
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def aexact_top_k_ids(
+    vector_store: PGDiskAnnVectorStore,
+    embedding: List[float],
+    k: int,
+) -> List[str]:
+    """Node ids of the exact top-k by full-precision cosine distance."""
+    from sqlalchemy import select, text
+
+    table = vector_store._table_class
+    stmt = (
+        select(table.node_id)
+        .order_by(table.embedding.cosine_distance(embedding))
+        .limit(k)
+    )
+    async with vector_store._async_session() as session, session.begin():
+        # Force a sequential scan so the pg_diskann index cannot be used
+        await session.execute(
+            text(
+                "SELECT set_config('enable_indexscan', 'off', true), "
+                "set_config('enable_bitmapscan', 'off', true)",
+            ),
+        )
+        return list((await session.execute(stmt)).scalars())
+
+
+async def asweep(
+    vector_store: PGDiskAnnVectorStore,
+    query_embeddings: List[List[float]],
+    k: int = 10,
+    l_values: Iterable[float] = (16, 32, 64, 100, 128, 200),
+    fetch_limits: Iterable[int] = (20, 30, 50, 80, 120),
+) -> List[TuningResult]:
+    """
+    Measure recall@k and latency of every (l_value_is, quantized_fetch_limit) pair, and
+    of every l_value_is without re-ranking.
+    """
+    ground_truth = [
+        set(await aexact_top_k_ids(vector_store, embedding, k))
+        for embedding in query_embeddings
+    ]
+
+    # Warm up shared buffers so the first combination is not penalised
+    for embedding in query_embeddings:
+        await vector_store._aquery_with_score(embedding, k)
+
+    async def measure(**search_params) -> TuningResult:
+        latencies, recalls = [], []
+        for embedding, expected in zip(query_embeddings, ground_truth):
+            started = time.perf_counter()
+            rows = await vector_store._aquery_with_score(
+                embedding,
+                k,
+                **search_params,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            found = {row.node_id for row in rows}
+            recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+        return TuningResult(
+            recall=sum(recalls) / len(recalls),
+            p50_ms=_percentile(latencies, 50),
+            p99_ms=_percentile(latencies, 99),
+            **search_params,
+        )
+
+    results = []
+    for l_value_is in l_values:
+        results.append(
+            await measure(
+                diskann_l_value_is=l_value_is,
+                quantized_fetch_limit=k,
+                use_reranking=False,
+            ),
+        )
+        for fetch_limit in fetch_limits:
+            if fetch_limit < k:
+                continue
+            results.append(
+                await measure(
+                    diskann_l_value_is=l_value_is,
+                    quantized_fetch_limit=fetch_limit,
+                    use_reranking=True,
+                ),
+            )
+    return results
+
+
+def recommend(
+    results: Iterable[TuningResult],
+    recall_target: float,
+) -> Optional[TuningResult]:
+    """Cheapest result (by p50, then p99) that meets `recall_target`, if any."""
+    candidates = [result for result in results if result.recall >= recall_target]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda result: (result.p50_ms, result.p99_ms))
+
+
+def save_tuning_file(
+    path: str,
+    table_name: str,
+    k: int,
+    results: List[TuningResult],
+) -> None:
+    """Write (or replace) the sweep results of `table_name` in the tuning file."""
+    tuning_file = Path(path)
+    tuning = json.loads(tuning_file.read_text()) if tuning_file.exists() else {}
+    tuning[table_name] = {
+        "k": k,
+        "results": [result._asdict() for result in results],
+    }
+    tuning_file.write_text(json.dumps(tuning, indent=2))
+
+
+def load_tuning_file(path: str) -> Dict[str, List[TuningResult]]:
+    tuning = json.loads(Path(path).read_text())
+    return {
+        table_name: [TuningResult(**result) for result in table["results"]]
+        for table_name, table in tuning.items()
+    }
+
+
+def tuned_search_params(
+    path: str,
+    table_name: str,
+    recall_target: float,
+) -> Optional[dict]:
+    """
+    Search params recommended for `table_name` by the tuning file at `path`.
+
+    Returns None when the file or table is missing or no setting meets the target, in
+    which case the configured defaults apply.
+    """
+    if not Path(path).exists():
+        _logger.warning(f"Vector search tuning file {path} not found")
+        return None
+
+    results = load_tuning_file(path).get(table_name)
+    best = recommend(results or [], recall_target)
+    if best is None:
+        _logger.warning(
+            f"No tuned search params for {table_name} reach recall {recall_target}",
+        )
+        return None
+
+    _logger.info(
+        f"Tuned search params for {table_name}: l_value_is={best.diskann_l_value_is}, "
+        f"quantized_fetch_limit={best.quantized_fetch_limit}, "
+        f"use_reranking={best.use_reranking} "
+        f"(recall {best.recall:.3f}, p50 {best.p50_ms:.1f} ms, p99 {best.p99_ms:.1f} ms)",
+    )
+    return {
+        "diskann_l_value_is": best.diskann_l_value_is,
+        "quantized_fetch_limit": best.quantized_fetch_limit,
+        "use_reranking": best.use_reranking,
+    }
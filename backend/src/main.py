@@ -1,20 +1,31 @@
+import asyncio
 import warnings
 from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from fastapi.staticfiles import StaticFiles
 from openinference.instrumentation.llama_index import LlamaIndexInstrumentor
-from pgvector.asyncpg import register_vector
 from phoenix.otel import register
+from src.agents import AgentRegistry
 from src.config.config import settings
 from src.config.embed_model import EmbedModelManager
 from src.config.llm import LLMManager
+from src.config.memory import get_mem0_memory
 from src.config.vector_store import VectorStoreManager
-from src.database import engine
+from src.database import pools
 from src.logger import logger
 from src.middleware.user_middleware import add_user_id_to_request
-from src.routes import agents, products, reset, reviews, users
+from src.routes import agents, metrics, products, reset, reviews, users
+from src.services.memory import UserMemoryService
+from src.services.personalization_notifier import PersonalizationNotifier
+from src.services.personalization_queue import (
+    PersonalizationJobQueue,
+    PersonalizationWorkerPool,
+)
+from src.utils.single_flight import SingleFlight
+from src.workflows.utils import run_workflow_for_product
 from starlette.responses import FileResponse
 
 
@@ -42,11 +53,8 @@ warnings.filterwarnings(
 async def lifespan(app: FastAPI):
     """Initialize singleton dependencies at app startup and clean them up on shutdown."""
 
-    async with engine.begin() as conn:
-        raw_connection = await conn.get_raw_connection()
-        asyncpg_conn = raw_connection.driver_connection
-        await register_vector(asyncpg_conn)
-        logger.info("pgvector extension registered successfully")
+    # No pgvector asyncpg codecs on the pooled connections: the vector stores share
+    # the app pool, and SQLAlchemy's pgvector type binds vectors as text
 
     # Create global instances
     app.state.vector_store_products_embeddings = (
@@ -61,6 +69,27 @@ async def lifespan(app: FastAPI):
     )
     app.state.llm = await LLMManager.get_llm()
     app.state.embed_model = await EmbedModelManager.get_embed_model()
+    app.state.memory = UserMemoryService(await asyncio.to_thread(get_mem0_memory))
+    app.state.agent_registry = await AgentRegistry.initialize(
+        llm=app.state.llm,
+        embed_model=app.state.embed_model,
+        vector_store_reviews_embeddings=app.state.vector_store_reviews_embeddings,
+    )
+    app.state.personalization_notifier = PersonalizationNotifier()
+    await app.state.personalization_notifier.start()
+    app.state.personalization_flights = SingleFlight()
+    app.state.job_queue = PersonalizationJobQueue()
+    app.state.personalization_workers = PersonalizationWorkerPool(
+        app.state.job_queue,
+        partial(
+            run_workflow_for_product,
+            llm=app.state.llm,
+            embed_model=app.state.embed_model,
+            memory=app.state.memory,
+            vector_store_products_embeddings=app.state.vector_store_products_embeddings,
+            vector_store_reviews_embeddings=app.state.vector_store_reviews_embeddings,
+        ),
+    )
 
     tracer_provider = register(
         project_name=settings.PHOENIX_PROJECT_NAME,
@@ -75,12 +104,30 @@ async def lifespan(app: FastAPI):
         tracer_provider=tracer_provider,
     )
 
+    app.state.personalization_workers.start()
+
     yield  # App runs
 
+    # Jobs still running are handed back to the queue for another worker
+    await app.state.personalization_workers.stop()
+    await app.state.personalization_notifier.aclose()
+    await app.state.memory.aclose()
+    await app.state.vector_store_products_embeddings.close()
+    await app.state.vector_store_reviews_embeddings.close()
+    await pools.dispose()
+    logger.info("Database connection pools disposed")
+
     app.state.vector_store_products_embeddings = None
     app.state.vector_store_reviews_embeddings = None
     app.state.llm = None
     app.state.embed_model = None
+    app.state.memory = None
+    app.state.agent_registry = None
+    app.state.job_queue = None
+    app.state.personalization_workers = None
+    app.state.personalization_notifier = None
+    app.state.personalization_flights = None
+    AgentRegistry.reset()
 
 
 def custom_openapi():
@@ -133,6 +180,7 @@ app.include_router(reviews.router, prefix="/api/v1")
 app.include_router(agents.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(reset.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 
 app.mount("/data", CachedStaticFiles(directory="data/"), name="data")
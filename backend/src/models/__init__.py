@@ -1,4 +1,7 @@
+from .embedding_cache import QueryEmbeddingCache
 from .features import Feature
+from .llm_cache import LLMResponseCache
+from .personalization_job import PersonalizationJob
 from .product_features import ProductFeature
 from .products import PersonalizedProductSection, Product, ProductImage
 from .reviews import Review
@@ -16,4 +19,7 @@ __all__ = [
     "VariantAttribute",
     "Feature",
     "ProductFeature",
+    "QueryEmbeddingCache",
+    "PersonalizationJob",
+    "LLMResponseCache",
 ]
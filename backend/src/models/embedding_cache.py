@@ -0,0 +1,24 @@
+from sqlalchemy import REAL, Column, DateTime, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from .base import Base
+
+
+class QueryEmbeddingCache(Base):
+    __tablename__ = "query_embedding_cache"
+
+    model = Column(String(128), primary_key=True)
+    query = Column(Text, primary_key=True)
+    embedding = Column(ARRAY(REAL), nullable=False)
+    hits = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    last_accessed_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base
+
+
+class LLMResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+
+    # sha256 of the canonical request: model, messages (incl. system prompt), tools,
+    # sampling parameters
+    key = Column(String(64), primary_key=True)
+    model = Column(String(128), nullable=False)
+    response = Column(JSONB, nullable=False)
+    hits = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    last_accessed_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
@@ -0,0 +1,76 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    func,
+)
+from src.schemas.enums import JobStatus
+
+from .base import Base
+
+
+class PersonalizationJob(Base):
+    """
+    A queued or running personalization workflow for one (user, product).
+
+    Done jobs are deleted; failed jobs are kept for inspection. While a job is queued,
+    `available_at` is the earliest time it may be claimed (retries back off); while it
+    runs, it is the end of the worker's lease, after which another worker may reclaim it.
+    """
+
+    __tablename__ = "personalization_jobs"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    product_id = Column(
+        Integer,
+        ForeignKey("product.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    priority = Column(SmallInteger, nullable=False, server_default="0")
+    status = Column(
+        Enum(JobStatus, name="personalization_job_status"),
+        nullable=False,
+        server_default=JobStatus.queued.name,
+    )
+    attempts = Column(Integer, nullable=False, server_default="0")
+    available_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    locked_by = Column(String(128), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # At most one live job per (user, product)
+        Index(
+            "ix_personalization_jobs_live_user_product",
+            "user_id",
+            "product_id",
+            unique=True,
+            postgresql_where=status.in_([JobStatus.queued, JobStatus.running]),
+        ),
+        Index(
+            "ix_personalization_jobs_claim",
+            priority.desc(),
+            "available_at",
+            postgresql_where=status.in_([JobStatus.queued, JobStatus.running]),
+        ),
+    )
@@ -1,10 +1,12 @@
 from typing import List, Optional
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import null, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.models import PersonalizedProductSection
 from src.repository.base import BaseRepository
+from src.schemas.enums import StatusEnum
 
 
 class PersonalizedProductRepository(
@@ -104,3 +106,53 @@ class PersonalizedProductRepository(
         if await self.exists(id):
             return await self.update(id, entity)
         return await self.add(entity)
+
+    def _upsert_status(self, id: tuple[int, int], status: StatusEnum, where=None):
+        product_id, user_id = id
+        stmt = insert(PersonalizedProductSection).values(
+            product_id=product_id,
+            user_id=user_id,
+            status=status,
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[
+                PersonalizedProductSection.product_id,
+                PersonalizedProductSection.user_id,
+            ],
+            set_={
+                "status": stmt.excluded.status,
+                "personalization": null(),
+                "phoenix_trace_id": null(),
+            },
+            where=where,
+        )
+
+    async def set_status(self, id: tuple[int, int], status: StatusEnum) -> None:
+        """Sets the status in one statement, clearing any previous personalization."""
+        await self.db.execute(self._upsert_status(id, status))
+        await self.db.commit()
+
+    async def claim(
+        self,
+        id: tuple[int, int],
+        retrigger: bool = False,
+        queued: bool = False,
+    ) -> bool:
+        """
+        Atomically marks the section running, unless it already is running or, without
+        `retrigger`, done. Returns True if this caller claimed it and should run the
+        workflow; concurrent callers for the same section get False. With `queued`, a
+        running section is claimed too, as its queued job marked it running.
+        """
+        busy = [] if queued else [StatusEnum.running]
+        if not retrigger:
+            busy.append(StatusEnum.done)
+        stmt = self._upsert_status(
+            id,
+            StatusEnum.running,
+            where=PersonalizedProductSection.status.notin_(busy),
+        ).returning(PersonalizedProductSection.product_id)
+        result = await self.db.execute(stmt)
+        claimed = result.first() is not None
+        await self.db.commit()
+        return claimed
@@ -3,7 +3,7 @@ from typing import List, Optional
 from fastapi import HTTPException
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
 from src.models import Product, Review, Variant
 from src.repository.base import BaseRepository
 
@@ -39,6 +39,18 @@ class ProductRepository(BaseRepository[Product, int]):
         product.average_rating = round(average_rating, 2)
         return product
 
+    async def get_summary_by_id(self, id: int) -> Product:
+        """
+        Fetches only the product's own columns: no variants, images, reviews or average
+        rating. Relationships raise if accessed instead of lazy-loading.
+        """
+        query = select(Product).options(raiseload("*")).filter(Product.id == id)
+        product = (await self.db.execute(query)).scalar_one_or_none()
+
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return product
+
     async def get_all(self, page: int, page_size: int) -> tuple[int, List[Product]]:
         query = (
             select(
@@ -1,12 +1,11 @@
 import asyncio
 import json
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import StreamingResponse
 from llama_index.core.agent.workflow import FunctionAgent
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.agents.user_query_agent import UserQueryAgent
-from src.config.memory import get_mem0_memory
 from src.database import get_async_db
 from src.logger import logger
 from src.schemas.agents import QueryRequestSchema
@@ -22,7 +21,6 @@ router = APIRouter(
 async def user_chat(
     request: Request,
     chat_schema: QueryRequestSchema,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_async_db),
 ):
     """
@@ -50,11 +48,11 @@ async def user_chat(
                 user_query=chat_schema.user_query,
                 user_id=request.state.user_id,
                 product_id=chat_schema.product_id,
-                memory=get_mem0_memory(),
+                memory=request.app.state.memory,
                 llm=request.app.state.llm,
                 embed_model=request.app.state.embed_model,
                 message_queue=message_queue,
-                background_tasks=background_tasks,
+                job_queue=request.app.state.job_queue,
                 vector_store_products_embeddings=(
                     request.app.state.vector_store_products_embeddings
                 ),
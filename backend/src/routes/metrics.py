@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Request
+from src.config.config import settings
+from src.database import pools
+from src.workflows.speculation import speculation_stats
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/embedding-cache", response_model=dict)
+async def get_embedding_cache_metrics(request: Request):
+    """Hit/miss/eviction counters of this worker's query embedding cache."""
+    cache_stats = getattr(request.app.state.embed_model, "cache_stats", None)
+    if cache_stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache_stats()}
+
+
+@router.get("/llm-cache", response_model=dict)
+async def get_llm_cache_metrics(request: Request):
+    """Hit rates of this worker's LLM response caches, per opted-in agent."""
+    return {
+        "enabled": settings.LLM_CACHE_ENABLED,
+        "agents": request.app.state.agent_registry.llm_cache_stats(),
+    }
+
+
+@router.get("/memory", response_model=dict)
+async def get_memory_metrics(request: Request):
+    """Preference cache counters and pending memory writes of this worker."""
+    return request.app.state.memory.stats()
+
+
+@router.get("/personalization-queue", response_model=dict)
+async def get_personalization_queue_metrics(request: Request):
+    """Personalization job queue depth, and this worker's busy job workers."""
+    return {
+        **await request.app.state.job_queue.depth(),
+        "workers": request.app.state.personalization_workers.workers,
+        "workers_busy": request.app.state.personalization_workers.running,
+    }
+
+
+@router.get("/personalization-notifier", response_model=dict)
+async def get_personalization_notifier_metrics(request: Request):
+    """Listener connection state and requests waiting on personalizations."""
+    return request.app.state.personalization_notifier.stats()
+
+
+@router.get("/personalization-flights", response_model=dict)
+async def get_personalization_flight_metrics(request: Request):
+    """Inline personalization runs of this worker, and requests that shared one."""
+    return request.app.state.personalization_flights.stats()
+
+
+@router.get("/workflow-speculation", response_model=dict)
+async def get_workflow_speculation_metrics():
+    """Agent runs this worker started before the plan, and the agent time saved or wasted."""
+    return {
+        "agents": settings.WORKFLOW_SPECULATIVE_AGENTS,
+        **speculation_stats.stats(),
+    }
+
+
+@router.get("/db-pools", response_model=dict)
+async def get_db_pool_metrics():
+    """Occupancy and checkout wait times of this worker's connection pools."""
+    return pools.stats()
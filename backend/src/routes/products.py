@@ -1,4 +1,5 @@
 import asyncio
+from functools import partial
 from typing import Optional
 
 import phoenix as px
@@ -7,14 +8,14 @@ from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters
 from phoenix.trace.dsl import SpanQuery
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.config.config import settings
-from src.config.memory import get_mem0_memory
-from src.database import get_async_db
-from src.models.products import StatusEnum
+from src.database import Session, get_async_db
+from src.models.products import PersonalizedProductSection, StatusEnum
 from src.repository import (
     PersonalizedProductRepository,
     ProductRepository,
     ReviewRepository,
 )
+from src.schemas.enums import JobPriority
 from src.schemas.personalization import (
     PersonalizationRequest,
     PersonalizationResponseSchema,
@@ -26,6 +27,7 @@ from src.schemas.products import (
 )
 from src.schemas.reviews import PaginatedReviewResponseSchema, ReviewResponseSchema
 from src.services.agent_workflow import MultiAgentWorkflowService
+from src.services.personalization_notifier import PersonalizationNotifier
 from src.utils import parse_trace_to_flow
 from src.utils.utils import parse_search_trace_to_flow, set_personalization_status
 
@@ -158,16 +160,76 @@ async def generate_personalized_content(
     if fault_correction:
         personalized_section = None
 
-    timeout = 60
-    start_time = asyncio.get_running_loop().time()
-    while personalized_section and personalized_section.status is StatusEnum.running:
-        if asyncio.get_running_loop().time() - start_time > timeout:
-            personalized_section = None
-            break
-        await db.refresh(personalized_section)  # Explicitly refresh the object
-        await asyncio.sleep(2)
+    timed_out = False
+    if personalized_section and personalized_section.status is StatusEnum.running:
+        # The user is waiting on it now: run it before speculative jobs
+        await request.app.state.job_queue.prioritize(
+            request.state.user_id,
+            product_id,
+            JobPriority.viewing,
+        )
+        personalized_section = await _wait_for_personalization(
+            request.app.state.personalization_notifier,
+            db,
+            request.state.user_id,
+            product_id,
+        )
+        timed_out = personalized_section is None
 
     if not personalized_section:
+        # Concurrent requests for this personalization share one workflow run
+        personalized_section = await request.app.state.personalization_flights.run(
+            (request.state.user_id, product_id),
+            partial(
+                _personalize,
+                request,
+                product_id,
+                fault_correction,
+                force=timed_out,
+            ),
+        )
+    return personalized_section
+
+
+async def _personalize(
+    request: Request,
+    product_id: int,
+    fault_correction: bool,
+    force: bool = False,
+) -> PersonalizedProductSection:
+    """
+    Runs the workflow if this request claims the personalization, otherwise waits for
+    the run that did. `force` runs it regardless, for a run that seems stuck.
+    """
+    user_id = request.state.user_id
+    # Its own session: the run is shared, and outlives the request that started it
+    async with Session() as db:
+        if not force:
+            claimed = await PersonalizedProductRepository(db).claim(
+                id=(product_id, user_id),
+                retrigger=fault_correction,
+            )
+            if not claimed:
+                personalized_section = await _wait_for_personalization(
+                    request.app.state.personalization_notifier,
+                    db,
+                    user_id,
+                    product_id,
+                )
+                if personalized_section:
+                    return personalized_section
+                force = True
+
+        if force:
+            # Its queued job would run it again and overwrite this run's result
+            await request.app.state.job_queue.cancel(user_id, product_id)
+            await set_personalization_status(
+                db,
+                user_id,
+                product_id,
+                StatusEnum.running,
+            )
+
         # TODO move filter creation to helper fn
         filters = MetadataFilters(
             filters=[
@@ -177,7 +239,7 @@ async def generate_personalized_content(
 
         # TODO handle workflow failures
         workflow_service = MultiAgentWorkflowService(
-            user_id=request.state.user_id,
+            user_id=user_id,
             product_id=product_id,
             db=db,
             llm=request.app.state.llm,
@@ -189,22 +251,59 @@ async def generate_personalized_content(
                 request.app.state.vector_store_reviews_embeddings
             ),
             filters=filters,
-            memory=get_mem0_memory(),
+            memory=request.app.state.memory,
             fault_correction=fault_correction,
         )
-
-        await set_personalization_status(
-            db,
-            request.state.user_id,
-            product_id,
-            StatusEnum.running,
-        )
         response, trace_id = await workflow_service.run_workflow()
-        personalized_section = await workflow_service.save_workflow_response(
+        return await workflow_service.save_workflow_response(
             response,
             trace_id,
         )
-    return personalized_section
+
+
+async def _wait_for_personalization(
+    notifier: PersonalizationNotifier,
+    db: AsyncSession,
+    user_id: int,
+    product_id: int,
+) -> Optional[PersonalizedProductSection]:
+    """
+    Waits for a running personalization to finish, without holding a connection.
+
+    Returns the finished section, or None if it timed out or was deleted meanwhile.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.PERSONALIZATION_WAIT_TIMEOUT_SECONDS
+    with notifier.subscribe(user_id, product_id) as finished:
+        while True:
+            # Returns the connection to the pool, and empties the identity map so the
+            # section is read afresh
+            await db.close()
+            finished.clear()
+            try:
+                personalized_section = await PersonalizedProductRepository(
+                    db,
+                ).get_by_id(id=(product_id, user_id))
+            except HTTPException:
+                return None
+            if personalized_section.status is not StatusEnum.running:
+                return personalized_section
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            await db.close()
+            try:
+                # Re-read now and then anyway, in case a notification was missed
+                await asyncio.wait_for(
+                    finished.wait(),
+                    timeout=min(
+                        remaining,
+                        settings.PERSONALIZATION_WAIT_RECHECK_SECONDS,
+                    ),
+                )
+            except asyncio.TimeoutError:
+                pass
 
 
 @router.get(
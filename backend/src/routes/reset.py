@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database import get_async_db
 from src.services.reset import reset_user_preferences
@@ -11,9 +11,11 @@ router = APIRouter(
 
 
 @router.post("", response_model=dict)
-async def reset(db: AsyncSession = Depends(get_async_db)):
+async def reset(request: Request, db: AsyncSession = Depends(get_async_db)):
 
     reset_status = await reset_user_preferences(db=db)
+    # The memories were replaced underneath this worker's preference cache
+    request.app.state.memory.clear()
 
     if reset_status is True:
         return {
@@ -25,6 +25,7 @@ class PersonalizedCardTypes(enum.Enum):
 
 class EventType(enum.Enum):
     PERSONALIZATION_WORKFLOW = "personalization_workflow"
+    PERSONALIZATION_CARD = "personalization_card"
     PRODUCT_SEARCH = "product_search"
     MEMORY = "memory"
     ERROR = "error"
@@ -35,3 +36,16 @@ class StatusEnum(enum.Enum):
     running = "in-progress"
     done = "done"
     failed = "failed"
+
+
+class JobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    failed = "failed"
+
+
+class JobPriority(enum.IntEnum):
+    """Higher runs first."""
+
+    speculative = 0  # products in search results the user may open
+    viewing = 10  # the product the user is looking at
@@ -23,14 +23,17 @@ class FeatureCard(BaseModel):
     text: str
 
 
+PersonalizationCard = Union[ListItem, TextCard, FeatureCard]
+
+
 class PersonalizationSection(BaseModel):
-    personalization: List[Union[ListItem, TextCard, FeatureCard]]
+    personalization: List[PersonalizationCard]
 
 
 class PersonalizationResponseSchema(BaseModel):
     product_id: int
     user_id: int
-    personalization: List[Union[ListItem, TextCard, FeatureCard]]
+    personalization: List[PersonalizationCard]
     status: str
 
 
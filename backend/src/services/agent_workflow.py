@@ -4,26 +4,29 @@ from typing import Optional
 from fastapi.exceptions import HTTPException
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.base.llms.base import BaseLLM
-from llama_index.core.memory import BaseMemory
 from llama_index.core.vector_stores.types import (
     BasePydanticVectorStore,
     MetadataFilters,
 )
 from llama_index.core.workflow.errors import WorkflowTimeoutError
 from src.agents import (
+    AgentRegistry,
     get_evaluation_agent,
     get_inventory_agent,
     get_planning_agent,
     get_presentation_agent,
     get_product_personalization_agent,
     get_reviews_agent,
+    review_filters,
 )
 from src.config.config import settings
 from src.logger import logger
 from src.models.products import PersonalizedProductSection, StatusEnum
 from src.repository import PersonalizedProductRepository
 from src.schemas.enums import EventType
+from src.services.memory import UserMemoryService
 from src.workflows.multi_agent_workflow import MultiAgentFlow
+from src.workflows.planning import get_planner
 from src.workflows.utils import send_stream_event
 
 
@@ -37,7 +40,7 @@ class MultiAgentWorkflowService:
         vector_store_reviews_embeddings: BasePydanticVectorStore,
         vector_store_products_embeddings: BasePydanticVectorStore,
         filters: Optional[MetadataFilters],
-        memory: BaseMemory,
+        memory: UserMemoryService,
         product_id: Optional[int] = None,
         message_queue: asyncio.Queue = None,
         timeout: int = 60,
@@ -60,8 +63,8 @@ class MultiAgentWorkflowService:
         self.workflow: MultiAgentFlow = self.create_workflow()
 
     def create_workflow(self) -> MultiAgentFlow:
-        workflow = MultiAgentFlow(
-            self.db,
+        # The app shares one set of agents across runs; build them only outside it
+        agents = AgentRegistry.get() or AgentRegistry(
             product_personalization_agent=get_product_personalization_agent(self.llm),
             presentation_agent=get_presentation_agent(self.llm),
             inventory_agent=get_inventory_agent(
@@ -76,11 +79,21 @@ class MultiAgentWorkflowService:
             ),
             planning_agent=get_planning_agent(self.llm),
             evaluation_agent=get_evaluation_agent(self.llm),
+        )
+        workflow = MultiAgentFlow(
+            self.db,
+            product_personalization_agent=agents.product_personalization_agent,
+            presentation_agent=agents.presentation_agent,
+            inventory_agent=agents.inventory_agent,
+            reviews_agent=agents.reviews_agent,
+            planning_agent=agents.planning_agent,
+            evaluation_agent=agents.evaluation_agent,
             memory=self.memory,
             message_queue=self.message_queue,
             timeout=self.timeout,
             verbose=self.verbose,
             fault_correction=self.fault_correction,
+            planner=get_planner(agents.planning_agent),
         )
         return workflow
 
@@ -92,12 +105,14 @@ class MultiAgentWorkflowService:
         trace_id = None
 
         try:
-            workflow_handler = self.workflow.run(
-                user_id=self.user_id,
-                product_id=self.product_id,
-                user_msg=user_query,
-            )
-            response = await workflow_handler
+            # The workflow's tasks inherit the filters, scoping the shared reviews agent
+            with review_filters(self.filters):
+                workflow_handler = self.workflow.run(
+                    user_id=self.user_id,
+                    product_id=self.product_id,
+                    user_msg=user_query,
+                )
+                response = await workflow_handler
             trace_id = response.pop("trace_id")
 
             if self.message_queue:
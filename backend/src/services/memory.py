@@ -0,0 +1,154 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from mem0 import Memory
+from src.config.config import settings
+from src.logger import logger
+
+USER_PREFERENCES_QUERY = "User's specific preferences, likes, dislikes, past interactions, and shopping behavior patterns?"
+
+
+class UserMemoryService:
+    """
+    Non-blocking access to users' mem0 memories, shared by the whole app.
+
+    mem0 calls are synchronous and make embedding and LLM requests, so they run in a
+    bounded thread pool. Each user's preference list is cached until it expires or a
+    write for that user completes. Writes are write-behind: `add` schedules the mem0
+    extraction in the background and returns at once, so readers never wait for it.
+    """
+
+    def __init__(
+        self,
+        memory: Memory,
+        max_workers: int = settings.MEMORY_MAX_WORKERS,
+        cache_ttl_seconds: float = settings.MEMORY_PREFERENCES_CACHE_TTL_SECONDS,
+        max_cached_users: int = settings.MEMORY_PREFERENCES_CACHE_MAX_USERS,
+    ):
+        self.memory = memory
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_cached_users = max_cached_users
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="mem0",
+        )
+        # user_id -> (expires_at, preferences)
+        self._preferences: Dict[str, Tuple[float, list[str]]] = {}
+        # Bumped on every completed write (and `_epoch` on `clear`), so a search that
+        # started before the write does not cache its stale result
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._pending_writes: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            partial(func, *args, **kwargs),
+        )
+
+    async def get_preferences(self, user_id: int) -> list[str]:
+        """The user's remembered preferences, from the cache when fresh."""
+        key = str(user_id)
+        cached = self._preferences.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return list(cached[1])
+
+        self.misses += 1
+        generation = (self._epoch, self._generations.get(key, 0))
+        start_time = time.perf_counter()
+        results = await self._run(
+            self.memory.search,
+            query=USER_PREFERENCES_QUERY,
+            user_id=user_id,
+        )
+        logger.info(
+            f"Time taken to execute memory search: {time.perf_counter() - start_time:.4f} seconds",
+        )
+        preferences = [message.get("memory") for message in results.get("results", [])]
+
+        if (self._epoch, self._generations.get(key, 0)) == generation:
+            if len(self._preferences) >= self.max_cached_users:
+                # Dicts keep insertion order: drop the oldest entry
+                self._preferences.pop(next(iter(self._preferences)))
+            self._preferences[key] = (
+                time.monotonic() + self.cache_ttl_seconds,
+                preferences,
+            )
+        return list(preferences)
+
+    def add(
+        self,
+        user_id: int,
+        message: str,
+        on_added: Optional[Callable[[dict], Awaitable[None]]] = None,
+    ) -> asyncio.Task:
+        """
+        Schedules `message` to be added to the user's memory and returns immediately.
+
+        Args:
+            user_id (int): The user the message belongs to.
+            message (str): The user's message; mem0 extracts the memories from it.
+            on_added (Optional[Callable[[dict], Awaitable[None]]], optional): Awaited with
+                mem0's result once the write completes.
+
+        Returns:
+            asyncio.Task: The background write, for callers that need to await it.
+        """
+        task = asyncio.create_task(self._add(user_id, message, on_added))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+        return task
+
+    async def _add(
+        self,
+        user_id: int,
+        message: str,
+        on_added: Optional[Callable[[dict], Awaitable[None]]],
+    ) -> Optional[dict]:
+        key = str(user_id)
+        try:
+            results = await self._run(self.memory.add, messages=message, user_id=key)
+        except Exception as e:
+            logger.error(f"Failed to update memory for user_id={user_id}: {e}")
+            return None
+        finally:
+            self.invalidate(user_id)
+
+        logger.info(f"Update user memory: {results}")
+        if on_added is not None:
+            try:
+                await on_added(results)
+            except Exception as e:
+                logger.error(
+                    f"Memory update callback failed for user_id={user_id}: {e}",
+                )
+        return results
+
+    def invalidate(self, user_id: int) -> None:
+        key = str(user_id)
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._preferences.pop(key, None)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._preferences.clear()
+
+    def stats(self) -> dict:
+        return {
+            "cached_users": len(self._preferences),
+            "hits": self.hits,
+            "misses": self.misses,
+            "pending_writes": len(self._pending_writes),
+        }
+
+    async def aclose(self) -> None:
+        """Waits for pending writes, then shuts the thread pool down."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,140 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+import asyncpg
+from src.config.config import settings
+from src.logger import logger
+
+CHANNEL = "personalization_status"
+
+
+class PersonalizationNotifier:
+    """
+    Wakes requests waiting for a personalization to finish.
+
+    A trigger on `personalized_product_section` sends a NOTIFY on `personalization_status`
+    when a section is saved with a final status. Each worker keeps one dedicated LISTEN
+    connection, outside the connection pools, and fans notifications out to the waiters
+    subscribed to that (user, product). Waiters hold no connection while they wait.
+
+    If the listener connection drops, it is re-opened with back-off and every waiter is
+    woken to re-check, since notifications sent in between are lost.
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        reconnect_delay_seconds: float = 1.0,
+        max_reconnect_delay_seconds: float = 30.0,
+    ):
+        # LISTEN needs a session-level connection: PgBouncer in transaction mode drops it
+        self.dsn = (
+            dsn
+            or settings.PERSONALIZATION_NOTIFY_DATABASE_URL
+            or settings.get_database_url()
+        )
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self.max_reconnect_delay_seconds = max_reconnect_delay_seconds
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._waiters: Dict[Tuple[int, int], Set[asyncio.Event]] = defaultdict(set)
+        self.notifications = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self) -> None:
+        self._closed = False
+        try:
+            await self._connect()
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.error(f"Personalization listener failed to connect: {e}")
+            self._schedule_reconnect()
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        connection.add_termination_listener(self._on_terminated)
+        await connection.add_listener(CHANNEL, self._on_notification)
+        self._connection = connection
+        logger.info(f"Listening for {CHANNEL} notifications")
+
+    def _on_terminated(self, connection: asyncpg.Connection) -> None:
+        if self._closed:
+            return
+        logger.warning("Personalization listener connection lost")
+        self._connection = None
+        self._wake_all()
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.reconnect_delay_seconds
+        while not self._closed:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.error(f"Personalization listener failed to reconnect: {e}")
+                delay = min(delay * 2, self.max_reconnect_delay_seconds)
+                continue
+            # Anything sent while disconnected was missed
+            self._wake_all()
+            return
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        self.notifications += 1
+        try:
+            data = json.loads(payload)
+            key = (int(data["user_id"]), int(data["product_id"]))
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed {CHANNEL} payload: {payload!r}")
+            return
+        for event in self._waiters.get(key, ()):
+            event.set()
+
+    def _wake_all(self) -> None:
+        for events in self._waiters.values():
+            for event in events:
+                event.set()
+
+    @contextmanager
+    def subscribe(self, user_id: int, product_id: int) -> Iterator[asyncio.Event]:
+        """
+        An event set whenever the personalization may have finished.
+
+        Subscribe before reading the status, and clear the event before each re-read,
+        so a notification sent in between is not missed.
+        """
+        key = (user_id, product_id)
+        event = asyncio.Event()
+        self._waiters[key].add(event)
+        try:
+            yield event
+        finally:
+            self._waiters[key].discard(event)
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "waiters": sum(len(events) for events in self._waiters.values()),
+            "notifications": self.notifications,
+        }
+
+    async def aclose(self) -> None:
+        self._closed = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+        self._wake_all()
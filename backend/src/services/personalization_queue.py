@@ -0,0 +1,374 @@
+import asyncio
+import os
+import socket
+from datetime import timedelta
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config.config import settings
+from src.database import Session
+from src.logger import logger
+from src.models import PersonalizationJob
+from src.schemas.enums import JobPriority, JobStatus, StatusEnum
+from src.utils.utils import set_personalization_status
+
+LIVE_STATUSES = (JobStatus.queued, JobStatus.running)
+# Literal, so Postgres can match it to the partial unique index as the conflict target
+LIVE_PREDICATE = text(
+    "status IN ({})".format(", ".join(f"'{status.value}'" for status in LIVE_STATUSES)),
+)
+
+
+class ClaimedJob(NamedTuple):
+    id: int
+    user_id: int
+    product_id: int
+    attempts: int
+
+
+class PersonalizationJobQueue:
+    """
+    Durable queue of personalization workflows in the `personalization_jobs` table.
+
+    Workers claim the highest-priority available job with `FOR UPDATE SKIP LOCKED` and
+    hold it for a lease of `visibility_timeout_seconds`, renewed while the workflow runs.
+    A job whose worker died is claimed again once its lease runs out, until it has been
+    attempted `max_attempts` times. There is at most one queued or running job per
+    (user, product); enqueueing it again only raises its priority.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = Session,
+        visibility_timeout_seconds: float = settings.PERSONALIZATION_JOB_VISIBILITY_TIMEOUT_SECONDS,
+        max_attempts: int = settings.PERSONALIZATION_JOB_MAX_ATTEMPTS,
+        retry_backoff_seconds: float = settings.PERSONALIZATION_JOB_RETRY_BACKOFF_SECONDS,
+    ):
+        self._session_factory = session_factory
+        self.visibility_timeout = timedelta(seconds=visibility_timeout_seconds)
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        # Wakes this process's idle workers on enqueue; other processes poll
+        self.enqueued = asyncio.Event()
+
+    async def enqueue(
+        self,
+        user_id: int,
+        product_id: int,
+        priority: JobPriority = JobPriority.speculative,
+    ) -> int:
+        stmt = insert(PersonalizationJob).values(
+            user_id=user_id,
+            product_id=product_id,
+            priority=priority.value,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PersonalizationJob.user_id, PersonalizationJob.product_id],
+            index_where=LIVE_PREDICATE,
+            set_={
+                "priority": func.greatest(
+                    PersonalizationJob.priority,
+                    stmt.excluded.priority,
+                ),
+            },
+        ).returning(PersonalizationJob.id)
+        async with self._session_factory() as session:
+            job_id = (await session.execute(stmt)).scalar_one()
+            await session.commit()
+        self.enqueued.set()
+        return job_id
+
+    async def prioritize(
+        self,
+        user_id: int,
+        product_id: int,
+        priority: JobPriority = JobPriority.viewing,
+    ) -> bool:
+        """Raises the priority of the (user, product) job if it is still queued."""
+        stmt = update(PersonalizationJob).where(
+            PersonalizationJob.user_id == user_id,
+            PersonalizationJob.product_id == product_id,
+            PersonalizationJob.status == JobStatus.queued,
+            PersonalizationJob.priority < priority.value,
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(stmt.values(priority=priority.value))
+            await session.commit()
+        return result.rowcount > 0
+
+    async def cancel(self, user_id: int, product_id: int) -> bool:
+        """
+        Deletes the queued or running job of (user, product), for a caller that runs
+        the workflow itself. A worker already running it keeps going, but no worker
+        claims it afterwards.
+        """
+        stmt = delete(PersonalizationJob).where(
+            PersonalizationJob.user_id == user_id,
+            PersonalizationJob.product_id == product_id,
+            PersonalizationJob.status.in_(LIVE_STATUSES),
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
+
+    async def claim(self, worker_id: str) -> Optional[ClaimedJob]:
+        next_job = (
+            select(PersonalizationJob.id)
+            .where(
+                PersonalizationJob.status.in_(LIVE_STATUSES),
+                PersonalizationJob.available_at <= func.now(),
+                PersonalizationJob.attempts < self.max_attempts,
+            )
+            .order_by(
+                PersonalizationJob.priority.desc(),
+                PersonalizationJob.available_at,
+                PersonalizationJob.id,
+            )
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(PersonalizationJob)
+            .where(PersonalizationJob.id == next_job)
+            .values(
+                status=JobStatus.running,
+                attempts=PersonalizationJob.attempts + 1,
+                available_at=func.now() + self.visibility_timeout,
+                locked_by=worker_id,
+            )
+            .returning(
+                PersonalizationJob.id,
+                PersonalizationJob.user_id,
+                PersonalizationJob.product_id,
+                PersonalizationJob.attempts,
+            )
+        )
+        async with self._session_factory() as session:
+            row = (await session.execute(stmt)).one_or_none()
+            await session.commit()
+        return ClaimedJob(*row) if row else None
+
+    def _owned(self, job_id: int, worker_id: str):
+        return (
+            PersonalizationJob.id == job_id,
+            PersonalizationJob.locked_by == worker_id,
+            PersonalizationJob.status == JobStatus.running,
+        )
+
+    async def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extends the lease; False if the job was reclaimed by another worker."""
+        stmt = (
+            update(PersonalizationJob)
+            .where(*self._owned(job_id, worker_id))
+            .values(available_at=func.now() + self.visibility_timeout)
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
+
+    async def complete(self, job_id: int, worker_id: str) -> None:
+        async with self._session_factory() as session:
+            await session.execute(
+                delete(PersonalizationJob).where(*self._owned(job_id, worker_id)),
+            )
+            await session.commit()
+
+    async def fail(self, job: ClaimedJob, worker_id: str, error: str) -> None:
+        """Queues the job for a retry with exponential back-off, or fails it for good."""
+        if job.attempts >= self.max_attempts:
+            values = {"status": JobStatus.failed, "last_error": error}
+        else:
+            backoff = self.retry_backoff_seconds * 2 ** (job.attempts - 1)
+            values = {
+                "status": JobStatus.queued,
+                "available_at": func.now() + timedelta(seconds=backoff),
+                "locked_by": None,
+                "last_error": error,
+            }
+        async with self._session_factory() as session:
+            await session.execute(
+                update(PersonalizationJob)
+                .where(*self._owned(job.id, worker_id))
+                .values(**values),
+            )
+            if values["status"] is JobStatus.failed:
+                await set_personalization_status(
+                    session,
+                    job.user_id,
+                    job.product_id,
+                    StatusEnum.failed,
+                )
+            await session.commit()
+
+    async def release(self, job: ClaimedJob, worker_id: str) -> None:
+        """Hands a job back untried, e.g. on shutdown."""
+        async with self._session_factory() as session:
+            await session.execute(
+                update(PersonalizationJob)
+                .where(*self._owned(job.id, worker_id))
+                .values(
+                    status=JobStatus.queued,
+                    attempts=PersonalizationJob.attempts - 1,
+                    available_at=func.now(),
+                    locked_by=None,
+                ),
+            )
+            await session.commit()
+
+    async def fail_abandoned(self) -> int:
+        """Fails jobs whose last allowed attempt's lease ran out, e.g. its worker died."""
+        stmt = (
+            update(PersonalizationJob)
+            .where(
+                PersonalizationJob.status.in_(LIVE_STATUSES),
+                PersonalizationJob.available_at <= func.now(),
+                PersonalizationJob.attempts >= self.max_attempts,
+            )
+            .values(status=JobStatus.failed, last_error="Lease expired")
+            .returning(PersonalizationJob.user_id, PersonalizationJob.product_id)
+        )
+        async with self._session_factory() as session:
+            abandoned = (await session.execute(stmt)).all()
+            for user_id, product_id in abandoned:
+                await set_personalization_status(
+                    session,
+                    user_id,
+                    product_id,
+                    StatusEnum.failed,
+                )
+            await session.commit()
+        return len(abandoned)
+
+    async def depth(self) -> dict:
+        """Job counts by status and priority, and the age of the oldest queued job."""
+        stmt = select(
+            PersonalizationJob.status,
+            PersonalizationJob.priority,
+            func.count(),
+            func.extract("epoch", func.now() - func.min(PersonalizationJob.created_at)),
+        ).group_by(PersonalizationJob.status, PersonalizationJob.priority)
+        async with self._session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+
+        depth = {status.value: 0 for status in JobStatus}
+        queued_by_priority = {}
+        oldest_queued_seconds = 0.0
+        for status, priority, count, oldest_seconds in rows:
+            depth[status.value] += count
+            if status is JobStatus.queued:
+                try:
+                    label = JobPriority(priority).name
+                except ValueError:
+                    label = str(priority)
+                queued_by_priority[label] = count
+                oldest_queued_seconds = max(
+                    oldest_queued_seconds,
+                    float(oldest_seconds),
+                )
+        return {
+            **depth,
+            "queued_by_priority": queued_by_priority,
+            "oldest_queued_seconds": round(oldest_queued_seconds, 1),
+        }
+
+
+class PersonalizationWorkerPool:
+    """A fixed number of asyncio workers in this process running jobs from the queue."""
+
+    def __init__(
+        self,
+        queue: PersonalizationJobQueue,
+        run_job: Callable[[int, int], Awaitable[None]],
+        workers: int = settings.PERSONALIZATION_WORKERS,
+        poll_interval_seconds: float = settings.PERSONALIZATION_JOB_POLL_INTERVAL_SECONDS,
+    ):
+        self.queue = queue
+        self.run_job = run_job
+        self.workers = workers
+        self.poll_interval_seconds = poll_interval_seconds
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: list[asyncio.Task] = []
+        self.running = 0
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self._prefix}:{i}"))
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} personalization workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, worker_id: str) -> None:
+        while True:
+            try:
+                job = await self.queue.claim(worker_id)
+            except Exception as e:
+                logger.error(f"Personalization worker {worker_id} failed to claim: {e}")
+                job = None
+            if job is None:
+                await self._idle()
+                continue
+            try:
+                await self._run(job, worker_id)
+            except Exception as e:
+                # Completing or failing the job hit the database; its lease runs out
+                # and it is claimed again, so the worker carries on
+                logger.error(
+                    f"Personalization worker {worker_id} failed to settle job "
+                    f"{job.id}: {e}",
+                )
+
+    async def _idle(self) -> None:
+        try:
+            await self.queue.fail_abandoned()
+        except Exception as e:
+            logger.error(f"Failed to expire abandoned personalization jobs: {e}")
+        try:
+            await asyncio.wait_for(
+                self.queue.enqueued.wait(),
+                timeout=self.poll_interval_seconds,
+            )
+        except asyncio.TimeoutError:
+            pass
+        self.queue.enqueued.clear()
+
+    async def _run(self, job: ClaimedJob, worker_id: str) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job, worker_id))
+        self.running += 1
+        try:
+            await self.run_job(job.user_id, job.product_id)
+        except asyncio.CancelledError:
+            await asyncio.shield(self.queue.release(job, worker_id))
+            raise
+        except Exception as e:
+            logger.error(
+                f"Personalization job {job.id} (user ID {job.user_id}, product ID "
+                f"{job.product_id}) failed on attempt {job.attempts}: {e}",
+            )
+            await self.queue.fail(job, worker_id, str(e))
+        else:
+            await self.queue.complete(job.id, worker_id)
+        finally:
+            self.running -= 1
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: ClaimedJob, worker_id: str) -> None:
+        interval = self.queue.visibility_timeout.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.queue.heartbeat(job.id, worker_id):
+                    logger.warning(f"Lost the lease on personalization job {job.id}")
+                    return
+            except Exception as e:
+                logger.error(f"Heartbeat for personalization job {job.id} failed: {e}")
@@ -1,13 +1,14 @@
 import traceback
 from typing import Dict, List, Union
 
-from llama_index.core import Settings, VectorStoreIndex
+from llama_index.core import VectorStoreIndex
+from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.vector_stores.types import (
     BasePydanticVectorStore,
     MetadataFilter,
     MetadataFilters,
+    VectorStoreQueryMode,
 )
-from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
 from llama_index.llms.azure_openai import AzureOpenAI
 from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -135,7 +136,7 @@ async def product_search(
     db: AsyncSession,
     vector_store: BasePydanticVectorStore,
     llm: AzureOpenAI,
-    embed_model: AzureOpenAIEmbedding,
+    embed_model: BaseEmbedding,
     query: str,
     user_id: int,
     product_category: str = None,
@@ -155,14 +156,11 @@ async def product_search(
     try:
         logger.info(f"Performing vector search for query: {query}")
 
-        # use our own llm and embed_model
-        Settings.llm = llm
-        Settings.embed_model = embed_model
-
-        # Create a VectorStoreIndex from the vector store
+        # Create a VectorStoreIndex from the vector store, passing our own embed_model
+        # explicitly instead of mutating the global llama_index Settings per request
         index = VectorStoreIndex.from_vector_store(
             vector_store=vector_store,
-            Settings=Settings,
+            embed_model=embed_model,
         )
 
         # retrieving product categories the current query can possibly belong to for filtration
@@ -170,12 +168,21 @@ async def product_search(
             filters=[MetadataFilter(key="category", value=product_category)],
         )
 
-        # Perform a similarity search using the query string
-        query_engine = index.as_retriever(
+        # Perform a similarity search using the query string. aretrieve embeds the query
+        # and queries the store's async engine, so the event loop is never blocked.
+        # Hybrid mode fuses the vector ranking with a full-text one, so exact tokens
+        # such as model numbers and brand names rank well at small k.
+        retriever = index.as_retriever(
             similarity_top_k=app_settings.TOP_K,
             filters=filters,
+            vector_store_query_mode=(
+                VectorStoreQueryMode.HYBRID
+                if app_settings.HYBRID_SEARCH_ENABLED
+                else VectorStoreQueryMode.DEFAULT
+            ),
+            sparse_top_k=app_settings.HYBRID_SEARCH_SPARSE_TOP_K,
         )
-        results = query_engine.retrieve(query)
+        results = await retriever.aretrieve(query)
 
         # fetch products from database
         if results:
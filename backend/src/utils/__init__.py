@@ -1,6 +1,7 @@
 from .utils import (
     get_user_chat_agent_response,
     get_user_session_key,
+    iter_csv_data,
     load_csv_data,
     parse_json,
     parse_json_fields,
@@ -10,6 +11,7 @@ from .utils import (
 __all__ = [
     "get_user_session_key",
     "get_user_chat_agent_response",
+    "iter_csv_data",
     "load_csv_data",
     "parse_json",
     "parse_json_fields",
@@ -1,99 +1,107 @@
 import logging
+from functools import partial
+from itertools import batched
+from typing import Iterable, Iterator
 
-from bs4 import BeautifulSoup
-from llama_index.core import Settings, StorageContext, VectorStoreIndex
-from llama_index.core.schema import TextNode
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import MetadataMode, TextNode
 from src.config.config import settings
 from src.config.embed_model import EmbedModelManager
 from src.config.vector_store import VectorStoreManager
+from src.llama_index.vector_stores.pgdiskann import UpsertStats
 from src.logger import logger
-from src.utils import load_csv_data
+from src.utils import iter_csv_data, load_csv_data
+from src.utils.ingest_pipeline import EmbeddingIngestPipeline
+from src.utils.product_documents import build_product_nodes, index_variant_attributes
 
 
-async def create_and_push_embeddings_for_products() -> None:
+def embed_nodes_in_batches(
+    nodes: Iterable[TextNode],
+    embed_model: BaseEmbedding,
+    batch_size: int,
+) -> Iterator[TextNode]:
+    """
+    Lazily embeds nodes one batch at a time, so they can be streamed straight into
+    `PGDiskAnnVectorStore.bulk_add` without holding every embedding in memory.
+    """
+    for batch in batched(nodes, batch_size):
+        embeddings = embed_model.get_text_embedding_batch(
+            [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch],
+        )
+        for node, embedding in zip(batch, embeddings):
+            node.embedding = embedding
+            yield node
+
+
+def log_upsert_summary(label: str, stats: UpsertStats) -> None:
+    logger.info(
+        f"{label} embeddings synced in {stats.elapsed:.1f}s: "
+        f"{stats.inserted} new, {stats.updated} changed, {stats.skipped} unchanged, "
+        f"{stats.deleted} deleted",
+    )
+
+
+async def create_and_push_embeddings_for_products(batch_size: int = 200) -> None:
     """
     Reads product data from a CSV file, generates vector embeddings for product technical specifications
     and features, and stores them in a vector store.
 
     The function performs the following steps:
-        1. Reads product data from the 'data/product.csv' file.
-        2. Formats the data for embeddings by extracting and combining product specifications, brand, category, and colors.
-        3. Creates text nodes for each product's technical specifications and features.
-        4. Retrieves singleton instances of the vector store and embedding model.
-        5. Generates vector embeddings using the llama_index library.
-        6. Stores the generated embeddings in the vector store.
+        1. Indexes variant attributes by product from 'data/variants.csv' and 'data/variant_attributes.csv'.
+        2. Streams product rows from 'data/product.csv' and lazily builds a text node per product from its
+           specifications, description (HTML stripped in a process pool), category and variant attributes.
+        3. Retrieves singleton instances of the vector store and embedding model.
+        4. Upserts the nodes: only new or changed products are embedded, in batches, and
+           each batch is streamed into the vector store with binary COPY in its own
+           transaction; removed products are deleted.
+
+    Args:
+        batch_size (int): The number of products to embed per embedding call.
 
     Raises:
         Exception: If an error occurs during the embedding generation process, it is caught and logged.
     """
 
     try:
-        # fetch data from CSV file
-        products = load_csv_data("data/product.csv")
-        variants = load_csv_data("data/variants.csv")
-        variant_attributes = load_csv_data("data/variant_attributes.csv")
-
-        # format data for embeddings
-        data_for_embeddings = []
-        product_ids = []
-        product_categories = []
-
-        for product in products:
-
-            product_ids.append(product["id"])
-            product_categories.append(product["category"])
-
-            # Extract product specifications
-            product_specifications = {}
-            product_specifications["specifications"] = product["specifications"]
-            product_specifications["description"] = BeautifulSoup(
-                product["description"],
-                "html.parser",
-            ).get_text()
-            product_specifications["category"] = product["category"]
-            product_specifications["variants"] = [
-                {
-                    "attributes": ", ".join(
-                        f"{attr['attribute_name']}: {attr['attribute_value']}"
-                        for attr in variant_attributes
-                        if attr["variant_id"] == variant["id"]
-                    ),
-                }
-                for variant in variants
-                if variant["product_id"] == product["id"]
-            ]
-
-            data_for_embeddings.append(
-                ",".join(
-                    f"{key} : {value}" for key, value in product_specifications.items()
-                ),
-            )
+        # index variant attributes by product once, then stream the product rows
+        variants_by_product = index_variant_attributes(
+            iter_csv_data("data/variants.csv"),
+            iter_csv_data("data/variant_attributes.csv"),
+        )
+        nodes = build_product_nodes(
+            iter_csv_data("data/product.csv"),
+            variants_by_product,
+            workers=settings.PRODUCT_DOCUMENT_WORKERS,
+        )
 
-        nodes = [
-            TextNode(text=t, metadata={"product_id": id, "category": category})
-            for t, id, category in zip(
-                data_for_embeddings,
-                product_ids,
-                product_categories,
-            )
-        ]
+        # retrieve vector store and embed model instances
+        embed_model = await EmbedModelManager.get_embed_model(
+            use_query_cache=False,
+            use_micro_batching=False,
+        )
+        vector_store = await VectorStoreManager.get_vector_store(
+            db_embedding_table_name=settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS,
+        )
 
-        # retrieve and set vector store and embed model instances
-        Settings.embed_model = await EmbedModelManager.get_embed_model()
-        storage_context = StorageContext.from_defaults(
-            vector_store=await VectorStoreManager.get_vector_store(
-                db_embedding_table_name=settings.DB_EMBEDDING_TABLE_FOR_PRODUCTS,
+        # embed new and changed products and stream them to the vector store with COPY
+        stats = vector_store.upsert_nodes(
+            nodes,
+            partial(
+                embed_nodes_in_batches,
+                embed_model=embed_model,
+                batch_size=batch_size,
             ),
+            batch_size=batch_size,
         )
-
-        # create and push embeddings to vector store
-        VectorStoreIndex(nodes, storage_context=storage_context, show_progress=True)
+        log_upsert_summary("Product", stats)
 
     except Exception as e:
         logger.error(f"Error: {e}", exc_info=True)
 
 
-async def create_and_push_embeddings_for_reviews(batch_size: int = 200) -> None:
+async def create_and_push_embeddings_for_reviews(
+    batch_size: int = settings.EMBEDDING_INGEST_BATCH_SIZE,
+) -> None:
     """
     Reads review data from a CSV file in batches, generates vector embeddings for review text, and stores them in a vector store.
 
@@ -102,11 +110,12 @@ async def create_and_push_embeddings_for_reviews(batch_size: int = 200) -> None:
         2. Formats the data for embeddings by extracting review text and product ID.
         3. Creates text nodes for each review text.
         4. Retrieves singleton instances of the vector store and embedding model.
-        5. Generates vector embeddings using the llama_index library for each batch.
-        6. Stores the generated embeddings in the vector store in batches.
+        5. Runs the ingest pipeline: only new or changed reviews are embedded, in
+           concurrent rate-limit-aware batches, each streamed into the vector store
+           with binary COPY in its own transaction; removed reviews are deleted.
 
     Args:
-        batch_size (int): The number of reviews to process in each batch.
+        batch_size (int): The number of reviews to embed per embedding call.
 
     Raises:
         Exception: If an error occurs during the embedding generation process, it is caught and logged.
@@ -116,42 +125,46 @@ async def create_and_push_embeddings_for_reviews(batch_size: int = 200) -> None:
         # Fetch data from CSV file
         reviews = load_csv_data("data/review.csv")
 
-        # Retrieve and set vector store and embed model instances
-        Settings.embed_model = await EmbedModelManager.get_embed_model()
-        storage_context = StorageContext.from_defaults(
-            vector_store=await VectorStoreManager.get_vector_store(
-                db_embedding_table_name=settings.DB_EMBEDDING_TABLE_FOR_REVIEWS,
-            ),
+        # Retrieve vector store and embed model instances. 429s are left to the
+        # pipeline, which backs off on their headers and lowers its concurrency.
+        embed_model = await EmbedModelManager.get_embed_model(
+            use_query_cache=False,
+            use_micro_batching=False,
+            max_retries=0,
+        )
+        vector_store = await VectorStoreManager.get_vector_store(
+            db_embedding_table_name=settings.DB_EMBEDDING_TABLE_FOR_REVIEWS,
         )
 
-        data_for_embeddings = []
-        review_ids = []
-        product_ids = []
-
-        for review in reviews:
-            review_ids.append(review["id"])
-            product_ids.append(review["product_id"])
-            data_for_embeddings.append(review["review_text"])
-
-        # Create nodes for the current batch
-        nodes = [
+        nodes = (
             TextNode(
-                text=text,
-                metadata={"review_id": review_id, "product_id": product_id},
-            )
-            for text, review_id, product_id in zip(
-                data_for_embeddings,
-                review_ids,
-                product_ids,
+                id_=f"review-{review['id']}",
+                text=review["review_text"],
+                metadata={
+                    "review_id": review["id"],
+                    "product_id": review["product_id"],
+                },
             )
-        ]
+            for review in reviews
+        )
 
-        # Push embeddings for the current batch
-        VectorStoreIndex(
+        pipeline = EmbeddingIngestPipeline(
+            embed_model,
+            batch_size=batch_size,
+            concurrency=settings.EMBEDDING_INGEST_CONCURRENCY,
+            max_concurrency=settings.EMBEDDING_INGEST_MAX_CONCURRENCY,
+            max_retries=settings.EMBEDDING_INGEST_MAX_RETRIES,
+        )
+        stats = await pipeline.arun(
+            vector_store,
             nodes,
-            insert_batch_size=batch_size,
-            storage_context=storage_context,
-            show_progress=True,
+            job=f"embeddings:{settings.DB_EMBEDDING_TABLE_FOR_REVIEWS}",
+        )
+        logger.info(
+            f"Review embeddings synced in {stats.elapsed:.1f}s: {stats.embedded} embedded "
+            f"({stats.rows_per_second:.1f} rows/sec, {stats.batches} batches, "
+            f"{stats.rate_limited} rate limited), {stats.skipped} unchanged, "
+            f"{stats.deleted} deleted",
         )
 
     except Exception as e:
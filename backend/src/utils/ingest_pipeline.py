@@ -0,0 +1,284 @@
+"""
+Parallel, resumable embedding ingest into a PGDiskAnnVectorStore.
+
+Nodes that are new or changed (by content hash) are embedded in fixed-size batches,
+several at a time. Concurrency adapts AIMD-style: it grows by one after a window of
+successful calls and halves on a 429, pausing every caller for as long as the response's
+rate-limit headers ask. Each embedded batch is written with COPY in its own transaction
+as soon as it is ready. Resuming needs no checkpoints: a crashed run loses at most the
+batches in flight, since on the next run the committed rows match their content hash
+and are skipped.
+"""
+
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from itertools import batched, count
+from typing import (
+    AsyncIterator,
+    Deque,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+import openai
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import BaseNode, MetadataMode
+from src.llama_index.vector_stores.pgdiskann import PGDiskAnnVectorStore
+from src.logger import logger
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Seconds in an `x-ratelimit-reset-*` value such as "20ms", "1s" or "6m0s"."""
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """How long to back off after a 429, from its rate-limit headers, if they say."""
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if "retry-after" in headers:
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(headers["retry-after"])
+                return max(0.0, retry_at.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    resets = [
+        _parse_duration(headers[name])
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if name in headers
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+class AdaptiveConcurrency:
+    """
+    Additive-increase/multiplicative-decrease limit on concurrent calls.
+
+    The limit grows by one after `limit` consecutive successes and halves when a call is
+    rate limited, at most once per back-off pause. While paused, no call starts.
+    """
+
+    def __init__(self, initial: int, maximum: int) -> None:
+        self.maximum = maximum
+        self.limit = max(1, min(initial, maximum))
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        if self.in_flight >= self.limit or self._waiters:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                # `_wake` takes the slot on our behalf before resolving the waiter
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.in_flight -= 1
+                    self._wake()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+        else:
+            self.in_flight += 1
+
+        while (pause := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(pause)
+
+    def release(self, rate_limited_for: Optional[float] = None) -> None:
+        self.in_flight -= 1
+        if rate_limited_for is None:
+            self._successes += 1
+            if self._successes >= self.limit:
+                self.limit = min(self.maximum, self.limit + 1)
+                self._successes = 0
+        else:
+            self.rate_limited += 1
+            now = time.monotonic()
+            # Calls started before the pause report the same limit; halve only once
+            if now >= self._paused_until:
+                self.limit = max(1, self.limit // 2)
+            self._successes = 0
+            self._paused_until = max(self._paused_until, now + rate_limited_for)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class IngestStats(NamedTuple):
+    embedded: int
+    skipped: int
+    deleted: int
+    batches: int
+    rate_limited: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.embedded / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class EmbeddingIngestPipeline:
+    """
+    Embeds nodes in concurrent batches and streams them into a vector store.
+
+    `embed_model` should not retry rate-limited calls itself (`max_retries=0`), so that
+    429s reach the pipeline's back-off. Batches are embedded with one
+    `aget_text_embedding_batch` call each, so `batch_size` should not exceed the
+    model's `embed_batch_size`.
+    """
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        max_concurrency: int = 16,
+        max_retries: int = 8,
+        base_backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 60.0,
+    ) -> None:
+        self.embed_model = embed_model
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.limiter = AdaptiveConcurrency(concurrency, max_concurrency)
+
+    async def _aembed_batch(self, batch: Sequence[BaseNode]) -> Sequence[BaseNode]:
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+        for attempt in count():
+            await self.limiter.acquire()
+            try:
+                embeddings = await self.embed_model.aget_text_embedding_batch(texts)
+            except openai.RateLimitError as e:
+                delay = retry_after_seconds(e.response.headers)
+                if delay is None:
+                    delay = min(
+                        self.max_backoff_seconds,
+                        self.base_backoff_seconds * 2**attempt,
+                    ) * random.uniform(0.5, 1.0)
+                self.limiter.release(rate_limited_for=delay)
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(
+                    f"Embedding batch rate limited, retrying in {delay:.2f}s "
+                    f"(concurrency now {self.limiter.limit})",
+                )
+                continue
+            except BaseException:
+                self.limiter.release()
+                raise
+
+            self.limiter.release()
+            for node, embedding in zip(batch, embeddings):
+                node.embedding = embedding
+            return batch
+
+    async def aembed(
+        self,
+        nodes: Iterable[BaseNode],
+    ) -> AsyncIterator[Sequence[BaseNode]]:
+        """Yields embedded batches of `nodes` as they complete, not in input order."""
+        in_flight = set()
+        try:
+            for batch in batched(nodes, self.batch_size):
+                in_flight.add(asyncio.ensure_future(self._aembed_batch(batch)))
+                # Schedule no further ahead than the limiter could ever admit
+                if len(in_flight) >= self.limiter.maximum:
+                    done, in_flight = await asyncio.wait(
+                        in_flight,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    for task in done:
+                        yield task.result()
+            while in_flight:
+                done, in_flight = await asyncio.wait(
+                    in_flight,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def arun(
+        self,
+        vector_store: PGDiskAnnVectorStore,
+        nodes: Iterable[BaseNode],
+        job: str,
+        delete_orphans: bool = True,
+    ) -> IngestStats:
+        """
+        Brings the vector store in line with `nodes`, embedding only what changed.
+
+        Args:
+            vector_store (PGDiskAnnVectorStore): Store to write to.
+            nodes (Iterable[BaseNode]): Complete set of nodes, with stable ids, not embedded.
+            job (str): Name the job's progress is logged under.
+            delete_orphans (bool, optional): Delete stored nodes absent from `nodes`. Defaults to True.
+
+        Returns:
+            IngestStats: Embedded, skipped and deleted counts, batches, 429s and elapsed time.
+        """
+        started = time.perf_counter()
+        rate_limited_before = self.limiter.rate_limited
+        plan = await vector_store.aplan_upsert(nodes, delete_orphans)
+
+        if plan.skipped:
+            logger.info(
+                f"{job}: {plan.skipped} nodes unchanged, "
+                f"{len(plan.pending)} nodes left to embed",
+            )
+
+        if plan.orphan_ids:
+            await vector_store.adelete_nodes(node_ids=plan.orphan_ids)
+
+        embedded = batches = 0
+        async for batch in self.aembed(plan.pending):
+            async with vector_store._async_session() as session, session.begin():
+                embedded += await vector_store.areplace_nodes(list(batch), session)
+            batches += 1
+            if batches % 10 == 0:
+                logger.info(
+                    f"{job}: {embedded}/{len(plan.pending)} nodes embedded, "
+                    f"concurrency {self.limiter.limit}",
+                )
+
+        return IngestStats(
+            embedded=embedded,
+            skipped=plan.skipped,
+            deleted=len(plan.orphan_ids),
+            batches=batches,
+            rate_limited=self.limiter.rate_limited - rate_limited_before,
+            elapsed=time.perf_counter() - started,
+        )
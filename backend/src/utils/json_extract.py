@@ -0,0 +1,109 @@
+"""
+Extraction of JSON values from LLM output.
+
+Agent responses wrap their JSON in prose or Markdown fences, and the inputs and outputs
+recorded in traces are often Python reprs or escaped JSON. `iter_json` scans the text
+once, decoding at each `{` or `[` with the C-backed `json` decoder; only a block that
+decoder rejects goes through the lenient chain of `loads_lenient`.
+"""
+
+import ast
+import json
+import re
+from typing import Any, Iterator, Optional
+
+import json5
+
+_DECODER = json.JSONDecoder(strict=False)
+_OPENERS = re.compile(r"[\[{]")
+# Strings (either quote) and brackets, to find where a block that is not JSON ends
+_TOKENS = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|[\[\]{}]", re.DOTALL)
+_PAIRS = {"}": "{", "]": "["}
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    Parses JSON, or one of the JSON-like formats LLMs and traces produce: Python reprs
+    (single quotes, True/None), JSON5 (unquoted keys, trailing commas, comments) and
+    JSON with escaped quotes or newlines. Raises ValueError if none applies.
+    """
+    try:
+        return _DECODER.decode(text)
+    except ValueError:
+        pass
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        pass
+    else:
+        if isinstance(value, (dict, list)):
+            return value
+    try:
+        return json5.loads(text)
+    except ValueError:
+        pass
+    if "\\" in text:
+        return loads_lenient(text.replace("\\n", "").replace("\\", ""))
+    raise ValueError(f"Not a JSON value: {text[:80]!r}")
+
+
+def _block_end(content: str, start: int) -> Optional[int]:
+    """The end of the bracketed block opening at `start`, or None if it is unclosed."""
+    stack = []
+    for token in _TOKENS.finditer(content, start):
+        char = token.group()
+        if char in "{[":
+            stack.append(char)
+        elif char in "}]":
+            # A mismatched bracket ends it too; the block then fails to parse
+            if stack.pop() != _PAIRS[char] or not stack:
+                return token.end()
+    return None
+
+
+def _decode_at(content: str, start: int) -> tuple[Any, Optional[int]]:
+    """
+    The value of the block opening at `start`, and its end; the end is None if there is
+    no value there.
+    """
+    try:
+        return _DECODER.raw_decode(content, start)
+    except ValueError:
+        pass
+    end = _block_end(content, start)
+    if end is None:
+        return None, None
+    try:
+        return loads_lenient(content[start:end]), end
+    except ValueError:
+        return None, None
+
+
+def iter_json(content: str) -> Iterator[tuple[int, int, Any]]:
+    """
+    Yields `(start, end, value)` for each top-level JSON object or array in `content`.
+
+    Text that is not JSON is skipped, including brackets in prose like "[Note]".
+    """
+    position = 0
+    while True:
+        opener = _OPENERS.search(content, position)
+        if opener is None:
+            return
+        start = opener.start()
+        value, end = _decode_at(content, start)
+        if end is None:
+            position = start + 1
+            continue
+        yield start, end, value
+        position = end
+
+
+def extract_json(content: str) -> list[Any]:
+    """All top-level JSON objects and arrays in `content`, parsed."""
+    return [value for _, _, value in iter_json(content)]
+
+
+def first_json(content: str, default: Any = None) -> Any:
+    """The first JSON object or array in `content`, parsed, or `default`."""
+    return next((value for _, _, value in iter_json(content)), default)
@@ -0,0 +1,48 @@
+from typing import Optional
+
+
+class JSONArrayItemStream:
+    """
+    Incremental parser for the items of the arrays in a streamed JSON object.
+
+    Fed chunks of LLM output, it returns the source text of each object directly inside
+    an array of the top-level object (e.g. each card of `{"personalization": [...]}`)
+    as soon as the object closes. Strings and escapes are tracked, so brackets inside
+    values do not count; text outside the top-level object, such as Markdown fences,
+    is skipped.
+    """
+
+    def __init__(self) -> None:
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._item: Optional[list[str]] = None
+
+    def feed(self, chunk: str) -> list[str]:
+        items = []
+        for char in chunk:
+            if self._item is not None:
+                self._item.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                if self._stack:
+                    self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._stack == ["{", "["]:
+                    self._item = [char]
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if char == "}" and self._stack == ["{", "["] and self._item:
+                    items.append("".join(self._item))
+                    self._item = None
+        return items
@@ -0,0 +1,125 @@
+"""
+Builds the product documents that are embedded for product search.
+
+Variant attributes are indexed by product once, so assembling a document is a dict
+lookup rather than a scan of every variant and attribute. Product rows are streamed
+from the CSV in chunks, and each chunk's HTML descriptions are stripped in a process
+pool while the previous chunk's nodes are consumed. Nodes are yielded lazily, in CSV
+order, with the same ids and text as before, so their content hashes are unchanged.
+"""
+
+import os
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import batched
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from bs4 import BeautifulSoup
+from llama_index.core.schema import TextNode
+
+
+def strip_html(html: str) -> str:
+    return BeautifulSoup(html, "html.parser").get_text()
+
+
+def _strip_html_chunk(descriptions: Sequence[str]) -> List[str]:
+    return [strip_html(description) for description in descriptions]
+
+
+def index_variant_attributes(
+    variants: Iterable[Dict[str, Any]],
+    variant_attributes: Iterable[Dict[str, Any]],
+) -> Dict[Any, List[Dict[str, str]]]:
+    """
+    Groups variant attributes by product in one pass over each table.
+
+    Returns:
+        Dict[Any, List[Dict[str, str]]]: Product id to its variants in CSV order, each
+            as {"attributes": "name: value, ..."} with attributes in CSV order.
+    """
+    attributes_by_variant = defaultdict(list)
+    for attr in variant_attributes:
+        attributes_by_variant[attr["variant_id"]].append(
+            f"{attr['attribute_name']}: {attr['attribute_value']}",
+        )
+
+    variants_by_product = defaultdict(list)
+    for variant in variants:
+        variants_by_product[variant["product_id"]].append(
+            {"attributes": ", ".join(attributes_by_variant.get(variant["id"], ()))},
+        )
+    return variants_by_product
+
+
+def _product_node(
+    product: Dict[str, Any],
+    description: str,
+    variants_by_product: Dict[Any, List[Dict[str, str]]],
+) -> TextNode:
+    product_specifications = {
+        "specifications": product["specifications"],
+        "description": description,
+        "category": product["category"],
+        "variants": variants_by_product.get(product["id"], []),
+    }
+    return TextNode(
+        id_=f"product-{product['id']}",
+        text=",".join(
+            f"{key} : {value}" for key, value in product_specifications.items()
+        ),
+        metadata={"product_id": product["id"], "category": product["category"]},
+    )
+
+
+def build_product_nodes(
+    products: Iterable[Dict[str, Any]],
+    variants_by_product: Dict[Any, List[Dict[str, str]]],
+    workers: Optional[int] = None,
+    chunk_size: int = 500,
+) -> Iterator[TextNode]:
+    """
+    Lazily yields one TextNode per product row, in input order.
+
+    Args:
+        products (Iterable[Dict[str, Any]]): Product rows, e.g. from `iter_csv_data`.
+        variants_by_product (Dict[Any, List[Dict[str, str]]]): From `index_variant_attributes`.
+        workers (Optional[int], optional): Processes stripping HTML descriptions; 0 or 1
+            strips in this process. Defaults to the CPU count.
+        chunk_size (int, optional): Products per HTML stripping task. Defaults to 500.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    use_pool = workers > 1
+    # Strip one chunk per worker ahead of the consumer
+    look_ahead = workers + 1 if use_pool else 1
+
+    with ExitStack() as stack:
+        executor = None
+        pending: Deque = deque()
+        for chunk in batched(products, chunk_size):
+            descriptions = [product["description"] for product in chunk]
+            # The first chunk is stripped in-process, so small catalogs never start a pool
+            # and the first nodes are not held up by worker start-up
+            if use_pool and executor is None and pending:
+                executor = stack.enter_context(ProcessPoolExecutor(workers))
+            if executor is None:
+                stripped = Future()
+                stripped.set_result(_strip_html_chunk(descriptions))
+            else:
+                stripped = executor.submit(_strip_html_chunk, descriptions)
+            pending.append((chunk, stripped))
+
+            while len(pending) >= look_ahead:
+                yield from _chunk_nodes(*pending.popleft(), variants_by_product)
+        while pending:
+            yield from _chunk_nodes(*pending.popleft(), variants_by_product)
+
+
+def _chunk_nodes(
+    chunk: Sequence[Dict[str, Any]],
+    stripped: Future,
+    variants_by_product: Dict[Any, List[Dict[str, str]]],
+) -> Iterator[TextNode]:
+    for product, description in zip(chunk, stripped.result()):
+        yield _product_node(product, description, variants_by_product)
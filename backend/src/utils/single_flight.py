@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[K, T]):
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller's coroutine runs as a task; callers arriving for the same key while
+    it runs await that task and share its result or exception. The task is shielded, so
+    a caller that goes away (e.g. a closed browser tab) does not cancel it for the rest.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[K, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, key: K, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._flights.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.create_task(func())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._land(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _land(self, key: K, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Retrieved here, so an error nobody is left to await is not logged as unhandled
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
@@ -1,18 +1,16 @@
-import ast
 import csv
 import hashlib
 import json
-import textwrap
+from typing import Iterator
 
-import json5
 import regex as re
 from mem0 import Memory
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.logger import logger
-from src.models.products import PersonalizedProductSection
 from src.repository.personalized_product_section import PersonalizedProductRepository
 from src.schemas.agents import UserQueryAgentResponse
 from src.schemas.enums import AgentNames, StatusEnum
+from src.utils.json_extract import first_json, iter_json
 
 
 def add_user_preference_to_memory_during_migration(data: list, memory: Memory) -> None:
@@ -37,6 +35,13 @@ def load_csv_data(file_path: str) -> list:
     return data
 
 
+def iter_csv_data(file_path: str) -> Iterator[dict]:
+    """Like `load_csv_data`, but yields rows one at a time instead of loading the file."""
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        for row in csv.DictReader(file):
+            yield parse_json_fields(row)
+
+
 def parse_json_fields(row: dict) -> dict:
     for key, value in row.items():
         try:
@@ -317,9 +322,13 @@ def parse_trace_to_flow(spans: dict) -> list[dict]:
                 user_output_response = _print_pretty_with_embedded_json(
                     user_output_response,
                 )
-                json_block = extract_json_blocks(user_output_response)
-                if json_block:
-                    user_output_response = json_block[0]
+                json_value = first_json(user_output_response)
+                if json_value is not None:
+                    user_output_response = json.dumps(
+                        json_value,
+                        indent=4,
+                        ensure_ascii=False,
+                    )
             except Exception as e:
                 logger.exception(e)
                 continue
@@ -765,33 +774,6 @@ def _assign_level_to_agents(nodes):
     return nodes, current_level, parallel_agents_level
 
 
-def extract_json_blocks(content: str) -> list[str]:
-    """
-    Extracts all top-level JSON-like blocks ({...} or [...]) from a string,
-    including nested blocks.
-    """
-    blocks = []
-    stack = []
-    start_idx = None
-    for idx, char in enumerate(content):
-        if char in "{[":
-            if not stack:
-                start_idx = idx
-            stack.append(char)
-        elif char in "}]":
-            if stack:
-                open_char = stack.pop()
-                # Check for matching pairs
-                if (open_char == "{" and char != "}") or (
-                    open_char == "[" and char != "]"
-                ):
-                    continue  # ignore mismatched
-                if not stack and start_idx is not None:
-                    blocks.append(content[start_idx : idx + 1])  # noqa: E203
-                    start_idx = None
-    return blocks
-
-
 def _print_pretty_with_embedded_json(content: str) -> str:
     """
     Prettifies content for API response.
@@ -808,68 +790,24 @@ def _print_pretty_with_embedded_json(content: str) -> str:
         pass
 
     content = re.sub(r"\s+", " ", content)
-    blocks = extract_json_blocks(content)
-
-    for block in blocks:
-        is_parsed = True
-        pretty_block = re.sub(r"(\\n|\n)", "", block)
-        pretty_block = re.sub(r"\\", "", pretty_block)
-
-        try:
-            pretty_block = json5.loads(pretty_block)
-        except Exception:
-            pretty_block, is_parsed = _parse_using_literal_eval(pretty_block)
-
-        if is_parsed and isinstance(pretty_block, dict):
-            for key, value in pretty_block.items():
-                if isinstance(value, str):
-                    pretty_block[key] = _print_pretty_with_embedded_json(value)
-            pretty_block = json.dumps(pretty_block, indent=4, ensure_ascii=False)
-        elif isinstance(pretty_block, str):
-            pretty_block = _parse_json_using_regex(pretty_block)
-        elif isinstance(pretty_block, list):
-            pretty_block = json.dumps(pretty_block, indent=4, ensure_ascii=False)
-        content = content.replace(block, "\n" + pretty_block + "\n")
-
-    return content
-
-
-def _parse_using_literal_eval(content: str) -> tuple[dict | str, bool]:
-    """
-    Parses a string using ast.literal_eval.
-    Handles single quotes and unquoted keys.
-    """
-    is_parsed = True
-    try:
-        content = ast.literal_eval(content)
-    except Exception:
-        is_parsed = False
-
-    return content, is_parsed
-
-
-def _parse_json_using_regex(content: str) -> tuple[dict | str, bool]:
-    """
-    Parses a string using regex.
-    Handles single quotes and unquoted keys.
-    """
-    # Case 1: Whole string is valid JSON
-    try:
-        parsed = json.loads(content)
-        return json.dumps(parsed, indent=2, ensure_ascii=False)
-    except (json.JSONDecodeError, TypeError):
-        pass
-
-    # Case 2: Format dict-like or list-like blocks
-    blocks = re.findall(r"(\{.*?\}|\[.*?\])", content, re.DOTALL)
+    parts = []
+    position = 0
+    for start, end, value in iter_json(content):
+        if isinstance(value, dict):
+            value = {
+                key: (
+                    _print_pretty_with_embedded_json(item)
+                    if isinstance(item, str)
+                    else item
+                )
+                for key, item in value.items()
+            }
+        parts.append(content[position:start])
+        parts.append("\n" + json.dumps(value, indent=4, ensure_ascii=False) + "\n")
+        position = end
+    parts.append(content[position:])
 
-    for block in blocks:
-        pretty_block = re.sub(r",\s*", ",\n", block)
-        pretty_block = re.sub(r"([\{\[])\s*", r"\1\n", pretty_block)
-        pretty_block = re.sub(r"\s*([\}\]])", r"\n\1", pretty_block)
-        pretty_block = textwrap.indent(pretty_block, "   ")
-        content = content.replace(block, pretty_block)
-    return content
+    return "".join(parts)
 
 
 def format_variants(variants) -> list:
@@ -893,14 +831,10 @@ async def set_personalization_status(
     status: StatusEnum,
 ) -> None:
     """Set the status of the personalized product section."""
-    personalized_section = PersonalizedProductSection(
-        product_id=product_id,
-        user_id=user_id,
-        status=status,
-    )
-    await PersonalizedProductRepository(db).add_or_update(personalized_section)
+    await PersonalizedProductRepository(db).set_status((product_id, user_id), status)
     logger.info(
-        "Personalized product section status set to running for user_id=%s, product_id=%s",
+        "Personalized product section status set to %s for user_id=%s, product_id=%s",
+        status.value,
         user_id,
         product_id,
     )
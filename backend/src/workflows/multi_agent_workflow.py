@@ -1,10 +1,10 @@
 import asyncio
 import textwrap
 import time
-from typing import Optional
+from typing import Awaitable, Iterable, NamedTuple, Optional, TypeVar
 
-import json5
 from llama_index.core.agent.types import BaseAgent
+from llama_index.core.agent.workflow import AgentStream
 from llama_index.core.workflow import (
     Context,
     Event,
@@ -14,11 +14,12 @@ from llama_index.core.workflow import (
     step,
 )
 from llama_index.core.workflow.errors import WorkflowTimeoutError
-from mem0 import Memory
 from openinference.instrumentation.llama_index import get_current_span
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.agents.prompts import SELF_REFLECTION_PROMPT
 from src.config.config import settings
+from src.database import Session
 from src.logger import logger
 from src.repository import (
     PersonalizedProductRepository,
@@ -27,15 +28,26 @@ from src.repository import (
     VariantRepository,
 )
 from src.schemas.enums import EventType
-from src.schemas.personalization import PersonalizationSection
-from src.utils.utils import (
-    convert_trace_id_to_hex,
-    extract_json_blocks,
-    format_variants,
+from src.schemas.personalization import PersonalizationCard, PersonalizationSection
+from src.services.memory import UserMemoryService
+from src.utils.json_extract import first_json, loads_lenient
+from src.utils.json_stream import JSONArrayItemStream
+from src.utils.utils import convert_trace_id_to_hex, format_variants
+from src.workflows.planning import (
+    INVENTORY,
+    PRODUCT_PERSONALIZATION,
+    REVIEWS,
+    LLMPlanner,
+    Planner,
 )
 from src.workflows.schemas import ProductSchema, UserSchema
+from src.workflows.speculation import Speculation
 from src.workflows.utils import send_stream_event
 
+T = TypeVar("T")
+
+CARD_ADAPTER = TypeAdapter(PersonalizationCard)
+
 
 class ProductPersonalizationEvent(Event):
     pass
@@ -66,6 +78,13 @@ class InventoryCompletedEvent(Event):
     result: str
 
 
+class AgentCall(NamedTuple):
+    agent: BaseAgent
+    prompt: str
+    timeout: int
+    label: str
+
+
 class MultiAgentFlow(Workflow):
 
     def __init__(
@@ -77,9 +96,11 @@ class MultiAgentFlow(Workflow):
         presentation_agent: BaseAgent,
         planning_agent: BaseAgent,
         evaluation_agent: BaseAgent,
-        memory: Memory,
+        memory: UserMemoryService,
         message_queue: Optional[asyncio.Queue] = None,
         fault_correction: bool = False,
+        planner: Optional[Planner] = None,
+        speculative_agents: Iterable[str] = settings.WORKFLOW_SPECULATIVE_AGENTS,
         **kwargs,
     ):
         self.db = db
@@ -88,10 +109,13 @@ class MultiAgentFlow(Workflow):
         self.inventory_agent = inventory_agent
         self.presentation_agent = presentation_agent
         self.planning_agent = planning_agent
+        self.planner = planner or LLMPlanner(planning_agent)
         self.evaluation_agent = evaluation_agent
         self.memory = memory
         self.message_queue = message_queue
         self.fault_correction = fault_correction
+        self.speculative_agents = list(speculative_agents)
+        self.speculation = Speculation()
 
         super().__init__(**kwargs)
 
@@ -111,22 +135,26 @@ class MultiAgentFlow(Workflow):
         await self._setup_workflow_context(ctx, ev)
 
         user_profile = await ctx.get("user_profile")
-        planning_agent_query = f"Generate an execution plan based on the following user profile\n \
-            user={user_profile} \n"
-
-        if hasattr(ev, "user_msg") and ev.user_msg:
-            planning_agent_query += f"\n and user query={ev.user_msg}"
-
-        planner_response = await self.planning_agent.run(planning_agent_query)
-        logger.info(f"\n\nPlanner response: {planner_response}\n\n")
-
-        logger.info(
-            f"Planning Result: {planner_response}",
+        user_msg = ev.user_msg if hasattr(ev, "user_msg") else None
+        started = time.perf_counter()
+        agents_to_call = self.planner.plan_without_llm(user_profile, user_msg)
+        # Only an LLM planner round trip is worth hiding: the likely agents run while
+        # it decides, instead of after it
+        speculating = agents_to_call is None
+        if speculating:
+            await self._start_speculative_agents(ctx)
+            try:
+                agents_to_call = await self.planner.plan(user_profile, user_msg)
+            except BaseException:
+                await self.speculation.cancel_all()
+                raise
+        span = get_current_span()
+        span.set_attribute("workflow.planner", self.planner.name)
+        span.set_attribute(
+            "workflow.planning_ms",
+            round((time.perf_counter() - started) * 1000, 1),
         )
 
-        agents_to_call = extract_json_blocks(str(planner_response))
-        agents_to_call = json5.loads(agents_to_call[0]) if agents_to_call else []
-
         logger.info(f"Agents to call: {agents_to_call}")
 
         # To showcase fault correction, we need to call the reviews agent
@@ -134,6 +162,17 @@ class MultiAgentFlow(Workflow):
         if self.fault_correction and "reviews" not in agents_to_call:
             agents_to_call.append("reviews")
 
+        if speculating:
+            await self.speculation.resolve(agents_to_call)
+            span.set_attribute(
+                "workflow.speculation.saved_ms",
+                round(self.speculation.saved_seconds * 1000, 1),
+            )
+            span.set_attribute(
+                "workflow.speculation.wasted_ms",
+                round(self.speculation.wasted_seconds * 1000, 1),
+            )
+
         triggered_agents = []
 
         if "product_personalization" in agents_to_call:
@@ -154,21 +193,24 @@ class MultiAgentFlow(Workflow):
         ctx: Context,
         ev: ProductPersonalizationEvent,
     ) -> ProductPersonalizationCompletedEvent:
+        result = await self._run_agent(
+            PRODUCT_PERSONALIZATION,
+            await self._product_personalization_call(ctx),
+        )
+        return ProductPersonalizationCompletedEvent(result=result)
+
+    async def _product_personalization_call(self, ctx: Context) -> AgentCall:
         user_info = await ctx.get("user_profile")
         product_info = await ctx.get("product_information")
         vaiants_info = await ctx.get("product_variants")
 
-        try:
-            result = await self.product_personalization_agent.run(
-                f"""Personalize the product for user: {user_info},
+        return AgentCall(
+            agent=self.product_personalization_agent,
+            prompt=f"""Personalize the product for user: {user_info},
                 product: {product_info}, product variants: {vaiants_info}""",
-                timeout=settings.PRODUCT_PERSONALIZATION_AGENT_TIMEOUT,
-            )
-        except WorkflowTimeoutError:
-            logger.info("Personalization Agent has timed out.")
-            result = "Personalization agent timed out. No response"
-
-        return ProductPersonalizationCompletedEvent(result=str(result))
+            timeout=settings.PRODUCT_PERSONALIZATION_AGENT_TIMEOUT,
+            label="Personalization",
+        )
 
     @step
     async def review(
@@ -177,6 +219,18 @@ class MultiAgentFlow(Workflow):
         ev: ReviewsEvent,
     ) -> ReviewsCompletedEvent | EvaluationEvent:
 
+        # Only the first run can have been started speculatively
+        result = await self._run_agent(
+            None if ev.self_reflection else REVIEWS,
+            await self._reviews_call(ctx, ev),
+        )
+
+        if self.fault_correction:
+            return EvaluationEvent(result=result)
+        else:
+            return ReviewsCompletedEvent(result=result)
+
+    async def _reviews_call(self, ctx: Context, ev: ReviewsEvent) -> AgentCall:
         user_info = await ctx.get("user_profile")
         user_message = await ctx.get("user_msg")
 
@@ -195,32 +249,24 @@ class MultiAgentFlow(Workflow):
                 error=ev.self_reflection,
             )
 
-        try:
-            prompt = textwrap.dedent(
-                f"""
-                {self_reflection_prompt}
-                Generate a summary of relevant reviews of the product based on the
-                user's preferences: {user_info['user_preferences']}
-                and the optional user query: {user_message}.
-                {generate_error_prompt}
-            """,
-            )
-
-            logger.info(f"Review Prompt: {prompt}")
-
-            result = await self.reviews_agent.run(
-                prompt,
-                timeout=settings.REVIEW_AGENT_TIMEOUT,
-            )
+        prompt = textwrap.dedent(
+            f"""
+            {self_reflection_prompt}
+            Generate a summary of relevant reviews of the product based on the
+            user's preferences: {user_info['user_preferences']}
+            and the optional user query: {user_message}.
+            {generate_error_prompt}
+        """,
+        )
 
-        except WorkflowTimeoutError:
-            logger.info("Review Agent has timed out.")
-            result = "Review agent timed out. No response"
+        logger.info(f"Review Prompt: {prompt}")
 
-        if self.fault_correction:
-            return EvaluationEvent(result=str(result))
-        else:
-            return ReviewsCompletedEvent(result=str(result))
+        return AgentCall(
+            agent=self.reviews_agent,
+            prompt=prompt,
+            timeout=settings.REVIEW_AGENT_TIMEOUT,
+            label="Review",
+        )
 
     @step
     async def evaluate_output(
@@ -258,25 +304,56 @@ class MultiAgentFlow(Workflow):
         ctx: Context,
         ev: InventoryEvent,
     ) -> InventoryCompletedEvent:
+        result = await self._run_agent(INVENTORY, await self._inventory_call(ctx))
+        return InventoryCompletedEvent(result=result)
+
+    async def _inventory_call(self, ctx: Context) -> AgentCall:
         product_id = await ctx.get("product_id")
         user_info = await ctx.get("user_profile")
 
-        try:
-            result = await self.inventory_agent.run(
-                textwrap.dedent(
-                    f"""
-                    Perform the inventory analysis for the following user profile and the product:
-                    User Profile: {user_info}
-                    Product id: {product_id}
-                    """,
-                ),
-                timeout=settings.INVENTORY_AGENT_TIMEOUT,
+        return AgentCall(
+            agent=self.inventory_agent,
+            prompt=textwrap.dedent(
+                f"""
+                Perform the inventory analysis for the following user profile and the product:
+                User Profile: {user_info}
+                Product id: {product_id}
+                """,
+            ),
+            timeout=settings.INVENTORY_AGENT_TIMEOUT,
+            label="Inventory",
+        )
+
+    async def _start_speculative_agents(self, ctx: Context) -> None:
+        calls = {
+            PRODUCT_PERSONALIZATION: self._product_personalization_call,
+            REVIEWS: lambda ctx: self._reviews_call(ctx, ReviewsEvent()),
+            INVENTORY: self._inventory_call,
+        }
+        for name in self.speculative_agents:
+            if name not in calls:
+                logger.warning(f"Unknown speculative agent {name!r}, ignoring it")
+                continue
+            call = await calls[name](ctx)
+            self.speculation.start(
+                name,
+                call.agent.run(call.prompt, timeout=call.timeout),
             )
-        except WorkflowTimeoutError:
-            logger.info("Inventory Agent has timed out.")
-            result = "Inventory agent timed out. No response"
 
-        return InventoryCompletedEvent(result=str(result))
+    async def _run_agent(self, name: Optional[str], call: AgentCall) -> str:
+        """
+        Awaits the speculative run of agent `name` if the planning step started one,
+        otherwise runs `call` now.
+        """
+        handler = self.speculation.take(name) if name else None
+        try:
+            if handler is None:
+                handler = call.agent.run(call.prompt, timeout=call.timeout)
+            result = await handler
+        except WorkflowTimeoutError:
+            logger.info(f"{call.label} Agent has timed out.")
+            result = f"{call.label} agent timed out. No response"
+        return str(result)
 
     @step
     async def presentation(
@@ -306,7 +383,7 @@ class MultiAgentFlow(Workflow):
 
         user_msg = await ctx.get("user_msg")
 
-        result = await self.presentation_agent.run(
+        handler = self.presentation_agent.run(
             textwrap.dedent(
                 f"""
                 Here is the previous response and the current response. Synthesize and merge the
@@ -316,9 +393,11 @@ class MultiAgentFlow(Workflow):
                 user_query={user_msg}""",
             ),
         )
+        if self.message_queue:
+            await self._stream_cards(ctx, handler)
+        result = await handler
 
-        extracted_json = extract_json_blocks(str(result))
-        extracted_json = json5.loads(extracted_json[0]) if extracted_json else {}
+        extracted_json = first_json(str(result), default={})
 
         logger.info(
             f"Presentation Result: {extracted_json}",
@@ -334,6 +413,37 @@ class MultiAgentFlow(Workflow):
 
         return StopEvent(result=personalization_response)
 
+    async def _stream_cards(self, ctx: Context, handler) -> None:
+        """
+        Sends each card of the presentation agent's output to the message queue as soon
+        as the agent has written it, before the rest of the output.
+        """
+        product_id = await ctx.get("product_id")
+        parser = JSONArrayItemStream()
+        started = time.perf_counter()
+        streamed = 0
+        async for event in handler.stream_events():
+            if not isinstance(event, AgentStream) or not event.delta:
+                continue
+            for item in parser.feed(event.delta):
+                try:
+                    card = CARD_ADAPTER.validate_python(loads_lenient(item))
+                except ValueError as e:
+                    logger.warning(f"Skipping malformed streamed card: {e}")
+                    continue
+                if not streamed:
+                    get_current_span().set_attribute(
+                        "workflow.presentation.first_card_ms",
+                        round((time.perf_counter() - started) * 1000, 1),
+                    )
+                await send_stream_event(
+                    {"index": streamed, "card": card.model_dump(mode="json")},
+                    EventType.PERSONALIZATION_CARD.value,
+                    product_id,
+                    self.message_queue,
+                )
+                streamed += 1
+
     def _structure_events_response(self, events):
         """
         Structure the event responses into a dictionary.
@@ -341,13 +451,24 @@ class MultiAgentFlow(Workflow):
         return {event.__class__.__name__: event.result for event in events}
 
     async def _setup_workflow_context(self, ctx: Context, ev: StartEvent):
-        user = await UserRepository(self.db).get_by_id(ev.user_id)
-        if hasattr(ev, "user_msg") and ev.user_msg:
-            await self._update_user_memory(ev.product_id, ev.user_id, ev.user_msg)
-        user_preferences = await self._get_user_preferences_from_memory(ev.user_id)
-        product = await ProductRepository(self.db).get_by_id(ev.product_id)
-        variants = await VariantRepository(self.db).get_variants_by_product_id(
-            ev.product_id,
+        # The lookups are independent, so they run concurrently, each database read in
+        # its own session
+        timings = {}
+        started = time.perf_counter()
+        user, user_preferences, product, variants = await asyncio.gather(
+            self._timed(timings, "user", self._load_user(ev.user_id)),
+            self._timed(timings, "memory", self._load_user_preferences(ev, timings)),
+            self._timed(timings, "product", self._load_product(ev.product_id)),
+            self._timed(timings, "variants", self._load_variants(ev.product_id)),
+        )
+        timings["total"] = time.perf_counter() - started
+
+        span = get_current_span()
+        for name, elapsed in timings.items():
+            span.set_attribute(f"workflow.setup.{name}_ms", round(elapsed * 1000, 1))
+        logger.info(
+            "Workflow context set up in "
+            + ", ".join(f"{name}={elapsed:.3f}s" for name, elapsed in timings.items()),
         )
 
         user_info = UserSchema(**user.to_dict()).model_dump()
@@ -363,34 +484,60 @@ class MultiAgentFlow(Workflow):
         await ctx.set("product_information", product_info)
         await ctx.set("product_variants", variants_info)
 
-    async def _get_user_preferences_from_memory(self, user_id: int) -> list[str]:
+    @staticmethod
+    async def _timed(timings: dict, name: str, awaitable: Awaitable[T]) -> T:
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[name] = time.perf_counter() - started
+
+    async def _load_user(self, user_id: int):
+        async with Session() as session:
+            return await UserRepository(session).get_by_id(user_id)
+
+    async def _load_product(self, product_id: int):
+        # The prompts use the product's own fields only, not its reviews or variants
+        async with Session() as session:
+            return await ProductRepository(session).get_summary_by_id(product_id)
+
+    async def _load_variants(self, product_id: int):
+        async with Session() as session:
+            return await VariantRepository(session).get_variants_by_product_id(
+                product_id,
+            )
 
-        start_time = time.time()
-        user_preferences_messages = self.memory.search(
-            query="User's specific preferences, likes, dislikes, past interactions, and shopping behavior patterns?",
-            user_id=user_id,
-        ).get("results", [])
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        logger.info(f"Time taken to execute memory search: {elapsed_time:.4f} seconds")
-
-        user_preferences = [
-            message.get("memory") for message in user_preferences_messages
-        ]
+    async def _load_user_preferences(self, ev: StartEvent, timings: dict) -> list[str]:
+        # Write-behind: the memory extraction runs in the background, and this run reads
+        # the preferences remembered so far. The new message reaches the agents through
+        # the user query itself.
+        if hasattr(ev, "user_msg") and ev.user_msg:
+            self._update_user_memory(ev.product_id, ev.user_id, ev.user_msg)
+        return await self._timed(
+            timings,
+            "memory_search",
+            self._get_user_preferences_from_memory(ev.user_id),
+        )
+
+    async def _get_user_preferences_from_memory(self, user_id: int) -> list[str]:
+        user_preferences = await self.memory.get_preferences(user_id)
         logger.info(f"Fetch user preferences: {user_preferences}")
         return user_preferences
 
-    async def _update_user_memory(self, product_id: int, user_id: int, user_msg: str):
-        results = self.memory.add(messages=user_msg, user_id=str(user_id))
-        logger.info(f"Update user memory: {results}")
-        if len(results.get("results", [])) > 0 and self.message_queue:
-            await send_stream_event(
-                {"message": "Memory updated!"},
-                EventType.MEMORY.value,
-                product_id,
-                self.message_queue,
-            )
-            logger.info("Memory Updated")
+    def _update_user_memory(self, product_id: int, user_id: int, user_msg: str):
+        message_queue = self.message_queue
+
+        async def notify(results: dict) -> None:
+            if len(results.get("results", [])) > 0 and message_queue:
+                await send_stream_event(
+                    {"message": "Memory updated!"},
+                    EventType.MEMORY.value,
+                    product_id,
+                    message_queue,
+                )
+                logger.info("Memory Updated")
+
+        self.memory.add(user_id, user_msg, on_added=notify)
 
     async def _get_existing_personalized_section(self, ctx) -> Optional[dict]:
         user_id = await ctx.get("user_id")
@@ -0,0 +1,197 @@
+"""
+Planners decide which specialized agents a personalization workflow run invokes.
+
+A plan is a list drawn from `PLAN_AGENTS`. `LLMPlanner` asks the planning agent;
+`RuleBasedPlanner` derives the plan from the user profile and keywords in the user
+message, and defers to a fallback planner when the message is ambiguous.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from llama_index.core.agent.types import BaseAgent
+from src.config.config import settings
+from src.logger import logger
+from src.utils.json_extract import first_json
+
+PRODUCT_PERSONALIZATION = "product_personalization"
+REVIEWS = "reviews"
+INVENTORY = "inventory"
+PLAN_AGENTS = (PRODUCT_PERSONALIZATION, REVIEWS, INVENTORY)
+
+
+class Planner(ABC):
+    name: str
+
+    @abstractmethod
+    async def plan(self, user_profile: dict, user_msg: Optional[str]) -> list[str]:
+        """The agents to invoke, from `PLAN_AGENTS`."""
+
+    def plan_without_llm(
+        self,
+        user_profile: dict,
+        user_msg: Optional[str],
+    ) -> Optional[list[str]]:
+        """The plan if it can be made without an LLM call, otherwise None."""
+        return None
+
+
+class LLMPlanner(Planner):
+    name = "llm"
+
+    def __init__(self, planning_agent: BaseAgent):
+        self.planning_agent = planning_agent
+
+    async def plan(self, user_profile: dict, user_msg: Optional[str]) -> list[str]:
+        planning_agent_query = f"Generate an execution plan based on the following user profile\n \
+            user={user_profile} \n"
+
+        if user_msg:
+            planning_agent_query += f"\n and user query={user_msg}"
+
+        planner_response = await self.planning_agent.run(planning_agent_query)
+        logger.info(
+            f"Planning Result: {planner_response}",
+        )
+
+        return first_json(str(planner_response), default=[])
+
+
+def _keyword_pattern(patterns: Iterable[str]) -> re.Pattern:
+    return re.compile(r"\b(?:" + "|".join(patterns) + r")\b", re.IGNORECASE)
+
+
+# Interest in what other buyers think of the product
+REVIEW_KEYWORDS = _keyword_pattern(
+    (
+        r"reviews?",
+        r"ratings?",
+        r"rated",
+        r"feedback",
+        r"opinions?",
+        r"experiences?",
+        r"complain\w*",
+        r"recommend\w*",
+        r"reliab\w*",
+        r"durab\w*",
+        r"long[- ]lasting",
+        r"quality",
+        r"worth",
+        r"customers?",
+        r"people say",
+        r"sentiment",
+    ),
+)
+# Preferences that can be checked against the product's variants and stock
+INVENTORY_KEYWORDS = _keyword_pattern(
+    (
+        r"(?:in|out of) stock",
+        r"availab\w*",
+        r"variants?",
+        r"options?",
+        r"colou?rs?",
+        r"black|white|gr[ae]y|silver|red|blue|green|pink|gold",
+        r"sizes?|small|medium|large|compact",
+        r"budget\w*",
+        r"cheap\w*",
+        r"afford\w*",
+        r"pric(?:e|es|ed|ing)",
+        r"costs?",
+        r"deliver\w*",
+        r"ship\w*",
+    ),
+)
+# Requests the rules cannot map reliably: negations and references to earlier turns
+AMBIGUOUS_KEYWORDS = _keyword_pattern(
+    (
+        r"not|no|never",
+        r"(?:don|doesn|isn|aren|won)'?t",
+        r"without",
+        r"instead",
+        r"except",
+        r"only",
+        r"again",
+        r"same",
+        r"previous\w*",
+        r"undo",
+        r"why",
+    ),
+)
+
+
+class RuleBasedPlanner(Planner):
+    """
+    Deterministic planner for the common cases, without an LLM round trip.
+
+    The product personalization agent always runs. The inventory agent runs when the
+    user's remembered preferences or message mention something checkable against the
+    inventory (colour, size, price, stock); the reviews agent when they mention what
+    other buyers think or the product's quality. A message that matches none of the
+    keywords, or that contains a negation or refers back to an earlier request, is
+    ambiguous and is planned by `fallback`, if given.
+    """
+
+    name = "rules"
+
+    def __init__(self, fallback: Optional[Planner] = None):
+        self.fallback = fallback
+
+    def plan_from_rules(
+        self,
+        user_profile: dict,
+        user_msg: Optional[str],
+    ) -> Optional[list[str]]:
+        """The rule-based plan, or None if `user_msg` is ambiguous."""
+        if user_msg:
+            if AMBIGUOUS_KEYWORDS.search(user_msg):
+                return None
+            wants_reviews = bool(REVIEW_KEYWORDS.search(user_msg))
+            wants_inventory = bool(INVENTORY_KEYWORDS.search(user_msg))
+            if not (wants_reviews or wants_inventory):
+                return None
+        else:
+            profile = " ".join(
+                str(value)
+                for value in (
+                    *(user_profile.get("user_preferences") or []),
+                    *(user_profile.get("lifestyle_preferences") or []),
+                )
+            )
+            wants_reviews = bool(REVIEW_KEYWORDS.search(profile))
+            wants_inventory = bool(INVENTORY_KEYWORDS.search(profile))
+
+        plan = [PRODUCT_PERSONALIZATION]
+        if wants_reviews:
+            plan.append(REVIEWS)
+        if wants_inventory:
+            plan.append(INVENTORY)
+        return plan
+
+    def plan_without_llm(
+        self,
+        user_profile: dict,
+        user_msg: Optional[str],
+    ) -> Optional[list[str]]:
+        plan = self.plan_from_rules(user_profile, user_msg)
+        if plan is None and self.fallback is not None:
+            return None
+        return plan or [PRODUCT_PERSONALIZATION]
+
+    async def plan(self, user_profile: dict, user_msg: Optional[str]) -> list[str]:
+        plan = self.plan_without_llm(user_profile, user_msg)
+        if plan is not None:
+            return plan
+        logger.info(f"Ambiguous user message, planning with {self.fallback.name}")
+        return await self.fallback.plan(user_profile, user_msg)
+
+
+def get_planner(
+    planning_agent: BaseAgent,
+    kind: str = settings.WORKFLOW_PLANNER,
+) -> Planner:
+    """The planner configured by WORKFLOW_PLANNER: "rules" (LLM fallback) or "llm"."""
+    llm_planner = LLMPlanner(planning_agent)
+    if kind == RuleBasedPlanner.name:
+        return RuleBasedPlanner(fallback=llm_planner)
+    return llm_planner
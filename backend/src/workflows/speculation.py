@@ -0,0 +1,107 @@
+"""
+Speculative agent runs: agents started alongside the LLM planner, before it has decided
+whether they are needed. Plans the rules make without an LLM call start none.
+
+Agent runs start as soon as `agent.run` is called, so a speculative run is just the
+agent's handler, started with the same prompt its workflow step would use. When the
+plan arrives, the handlers of selected agents are kept for their steps to await, and
+the others are cancelled.
+"""
+
+import time
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from llama_index.core.workflow.handler import WorkflowHandler
+from src.logger import logger
+
+
+class SpeculationStats:
+    """
+    Process-wide counters of speculative agent runs.
+
+    `saved_seconds` is the agent time of selected runs that elapsed before the plan
+    arrived, i.e. latency taken off the workflow. `wasted_seconds` is the agent time of
+    runs the plan did not select, up to their cancellation.
+    """
+
+    def __init__(self) -> None:
+        self.started = 0
+        self.used = 0
+        self.cancelled = 0
+        self.saved_seconds = 0.0
+        self.wasted_seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "used": self.used,
+            "cancelled": self.cancelled,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "wasted_seconds": round(self.wasted_seconds, 3),
+        }
+
+
+speculation_stats = SpeculationStats()
+
+
+class _SpeculativeRun(NamedTuple):
+    handler: WorkflowHandler
+    started: float
+    finished: list
+
+
+class Speculation:
+    """The speculative agent runs of one workflow run."""
+
+    def __init__(self, stats: SpeculationStats = speculation_stats):
+        self.stats = stats
+        self._runs: Dict[str, _SpeculativeRun] = {}
+        self.saved_seconds = 0.0
+        self.wasted_seconds = 0.0
+
+    def start(self, name: str, handler: WorkflowHandler) -> None:
+        finished = []
+        handler.add_done_callback(lambda done: self._land(done, finished))
+        self._runs[name] = _SpeculativeRun(handler, time.perf_counter(), finished)
+        self.stats.started += 1
+
+    @staticmethod
+    def _land(handler: WorkflowHandler, finished: list) -> None:
+        finished.append(time.perf_counter())
+        if not handler.cancelled():
+            # Retrieved here, so the error of a cancelled run is not logged as unhandled
+            handler.exception()
+
+    @staticmethod
+    def _elapsed(run: _SpeculativeRun, now: float) -> float:
+        return (run.finished[0] if run.finished else now) - run.started
+
+    async def resolve(self, selected: Iterable[str]) -> None:
+        """Keeps the runs of the `selected` agents, and cancels the rest."""
+        selected = set(selected)
+        now = time.perf_counter()
+        for name in list(self._runs):
+            run = self._runs[name]
+            elapsed = self._elapsed(run, now)
+            if name in selected:
+                self.saved_seconds += elapsed
+                self.stats.saved_seconds += elapsed
+                continue
+            del self._runs[name]
+            self.wasted_seconds += elapsed
+            self.stats.wasted_seconds += elapsed
+            self.stats.cancelled += 1
+            logger.info(f"Cancelling speculative {name} run, not in the plan")
+            if not run.handler.done():
+                await run.handler.cancel_run()
+
+    def take(self, name: str) -> Optional[WorkflowHandler]:
+        """The kept run of agent `name`, if one was started; each run is taken once."""
+        run = self._runs.pop(name, None)
+        if run is None:
+            return None
+        self.stats.used += 1
+        return run.handler
+
+    async def cancel_all(self) -> None:
+        await self.resolve(())
@@ -1,10 +1,8 @@
 import asyncio
 from typing import Optional
 
-from fastapi import BackgroundTasks
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.base.llms.base import BaseLLM
-from llama_index.core.memory import BaseMemory
 from llama_index.core.vector_stores.types import (
     BasePydanticVectorStore,
     MetadataFilter,
@@ -13,13 +11,14 @@ from llama_index.core.vector_stores.types import (
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database import get_async_db
 from src.logger import logger
-from src.models.products import StatusEnum
 from src.repository import (
     PersonalizedProductRepository,
     ProductRepository,
     UserRepository,
 )
-from src.utils.utils import set_personalization_status
+from src.schemas.enums import JobPriority
+from src.services.memory import UserMemoryService
+from src.services.personalization_queue import PersonalizationJobQueue
 from src.workflows.schemas import EventData
 
 
@@ -27,16 +26,15 @@ async def run_workflows_in_background(
     db: AsyncSession,
     user_id: int,
     product_ids: list[int],
-    llm: BaseLLM,
-    embed_model: BaseEmbedding,
-    memory: BaseMemory,
-    vector_store_products_embeddings: BasePydanticVectorStore,
-    vector_store_reviews_embeddings: BasePydanticVectorStore,
-    background_tasks: BackgroundTasks,
+    job_queue: PersonalizationJobQueue,
+    viewing_product_id: Optional[int] = None,
     retrigger: bool = False,
 ):
     """
-    Run the multi-agent workflow in the background tasks for each product ID.
+    Queue the multi-agent workflow for each product ID.
+
+    The product the user is viewing is queued ahead of the others, e.g. search results
+    personalized speculatively.
     """
 
     for product_id in product_ids:
@@ -44,72 +42,58 @@ async def run_workflows_in_background(
             continue
         if not await _is_valid_user(db, user_id):
             continue
-        if await _should_skip_workflow(db, user_id, product_id, retrigger):
+        # Atomic, so a concurrent request for the same product cannot queue it twice
+        if not await PersonalizedProductRepository(db).claim(
+            id=(product_id, user_id),
+            retrigger=retrigger,
+        ):
+            logger.info(
+                f"Personalized section already running or done for user ID {user_id} "
+                f"and product ID {product_id}.",
+            )
             continue
 
-        await set_personalization_status(
-            db,
-            user_id,
-            product_id,
-            StatusEnum.running,
+        priority = (
+            JobPriority.viewing
+            if product_id == viewing_product_id
+            else JobPriority.speculative
         )
-        await _add_workflow_task(
-            user_id,
-            product_id,
-            llm,
-            embed_model,
-            memory,
-            vector_store_products_embeddings,
-            vector_store_reviews_embeddings,
-            background_tasks,
+        await job_queue.enqueue(user_id, product_id, priority)
+        logger.info(
+            f"Workflow queued for user ID {user_id} and product ID {product_id} "
+            f"with {priority.name} priority.",
         )
 
 
-async def _add_workflow_task(
+async def run_workflow_for_product(
     user_id: int,
     product_id: int,
     llm: BaseLLM,
     embed_model: BaseEmbedding,
-    memory: BaseMemory,
+    memory: UserMemoryService,
     vector_store_products_embeddings: BasePydanticVectorStore,
     vector_store_reviews_embeddings: BasePydanticVectorStore,
-    background_tasks: BackgroundTasks,
 ):
+    """Runs the workflow for a queued job; errors are raised so the job is retried."""
+    from src.services.agent_workflow import MultiAgentWorkflowService
+
     filters = MetadataFilters(
         filters=[
             MetadataFilter(key="product_id", value=product_id),
         ],
     )
-    background_tasks.add_task(
-        _run_workflow_for_product,
-        user_id,
-        product_id,
-        llm,
-        embed_model,
-        memory,
-        filters,
-        vector_store_products_embeddings,
-        vector_store_reviews_embeddings,
-    )
-    logger.info(
-        f"Workflow started in background for user ID {user_id} and product ID {product_id}.",
-    )
-
-
-async def _run_workflow_for_product(
-    user_id: int,
-    product_id: int,
-    llm: BaseLLM,
-    embed_model: BaseEmbedding,
-    memory: BaseMemory,
-    filters: Optional[MetadataFilters],
-    vector_store_products_embeddings: BasePydanticVectorStore,
-    vector_store_reviews_embeddings: BasePydanticVectorStore,
-):
-    from src.services.agent_workflow import MultiAgentWorkflowService
-
     async for db in get_async_db():
         try:
+            # A request that gave up waiting may have run it inline already
+            if not await PersonalizedProductRepository(db).claim(
+                id=(product_id, user_id),
+                queued=True,
+            ):
+                logger.info(
+                    f"Personalized section already done for user ID {user_id} and "
+                    f"product ID {product_id}, skipping its job.",
+                )
+                return
             workflow_service = MultiAgentWorkflowService(
                 user_id=user_id,
                 product_id=product_id,
@@ -131,6 +115,7 @@ async def _run_workflow_for_product(
                 f"Error running workflow for user ID {user_id} and product ID {product_id}: {str(e)}",
             )
             await db.rollback()
+            raise
         finally:
             await db.close()
 
@@ -149,28 +134,6 @@ async def _is_valid_user(db, user_id: int) -> bool:
     return True
 
 
-async def _should_skip_workflow(
-    db,
-    user_id: int,
-    product_id: int,
-    retrigger: bool,
-) -> bool:
-    pp_repository = PersonalizedProductRepository(db)
-    if await pp_repository.exists(id=(product_id, user_id)):
-        personalized_section = await pp_repository.get_by_id(id=(product_id, user_id))
-        if not retrigger and (
-            personalized_section.status == StatusEnum.done
-            or personalized_section.status == StatusEnum.running
-        ):
-            logger.info(
-                f"Personalized section already exists for user ID {user_id} "
-                f"and product ID {product_id}, "
-                f"status {personalized_section.status.value}.",
-            )
-            return True
-    return False
-
-
 async def send_stream_event(
     data: dict,
     event_type: str,
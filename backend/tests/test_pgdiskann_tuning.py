@@ -0,0 +1,84 @@
+"""
+The autotuner sweeps `quantized_fetch_limit`; these check that the swept values reach
+the SQL, on the async query path the sweep runs too, without a database.
+
+Run from the backend directory:
+    python -m unittest discover tests
+"""
+
+import unittest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+from src.llama_index.vector_stores.pgdiskann import PGDiskAnnVectorStore
+
+EMBEDDING = [0.1, 0.2, 0.3]
+
+
+def _store() -> PGDiskAnnVectorStore:
+    return PGDiskAnnVectorStore(
+        connection_string="postgresql+psycopg2://tuning@localhost/tuning",
+        async_connection_string="postgresql+asyncpg://tuning@localhost/tuning",
+        table_name="tuning",
+        schema_name="public",
+        embed_dim=len(EMBEDDING),
+        perform_setup=False,
+        pgdiskann_kwargs={"diskann_l_value_is": 100, "quantized_fetch_limit": 50},
+    )
+
+
+def _compiled(stmt) -> tuple[str, dict]:
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+class FetchLimitTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.store = _store()
+
+    def test_build_query_applies_fetch_limit(self) -> None:
+        small = _compiled(
+            self.store._build_query(EMBEDDING, 10, quantized_fetch_limit=20),
+        )
+        large = _compiled(
+            self.store._build_query(EMBEDDING, 10, quantized_fetch_limit=120),
+        )
+        self.assertNotEqual(small, large)
+        self.assertIn(20, small[1].values())
+        self.assertIn(120, large[1].values())
+
+    async def test_async_query_forwards_fetch_limit(self) -> None:
+        executed = []
+        session = MagicMock()
+        session.begin.return_value.__aenter__ = AsyncMock()
+        session.begin.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        async def execute(stmt):
+            executed.append(_compiled(stmt))
+            return MagicMock(all=lambda: [])
+
+        session.execute = execute
+
+        @asynccontextmanager
+        async def async_session():
+            yield session
+
+        with (
+            patch.object(self.store, "_async_session", async_session),
+            patch.object(self.store, "_aset_search_params", AsyncMock()),
+        ):
+            for fetch_limit in (20, 120):
+                await self.store._aquery_with_score(
+                    EMBEDDING,
+                    10,
+                    quantized_fetch_limit=fetch_limit,
+                    use_reranking=True,
+                )
+
+        self.assertEqual(len(executed), 2)
+        self.assertNotEqual(executed[0], executed[1])
+
+
+if __name__ == "__main__":
+    unittest.main()